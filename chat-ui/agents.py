@@ -1,9 +1,18 @@
 from agent_squad.agents import BedrockLLMAgent, BedrockLLMAgentOptions, AgentCallbacks
 from ollamaAgent import OllamaAgent, OllamaAgentOptions
 import asyncio
+import os
+import sys
 
 import chainlit as cl
 
+# The NeonPanel integration lives in the repository root; put it first so "mcp"
+# is this repo's package, not the PyPI MCP SDK
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mcp.neonpanel_agent import NeonPanelSquadAgent, get_neonpanel_agent  # noqa: E402
+
+NEONPANEL_MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0"
+
 class ChainlitAgentCallbacks(AgentCallbacks):
     def on_llm_new_token(self, token: str) -> None:
         asyncio.run(cl.user_session.get("current_msg").stream_token(token))
@@ -34,3 +43,31 @@ def create_health_agent():
         streaming=True,
         callbacks=ChainlitAgentCallbacks()
     ))
+
+
+def create_neonpanel_llm():
+    return BedrockLLMAgent(
+        BedrockLLMAgentOptions(
+            name="NeonPanel Agent",
+            streaming=True,
+            description=(
+                "Specializes in NeonPanel server management, user account "
+                "operations, server monitoring, resource allocation, and system "
+                "administration tasks. Can access real-time server data and "
+                "perform management operations."
+            ),
+            model_id=NEONPANEL_MODEL_ID,
+            callbacks=ChainlitAgentCallbacks(),
+        )
+    )
+
+
+def create_neonpanel_agent():
+    # The NeonPanel agent and its Bedrock client are shared through the
+    # process-wide pool
+    return NeonPanelSquadAgent(
+        get_neonpanel_agent(
+            llm_key=("chainlit-bedrock", NEONPANEL_MODEL_ID),
+            llm_factory=create_neonpanel_llm,
+        )
+    )
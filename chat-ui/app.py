@@ -54,12 +54,12 @@ def initialize_orchestrator():
     )
 
 orchestrator = initialize_orchestrator()
-)
 
 # Add agents to the orchestrator
 orchestrator.add_agent(create_tech_agent())
 orchestrator.add_agent(create_travel_agent())
 orchestrator.add_agent(create_health_agent())
+orchestrator.add_agent(create_neonpanel_agent())
 
 @cl.on_chat_start
 async def start():
@@ -0,0 +1,155 @@
+"""
+Process-wide pool of long-lived agent instances
+Building an agent creates LLM clients and connection pools, so sessions that
+share a configuration share one instance. Entries are created lazily, warmed
+up once, kept in LRU order up to max_size and evicted after idle_timeout.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Entry:
+    __slots__ = ("value", "created_at", "last_used", "uses")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.created_at = self.last_used = time.monotonic()
+        self.uses = 0
+
+
+class AgentPool:
+    """Thread-safe keyed pool of shared instances
+
+    get(key, factory) returns the instance for key, building it with factory()
+    on first use. Building happens outside the pool lock, under a per-key
+    lock, so a slow construction only blocks callers of the same key. New
+    instances with a warm_up() method have it called before being handed out.
+    Evicted instances with a close() method are closed.
+    """
+
+    def __init__(self, max_size: int = 8, idle_timeout: Optional[float] = 900.0):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._building: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.warmup_errors = 0
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """The pooled instance for key, created (and warmed up) on first use"""
+        with self._lock:
+            self._evict_idle()
+            entry = self._touch(key)
+            if entry is not None:
+                self.hits += 1
+                return entry.value
+            build_lock = self._building.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                # Another thread may have built it while we waited
+                entry = self._touch(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry.value
+            value = factory()
+            self._warm_up(value)
+            with self._lock:
+                self.misses += 1
+                self._building.pop(key, None)
+                entry = self._entries[key] = _Entry(value)
+                entry.uses = 1
+                evicted = []
+                while len(self._entries) > self.max_size:
+                    evicted.append(self._entries.popitem(last=False)[1].value)
+                    self.evictions += 1
+        for old in evicted:
+            self._close(old)
+        return value
+
+    def prewarm(self, key: Hashable, factory: Callable[[], Any]) -> threading.Thread:
+        """Build the instance for key in a background thread, e.g. at app start"""
+        thread = threading.Thread(
+            target=self.get, args=(key, factory), name="agent-pool-prewarm", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _touch(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry.last_used = time.monotonic()
+            entry.uses += 1
+        return entry
+
+    def _evict_idle(self):
+        if self.idle_timeout is None:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        for key in [
+            key for key, entry in self._entries.items() if entry.last_used < cutoff
+        ]:
+            self._close(self._entries.pop(key).value)
+            self.evictions += 1
+
+    def evict_idle(self):
+        """Drop instances unused for idle_timeout seconds (also done on every get)"""
+        with self._lock:
+            self._evict_idle()
+
+    def _warm_up(self, value: Any):
+        warm_up = getattr(value, "warm_up", None)
+        if warm_up is None:
+            return
+        try:
+            warm_up()
+        except Exception as e:
+            # A failed warm-up only costs the first request its latency
+            self.warmup_errors += 1
+            print(f"Error warming up pooled agent: {e}")
+
+    @staticmethod
+    def _close(value: Any):
+        close = getattr(value, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                print(f"Error closing pooled agent: {e}")
+
+    def clear(self):
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), OrderedDict()
+        for entry in entries:
+            self._close(entry.value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "idle_timeout": self.idle_timeout,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "warmup_errors": self.warmup_errors,
+                "oldest_idle_seconds": round(
+                    max(
+                        (now - e.last_used for e in self._entries.values()), default=0.0
+                    ),
+                    1,
+                ),
+            }
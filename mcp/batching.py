@@ -0,0 +1,78 @@
+"""
+Request batching for the NeonPanel client
+Collects individual key lookups made in the same loop tick and resolves them
+with as few batch calls as possible, with bounded concurrency
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class BatchLoader:
+    """DataLoader-style batcher; must be used from a single event loop"""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Hashable], Any], Awaitable[Dict[Hashable, Any]]],
+        max_batch_size: int = 100,
+        max_concurrency: int = 4,
+    ):
+        # batch_fn(keys, group) returns {key: value or Exception}; keys it leaves
+        # out fail with KeyError. Keys are only batched with others of the same group.
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self._queue: List[Tuple[Any, Hashable, "asyncio.Future"]] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.batches = 0
+        self.keys_loaded = 0
+
+    async def load(self, key: Hashable, group: Any = None) -> Any:
+        """Queue key for the next batch of its group and wait for its value"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        future = loop.create_future()
+        if not self._queue:
+            loop.call_soon(self._dispatch)
+        self._queue.append((group, key, future))
+        return await future
+
+    def _dispatch(self):
+        queue, self._queue = self._queue, []
+        groups: Dict[Any, List[Tuple[Hashable, "asyncio.Future"]]] = {}
+        for group, key, future in queue:
+            groups.setdefault(group, []).append((key, future))
+        loop = asyncio.get_running_loop()
+        for group, entries in groups.items():
+            for start in range(0, len(entries), self.max_batch_size):
+                loop.create_task(
+                    self._run_batch(group, entries[start : start + self.max_batch_size])
+                )
+
+    async def _run_batch(
+        self, group: Any, batch: List[Tuple[Hashable, "asyncio.Future"]]
+    ):
+        keys = list(dict.fromkeys(key for key, _ in batch))
+        async with self._semaphore:
+            self.batches += 1
+            self.keys_loaded += len(keys)
+            try:
+                results = await self.batch_fn(keys, group)
+            except Exception as e:
+                results = {key: e for key in keys}
+        for key, future in batch:
+            if future.done():
+                continue
+            value = results.get(key, KeyError(key))
+            if isinstance(value, Exception):
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "batches": self.batches,
+            "keys_loaded": self.keys_loaded,
+            "queued": len(self._queue),
+        }
@@ -0,0 +1,134 @@
+"""
+Micro-benchmark for NeonPanel response decoding
+Compares the previous path (httpx's response.json(), i.e. json.loads of the
+whole body) with mcp.decoding's fast loads() and lazy SearchPage, on
+synthetic search and stats payloads.
+
+    python -m mcp.bench_decoding --results 500 --read 20 --payload-bytes 200
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from mcp.decoding import JSON_BACKEND, SearchPage, loads
+
+
+def search_payload(results: int, payload_bytes: int) -> bytes:
+    padding = "x" * payload_bytes
+    body = {
+        "results": [
+            {
+                "id": f"res_{i}",
+                "name": f"server-{i:05d}",
+                "type": "server",
+                "status": "active",
+                "created_at": "2024-07-15T10:00:00Z",
+                "tags": {"team": "platform", "env": "prod", "labels": ["a", "b", "c"]},
+                "details": padding,
+            }
+            for i in range(results)
+        ],
+        "total": results,
+        "next_cursor": None,
+    }
+    return json.dumps(body).encode()
+
+
+def stats_payload() -> bytes:
+    return json.dumps(
+        {
+            "total_servers": 500,
+            "active_servers": 453,
+            "cpu_usage": 41.0,
+            "memory_usage": 50.6,
+            "disk_usage": 65.0,
+            "network_in": 316.59,
+            "network_out": 239.17,
+            "uptime": "5 seconds",
+        }
+    ).encode()
+
+
+def measure(fn: Callable[[], Any], min_seconds: float = 0.5) -> Dict[str, float]:
+    """Mean time per call in microseconds, and peak allocation of one call in KiB"""
+    fn()
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "us_per_call": round(elapsed / calls * 1e6, 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark NeonPanel JSON decoding paths"
+    )
+    parser.add_argument(
+        "--results", type=int, default=500, help="Results per search page"
+    )
+    parser.add_argument(
+        "--read", type=int, default=20, help="Results actually read from each page"
+    )
+    parser.add_argument(
+        "--payload-bytes", type=int, default=200, help="Padding per result"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=0.5, help="Minimum run time per case"
+    )
+    args = parser.parse_args()
+
+    search = search_payload(args.results, args.payload_bytes)
+    stats = stats_payload()
+
+    def current_search():
+        body = json.loads(search)
+        return [result["name"] for result in body.get("results", [])[: args.read]]
+
+    def fast_search():
+        body = loads(search)
+        return [result["name"] for result in body.get("results", [])[: args.read]]
+
+    def lazy_search():
+        page = SearchPage.from_json(search)
+        return [result["name"] for result in page.results[: args.read]]
+
+    def lazy_search_all():
+        return [result["name"] for result in SearchPage.from_json(search).results]
+
+    cases = {
+        "search/current json.loads": current_search,
+        f"search/{JSON_BACKEND} loads": fast_search,
+        f"search/lazy page (read {args.read})": lazy_search,
+        "search/lazy page (read all)": lazy_search_all,
+        "stats/current json.loads": lambda: json.loads(stats),
+        f"stats/{JSON_BACKEND} loads": lambda: loads(stats),
+    }
+    report = {
+        "backend": JSON_BACKEND,
+        "search_payload_bytes": len(search),
+        "stats_payload_bytes": len(stats),
+        "cases": {name: measure(fn, args.seconds) for name, fn in cases.items()},
+    }
+    for name, result in report["cases"].items():
+        baseline = report["cases"][name.split("/")[0] + "/current json.loads"][
+            "us_per_call"
+        ]
+        result["speedup"] = round(baseline / result["us_per_call"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
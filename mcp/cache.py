@@ -0,0 +1,173 @@
+"""
+Response cache for the NeonPanel client
+Size-bounded LRU with per-entry TTLs and a stale-while-revalidate window.
+Entries carrying HTTP validators are kept past that window so they can be
+revalidated with a conditional request instead of refetched.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+EXPIRED = "expired"
+
+
+class Validators:
+    """ETag/Last-Modified and delta cursor returned with a response body
+
+    size is the length in bytes of the full representation, used to estimate
+    the transfer saved by a 304 or a delta response.
+    """
+
+    __slots__ = ("etag", "last_modified", "cursor", "size")
+
+    def __init__(
+        self,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        cursor: Optional[str] = None,
+        size: int = 0,
+    ):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.cursor = cursor
+        self.size = size
+
+    def __bool__(self) -> bool:
+        return bool(self.etag or self.last_modified or self.cursor)
+
+
+class Validated:
+    """A fetched value together with the validators to store alongside it"""
+
+    __slots__ = ("value", "validators")
+
+    def __init__(self, value: Any, validators: Optional[Validators]):
+        self.value = value
+        self.validators = validators
+
+
+class CacheEntry:
+    """A cached response body and when it stops being fresh"""
+
+    __slots__ = ("value", "stored_at", "ttl", "validators")
+
+    def __init__(self, value: Any, ttl: float, validators: Optional[Validators] = None):
+        self.value = value
+        self.stored_at = time.monotonic()
+        self.ttl = ttl
+        self.validators = validators
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+class ResponseCache:
+    """Thread-safe LRU cache keyed by (endpoint, *args) tuples"""
+
+    def __init__(self, max_entries: int = 1024, stale_ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, endpoint: str, counter: str, amount: int = 1):
+        counters = self._counters.setdefault(
+            endpoint,
+            {
+                "hits": 0,
+                "stale_hits": 0,
+                "misses": 0,
+                "evictions": 0,
+                "invalidations": 0,
+            },
+        )
+        counters[counter] += amount
+
+    def lookup(self, key: Tuple) -> Tuple[Optional[CacheEntry], str]:
+        """Return the entry for key and whether it is fresh, stale, expired or missing
+
+        Expired entries must not be served, only revalidated; they count as misses.
+        """
+        endpoint = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = entry.age
+                if age < entry.ttl:
+                    self._entries.move_to_end(key)
+                    self._count(endpoint, "hits")
+                    return entry, FRESH
+                if age < entry.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._count(endpoint, "stale_hits")
+                    return entry, STALE
+                if entry.validators:
+                    self._count(endpoint, "misses")
+                    return entry, EXPIRED
+                del self._entries[key]
+            self._count(endpoint, "misses")
+            return None, MISS
+
+    def peek(self, key: Tuple) -> Optional[CacheEntry]:
+        """Entry for key in any state, without touching counters or LRU order"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(
+        self,
+        key: Tuple,
+        value: Any,
+        ttl: float,
+        validators: Optional[Validators] = None,
+    ):
+        """Store a value, evicting the least recently used entries beyond max_entries"""
+        with self._lock:
+            self._entries[key] = CacheEntry(value, ttl, validators)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._count(evicted_key[0], "evictions")
+
+    def invalidate(self, endpoint: Optional[str] = None, key: Optional[Tuple] = None):
+        """Drop one key, every key of an endpoint, or everything"""
+        with self._lock:
+            if key is not None:
+                keys = [key] if key in self._entries else []
+            elif endpoint is not None:
+                keys = [k for k in self._entries if k[0] == endpoint]
+            else:
+                keys = list(self._entries)
+            for k in keys:
+                del self._entries[k]
+                self._count(k[0], "invalidations")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per endpoint plus overall totals"""
+        with self._lock:
+            endpoints = {name: dict(values) for name, values in self._counters.items()}
+            size = len(self._entries)
+        totals: Dict[str, int] = {}
+        for values in endpoints.values():
+            for counter, amount in values.items():
+                totals[counter] = totals.get(counter, 0) + amount
+        lookups = (
+            totals.get("hits", 0)
+            + totals.get("stale_hits", 0)
+            + totals.get("misses", 0)
+        )
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "hit_ratio": round((lookups - totals.get("misses", 0)) / lookups, 3)
+            if lookups
+            else 0.0,
+            "totals": totals,
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,234 @@
+"""
+Local mirror of the NeonPanel resource catalog
+A SQLite store of resources with an FTS5 full-text index over names and
+attributes plus B-tree indexes for attribute filters. The client keeps it
+up to date in the background; searches read it directly from any thread.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+ATTRIBUTES = ("type", "status", "region")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    type TEXT,
+    status TEXT,
+    region TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resources_type_status ON resources (type, status);
+CREATE INDEX IF NOT EXISTS resources_region ON resources (region);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# External-content FTS table kept in step with resources by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5(
+    name, type, status, region, content='resources', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS resources_ai AFTER INSERT ON resources BEGIN
+    INSERT INTO resources_fts (rowid, name, type, status, region)
+    VALUES (new.rowid, new.name, new.type, new.status, new.region);
+END;
+CREATE TRIGGER IF NOT EXISTS resources_ad AFTER DELETE ON resources BEGIN
+    INSERT INTO resources_fts (resources_fts, rowid, name, type, status, region)
+    VALUES ('delete', old.rowid, old.name, old.type, old.status, old.region);
+END;
+CREATE TRIGGER IF NOT EXISTS resources_au AFTER UPDATE ON resources BEGIN
+    INSERT INTO resources_fts (resources_fts, rowid, name, type, status, region)
+    VALUES ('delete', old.rowid, old.name, old.type, old.status, old.region);
+    INSERT INTO resources_fts (rowid, name, type, status, region)
+    VALUES (new.rowid, new.name, new.type, new.status, new.region);
+END;
+"""
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class CatalogMirror:
+    """SQLite-backed resource catalog with full-text and attribute search
+
+    Falls back to LIKE matching when the SQLite build lacks FTS5. The sync
+    cursor and last sync time are stored in the database, so a recent mirror
+    is usable straight after a restart.
+    """
+
+    def __init__(
+        self, path: str = "neonpanel_catalog.db", max_staleness: float = 300.0
+    ):
+        self.path = path
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self.fts = True
+        with self._lock, self._db:
+            if path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+            try:
+                self._db.executescript(_FTS_SCHEMA)
+            except sqlite3.OperationalError:
+                self.fts = False
+        self.hits = 0
+        self.misses = 0
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def _state(self, key: str) -> Optional[str]:
+        row = self._db.execute(
+            "SELECT value FROM sync_state WHERE key = ?", (key,)
+        ).fetchone()
+        return row["value"] if row else None
+
+    def _set_state(self, key: str, value: Optional[str]):
+        self._db.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    @property
+    def cursor(self) -> Optional[str]:
+        """Changes cursor to resume the next incremental sync from"""
+        with self._lock:
+            return self._state("cursor")
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last completed sync, or None if never synced"""
+        with self._lock:
+            synced_at = self._state("synced_at")
+        return time.time() - float(synced_at) if synced_at else None
+
+    @property
+    def is_fresh(self) -> bool:
+        age = self.age
+        return age is not None and age <= self.max_staleness
+
+    @staticmethod
+    def _row(resource: Dict[str, Any]) -> tuple:
+        return (
+            str(resource["id"]),
+            resource.get("name", ""),
+            resource.get("type"),
+            resource.get("status"),
+            resource.get("region"),
+            json.dumps(resource),
+        )
+
+    def apply_changes(
+        self,
+        upserted: Iterable[Dict[str, Any]],
+        deleted: Iterable[str] = (),
+        cursor: Optional[str] = None,
+    ):
+        """Upsert changes, drop deleted IDs and advance the cursor in one transaction"""
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO resources (id, name, type, status, region, body) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET name = excluded.name, "
+                "type = excluded.type, status = excluded.status, "
+                "region = excluded.region, body = excluded.body",
+                [self._row(resource) for resource in upserted],
+            )
+            self._db.executemany(
+                "DELETE FROM resources WHERE id = ?", [(str(i),) for i in deleted]
+            )
+            if cursor is not None:
+                self._set_state("cursor", cursor)
+
+    def replace_all(self, resources: Iterable[Dict[str, Any]]):
+        """Replace the catalog with a full snapshot (the API has no changes feed)"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM resources")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO resources "
+                "(id, name, type, status, region, body) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [self._row(resource) for resource in resources],
+            )
+            self._set_state("cursor", None)
+
+    def mark_synced(self):
+        with self._lock, self._db:
+            self._set_state("synced_at", repr(time.time()))
+        self.syncs += 1
+
+    def search(
+        self, query: str, limit: Optional[int] = 50, **filters: Any
+    ) -> List[Dict[str, Any]]:
+        """Resources matching every word of query (as prefixes) and the filters
+
+        Full-text matches are ordered by relevance; filters are exact matches on
+        type, status or region.
+        """
+        words = _WORD.findall(query.lower())
+        clauses, params = [], []
+        for attribute, value in filters.items():
+            if attribute not in ATTRIBUTES:
+                raise ValueError(f"Unknown catalog attribute: {attribute}")
+            clauses.append(f"r.{attribute} = ?")
+            params.append(value)
+
+        if words and self.fts:
+            sql = (
+                "SELECT r.body FROM resources_fts "
+                "JOIN resources r ON r.rowid = resources_fts.rowid "
+                "WHERE resources_fts MATCH ?"
+            )
+            params.insert(0, " ".join(f'"{word}"*' for word in words))
+            order = " ORDER BY resources_fts.rank"
+        else:
+            sql = "SELECT r.body FROM resources r WHERE 1"
+            for word in words:
+                clauses.append(
+                    "(r.name LIKE ? OR r.type LIKE ? "
+                    "OR r.status LIKE ? OR r.region LIKE ?)"
+                )
+                params.extend([f"%{word}%"] * 4)
+            order = " ORDER BY r.rowid"
+        for clause in clauses:
+            sql += f" AND {clause}"
+        sql += order
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [json.loads(row["body"]) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM resources").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        age = self.age
+        lookups = self.hits + self.misses
+        return {
+            "resources": len(self),
+            "full_text": self.fts,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "max_staleness": self.max_staleness,
+            "fresh": age is not None and age <= self.max_staleness,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
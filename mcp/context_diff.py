@@ -0,0 +1,262 @@
+"""
+Cross-turn diffing of NeonPanel prompt context
+Remembers, per chat session, the data the LLM has already been shown, so a
+follow-up prompt only needs to carry what changed since then. That only holds
+while the earlier prompts are still in the chat history sent with the new
+one, so each prompt is recorded and diffs are only made against a history
+that still contains all of them. A full refresh is sent again once enough has
+drifted, or after a number of turns, before the original falls out of the
+history window.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+UNCHANGED = "unchanged since last turn"
+
+
+def value_changed(old: Any, new: Any, rel_tol: float, abs_tol: float) -> bool:
+    """Numbers count as changed beyond the tolerances; anything else on inequality"""
+    if (
+        isinstance(old, (int, float))
+        and isinstance(new, (int, float))
+        and not isinstance(old, bool)
+        and not isinstance(new, bool)
+    ):
+        return abs(new - old) > max(abs_tol, rel_tol * abs(old))
+    return old != new
+
+
+def fingerprint(text: str) -> int:
+    return hash(text.strip())
+
+
+def row_key(row: Any, index: int) -> Hashable:
+    return row.get("id", index) if isinstance(row, dict) else index
+
+
+class SessionContext:
+    """What one session's LLM has seen: {source name: value as last shown}"""
+
+    __slots__ = (
+        "seen",
+        "prompts",
+        "turns",
+        "turns_since_refresh",
+        "last_used",
+        "input_tokens",
+    )
+
+    def __init__(self):
+        self.seen: Dict[str, Any] = {}
+        # Fingerprints of the prompts seen builds on, since the last full refresh
+        self.prompts: List[int] = []
+        self.turns = 0
+        self.turns_since_refresh = 0
+        self.last_used = time.monotonic()
+        # (tokens without diffing, tokens sent) per turn, most recent last
+        self.input_tokens: List[Tuple[int, int]] = []
+
+
+class ContextDiffer:
+    """Turns full context sections into per-session diffs
+
+    apply() takes (name, label, value) sections and returns the sections to
+    render: unchanged sources collapse to a one-line note, dicts to their
+    changed keys, and result lists to added (+), changed (~) and removed (-)
+    rows. A source is sent whole the first time, when the share of changed
+    fields exceeds max_drift, or every max_turns turns.
+
+    Everything is sent whole unless the history passed to apply() still has
+    every prompt recorded with record_prompt() since the last full refresh,
+    e.g. after the chat was cleared or the orchestrator's storage replaced.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 4,
+        max_drift: float = 0.5,
+        rel_tol: float = 0.02,
+        abs_tol: float = 0.5,
+        max_sessions: int = 1000,
+        session_ttl: float = 3600.0,
+    ):
+        self.max_turns = max_turns
+        self.max_drift = max_drift
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self._sessions: "OrderedDict[Hashable, SessionContext]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.full_refreshes = 0
+        self.diffs = 0
+        self.history_misses = 0
+
+    def _session(self, key: Hashable) -> SessionContext:
+        now = time.monotonic()
+        session = self._sessions.pop(key, None)
+        if session is None or now - session.last_used > self.session_ttl:
+            session = SessionContext()
+        session.last_used = now
+        self._sessions[key] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+
+    def reset(self, key: Hashable):
+        """Forget a session, e.g. when its chat history is cleared"""
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def _diff_dict(
+        self, old: Dict[str, Any], new: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], float]:
+        changes, visible = {}, dict(old)
+        for key, value in new.items():
+            if key not in old or value_changed(
+                old[key], value, self.rel_tol, self.abs_tol
+            ):
+                changes[key] = value
+                visible[key] = value
+        for key in old.keys() - new.keys():
+            changes[key] = None
+            visible.pop(key)
+        return changes, visible, len(changes) / max(len(old.keys() | new.keys()), 1)
+
+    def _diff_rows(
+        self, old: List[Any], new: List[Any]
+    ) -> Tuple[List[Dict[str, Any]], List[Any], float]:
+        before = {row_key(row, i): row for i, row in enumerate(old)}
+        after = {row_key(row, i): row for i, row in enumerate(new)}
+        rows = []
+        for key, row in after.items():
+            if key not in before:
+                rows.append(
+                    dict({"change": "+"}, **row)
+                    if isinstance(row, dict)
+                    else {"change": "+", "value": row}
+                )
+            elif row != before[key]:
+                rows.append(
+                    dict({"change": "~"}, **row)
+                    if isinstance(row, dict)
+                    else {"change": "~", "value": row}
+                )
+        for key in before.keys() - after.keys():
+            rows.append({"change": "-", "id": key})
+        return rows, list(new), len(rows) / max(len(before.keys() | after.keys()), 1)
+
+    def apply(
+        self,
+        key: Hashable,
+        sections: Iterable[Tuple[str, str, Any]],
+        history: Optional[Iterable[str]] = None,
+    ) -> Tuple[List[Tuple[str, str, Any]], Dict[str, str]]:
+        """Sections to send this turn and each source's mode: full, diff or unchanged
+
+        history is the text of the messages the LLM will be sent with this
+        prompt. Without it nothing can be diffed.
+        """
+        in_history = {fingerprint(text) for text in history or ()}
+        with self._lock:
+            session = self._session(key)
+            session.turns += 1
+            if session.seen and not (
+                session.prompts and in_history.issuperset(session.prompts)
+            ):
+                # The LLM no longer has the data earlier turns sent
+                self.history_misses += 1
+                session.seen.clear()
+                session.prompts.clear()
+            refresh = session.turns_since_refresh >= self.max_turns
+            out, modes = [], {}
+            for name, label, value in sections:
+                old = session.seen.get(name)
+                comparable = (isinstance(old, dict) and isinstance(value, dict)) or (
+                    isinstance(old, list) and isinstance(value, (list, tuple))
+                )
+                if refresh or not comparable:
+                    session.seen[name] = (
+                        list(value) if isinstance(value, tuple) else value
+                    )
+                    out.append((name, label, value))
+                    modes[name] = "full"
+                    continue
+                if isinstance(value, dict):
+                    changes, visible, drift = self._diff_dict(old, value)
+                else:
+                    changes, visible, drift = self._diff_rows(old, list(value))
+                if drift > self.max_drift:
+                    session.seen[name] = (
+                        value if isinstance(value, dict) else list(value)
+                    )
+                    out.append((name, label, value))
+                    modes[name] = "full"
+                elif not changes:
+                    out.append((name, label, UNCHANGED))
+                    modes[name] = "unchanged"
+                else:
+                    session.seen[name] = visible
+                    out.append((name, f"{label}, changes since last turn", changes))
+                    modes[name] = "diff"
+
+            if refresh or (modes and all(mode == "full" for mode in modes.values())):
+                session.turns_since_refresh = 0
+                # Only this prompt's sources remain to diff against,
+                # so only it must stay in history
+                session.prompts.clear()
+                for name in [name for name in session.seen if name not in modes]:
+                    del session.seen[name]
+            session.turns_since_refresh += 1
+            if any(mode == "full" for mode in modes.values()):
+                self.full_refreshes += 1
+            if any(mode != "full" for mode in modes.values()):
+                self.diffs += 1
+            return out, modes
+
+    def record_prompt(self, key: Hashable, prompt: str):
+        """Note the prompt that carried this turn's sections, as history will hold it"""
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                session.prompts.append(fingerprint(prompt))
+
+    def record_tokens(self, key: Hashable, before: int, after: int, keep: int = 50):
+        """Note a turn's input tokens without diffing (before) and as sent (after)"""
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                session.input_tokens.append((before, after))
+                del session.input_tokens[:-keep]
+
+    def session_stats(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                return None
+            return {
+                "turns": session.turns,
+                "turns_since_refresh": session.turns_since_refresh,
+                "sources": sorted(session.seen),
+                "input_tokens": [
+                    {"before": b, "after": a} for b, a in session.input_tokens
+                ],
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            turns = [t for s in self._sessions.values() for t in s.input_tokens]
+        before = sum(b for b, _ in turns)
+        after = sum(a for _, a in turns)
+        return {
+            "sessions": len(self._sessions),
+            "full_refreshes": self.full_refreshes,
+            "diffs": self.diffs,
+            "history_misses": self.history_misses,
+            "input_tokens_before": before,
+            "input_tokens_after": after,
+            "input_tokens_saved": before - after,
+        }
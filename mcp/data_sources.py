@@ -0,0 +1,178 @@
+"""
+Pluggable data sources for the NeonPanel agent
+Each source declares the words that trigger it, what a fetch costs and how
+fresh its data has to be. The registry compiles every trigger into a single
+regex, so intent detection is one pass over the input however many sources
+are registered.
+"""
+
+import re
+import threading
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+Triggers = Union[Mapping[str, float], Iterable[str]]
+
+
+class DataSource:
+    """A named piece of context the agent can fetch for a prompt
+
+    triggers maps words or phrases to a weight in (0, 1]; a plain list means
+    weight 1.0. Triggers match at the start of a word, so "server" also
+    matches "servers". cost is the expected fetch latency in seconds and
+    max_age how old cached data may be and still be used without fetching.
+
+    prepare(user_input, context) returns the arguments for fetch and cached,
+    or None when the source cannot be used for this request (for example no
+    user ID in the context). fetch(*args) returns an awaitable of the value;
+    cached(*args) returns (value, age in seconds) or None.
+    """
+
+    __slots__ = (
+        "name",
+        "triggers",
+        "fetch",
+        "cached",
+        "prepare",
+        "cost",
+        "max_age",
+        "label",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        triggers: Triggers,
+        fetch: Callable[..., Awaitable[Any]],
+        cached: Optional[Callable[..., Optional[Tuple[Any, float]]]] = None,
+        prepare: Optional[Callable[[str, Dict[str, Any]], Optional[tuple]]] = None,
+        cost: float = 0.5,
+        max_age: float = 0.0,
+        label: Optional[str] = None,
+    ):
+        if not isinstance(triggers, Mapping):
+            triggers = {term: 1.0 for term in triggers}
+        self.name = name
+        self.triggers = {
+            term.lower(): float(weight) for term, weight in triggers.items()
+        }
+        self.fetch = fetch
+        self.cached = cached
+        self.prepare = prepare or (lambda user_input, context: ())
+        self.cost = cost
+        self.max_age = max_age
+        self.label = label or name.replace("_", " ")
+
+    def __repr__(self) -> str:
+        return f"DataSource({self.name!r}, cost={self.cost}, max_age={self.max_age})"
+
+
+class DataSourceRegistry:
+    """Registered data sources plus the compiled matcher over all their triggers
+
+    A source's relevance combines its matched triggers as independent evidence,
+    1 - prod(1 - weight), so two weak hints outrank one. select() keeps the
+    sources whose relevance pays for their cost: min_relevance plus
+    cost_penalty per second of expected latency.
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[DataSource] = (),
+        min_relevance: float = 0.3,
+        cost_penalty: float = 0.1,
+    ):
+        self.min_relevance = min_relevance
+        self.cost_penalty = cost_penalty
+        self._sources: Dict[str, DataSource] = {}
+        self._lock = threading.Lock()
+        self._pattern: Optional[re.Pattern] = None
+        self._terms: Dict[str, List[Tuple[str, float]]] = {}
+        for source in sources:
+            self.register(source)
+
+    def register(self, source: DataSource) -> DataSource:
+        """Add or replace a source; the matcher is recompiled on next use"""
+        with self._lock:
+            self._sources[source.name] = source
+            self._pattern = None
+        return source
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._sources.pop(name, None)
+            self._pattern = None
+
+    def get(self, name: str) -> Optional[DataSource]:
+        return self._sources.get(name)
+
+    def __iter__(self):
+        return iter(list(self._sources.values()))
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def _compiled(
+        self,
+    ) -> Tuple[Optional[re.Pattern], Dict[str, List[Tuple[str, float]]]]:
+        with self._lock:
+            if self._pattern is None:
+                terms: Dict[str, List[Tuple[str, float]]] = {}
+                for source in self._sources.values():
+                    for term, weight in source.triggers.items():
+                        terms.setdefault(term, []).append((source.name, weight))
+                # Longest first, so "user data" wins over "user" at the same position
+                alternatives = sorted(terms, key=len, reverse=True)
+                self._pattern = (
+                    re.compile(
+                        r"\b("
+                        + "|".join(re.escape(term) for term in alternatives)
+                        + r")",
+                        re.IGNORECASE,
+                    )
+                    if alternatives
+                    else re.compile(r"(?!)")
+                )
+                self._terms = terms
+            return self._pattern, self._terms
+
+    def match(self, text: str) -> List[Tuple[DataSource, float]]:
+        """(source, relevance) for each source triggered by text, most relevant first"""
+        pattern, terms = self._compiled()
+        evidence: Dict[str, Dict[str, float]] = {}
+        for found in pattern.finditer(text):
+            term = found.group(1).lower()
+            for name, weight in terms.get(term, ()):
+                evidence.setdefault(name, {})[term] = weight
+        scored = []
+        for name, weights in evidence.items():
+            miss = 1.0
+            for weight in weights.values():
+                miss *= 1.0 - min(weight, 1.0)
+            source = self._sources.get(name)
+            if source is not None:
+                scored.append((source, round(1.0 - miss, 3)))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored
+
+    def threshold(self, source: DataSource) -> float:
+        """Relevance a source needs before it is worth fetching"""
+        return self.min_relevance + self.cost_penalty * source.cost
+
+    def select(self, text: str) -> List[Tuple[DataSource, float]]:
+        """Matched sources whose relevance clears their cost-adjusted threshold"""
+        return [
+            (source, relevance)
+            for source, relevance in self.match(text)
+            if relevance >= self.threshold(source)
+        ]
@@ -0,0 +1,164 @@
+"""
+JSON decoding for NeonPanel responses
+Uses orjson or msgspec when installed and falls back to the standard library.
+Search pages decode lazily: with msgspec each result is kept as raw JSON
+bytes and only turned into a dict when it is read.
+"""
+
+import json
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+elif msgspec is not None:
+    JSON_BACKEND = "msgspec"
+else:
+    JSON_BACKEND = "json"
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document with the fastest available backend"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+if msgspec is not None:
+
+    class _SearchEnvelope(msgspec.Struct):
+        # Results stay undecoded until read
+        results: List[msgspec.Raw] = []
+        total: Optional[int] = None
+        next_cursor: Optional[str] = None
+
+    _envelope_decoder = msgspec.json.Decoder(_SearchEnvelope)
+    _item_decoder = msgspec.json.Decoder()
+
+
+class LazyList(Sequence):
+    """Read-only list whose items are decoded from raw JSON on first access
+
+    Items decode to plain dicts, the shape every consumer of search results
+    expects. The raw buffer is released once every item has been decoded, so
+    a fully read page does not hold both forms. Pages are shared through the
+    client cache, so decoding is locked: each item is decoded exactly once.
+    """
+
+    __slots__ = ("_raw", "_items", "_pending", "_lock")
+
+    _PENDING = object()
+
+    def __init__(self, raw: List[Any], decoded: bool = False):
+        if decoded:
+            self._raw = None
+            self._items = list(raw)
+            self._pending = 0
+            self._lock = None
+        else:
+            self._raw = raw
+            self._items = [self._PENDING] * len(raw)
+            self._pending = len(raw)
+            self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = self._items[index]
+        if item is self._PENDING:
+            with self._lock:
+                # Another reader may have decoded it while this one waited
+                item = self._items[index]
+                if item is self._PENDING:
+                    item = self._items[index] = _item_decoder.decode(self._raw[index])
+                    self._pending -= 1
+                    if not self._pending:
+                        # msgspec.Raw items share the response buffer; drop them
+                        # all at once
+                        self._raw = None
+        return item
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def decoded(self) -> int:
+        """How many items have been materialised so far"""
+        return len(self._items) - self._pending
+
+    @property
+    def holds_raw(self) -> bool:
+        """Whether the undecoded response data is still referenced"""
+        return self._raw is not None
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class SearchPage:
+    """One /search response: total, next_cursor and lazily decoded results
+
+    Supports page.get("results") and page["total"] so code written against the
+    plain dict keeps working.
+    """
+
+    __slots__ = ("results", "total", "next_cursor")
+
+    def __init__(
+        self,
+        results: Sequence[Dict[str, Any]],
+        total: Optional[int] = None,
+        next_cursor: Optional[str] = None,
+    ):
+        self.results = results
+        self.total = total
+        self.next_cursor = next_cursor
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "SearchPage":
+        if msgspec is not None:
+            envelope = _envelope_decoder.decode(data)
+            return cls(LazyList(envelope.results), envelope.total, envelope.next_cursor)
+        body = loads(data)
+        return cls(
+            LazyList(body.get("results", []), decoded=True),
+            body.get("total"),
+            body.get("next_cursor"),
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "results": list(self.results),
+            "total": self.total,
+            "next_cursor": self.next_cursor,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"SearchPage(results={len(self.results)}, total={self.total}, "
+            f"next_cursor={self.next_cursor!r})"
+        )
@@ -0,0 +1,501 @@
+"""
+Local NeonPanel API stand-in
+A FastAPI app implementing the endpoints NeonPanelMCPClient calls, with
+configurable latency, error rate, payload size and fleet size, so the real
+HTTP code path can be benchmarked offline.
+
+Run with:
+    python -m mcp.fake_server --port 8765 --latency-ms 40 --error-rate 0.01
+and point the client at it:
+    NEONPANEL_BASE_URL=http://127.0.0.1:8765 NEONPANEL_API_KEY=local \
+        NEONPANEL_DEMO_MODE=false
+The same app also serves MCP over WebSocket at /mcp, for
+    NEONPANEL_TRANSPORT=mcp NEONPANEL_MCP_SERVER_URL=ws://127.0.0.1:8765/mcp
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
+
+
+class FakeServerConfig:
+    """Knobs for the simulated API"""
+
+    def __init__(
+        self,
+        latency_ms: float = 40.0,
+        latency_sigma: float = 0.5,
+        tail_probability: float = 0.01,
+        tail_multiplier: float = 10.0,
+        error_rate: float = 0.0,
+        fleet_size: int = 500,
+        resource_count: int = 2000,
+        payload_bytes: int = 0,
+        rate_limit: float = 0.0,
+        stats_interval: float = 5.0,
+        seed: int = 42,
+    ):
+        self.latency_ms = latency_ms  # median latency
+        self.latency_sigma = latency_sigma  # lognormal shape; 0 gives fixed latency
+        self.tail_probability = (
+            tail_probability  # share of requests hit by a slow outlier
+        )
+        self.tail_multiplier = tail_multiplier  # how much slower those outliers are
+        self.error_rate = error_rate  # share of requests answered with 503
+        self.fleet_size = fleet_size
+        self.resource_count = resource_count
+        self.payload_bytes = payload_bytes  # padding added to every user and resource
+        self.rate_limit = rate_limit  # requests/second before answering 429; 0 disables
+        self.stats_interval = stats_interval  # seconds between fleet stats samples
+        self.seed = seed
+
+
+def create_app(config: Optional[FakeServerConfig] = None) -> FastAPI:
+    """Build the fake NeonPanel API app"""
+    config = config or FakeServerConfig()
+    rng = random.Random(config.seed)
+    padding = "x" * config.payload_bytes
+    started = time.time()
+
+    servers = [
+        {
+            "id": f"srv_{i}",
+            "name": f"server-{i:05d}",
+            "region": rng.choice(["us-east-1", "us-west-2", "eu-west-1"]),
+            "status": "running" if rng.random() > 0.1 else "stopped",
+            "base_cpu": rng.uniform(10, 70),
+        }
+        for i in range(config.fleet_size)
+    ]
+    resources = []
+    for i in range(config.resource_count):
+        kind = rng.choice(["server", "database", "service"])
+        resources.append(
+            {
+                "id": f"res_{i}",
+                "name": f"{kind}-{i:05d}",
+                "type": kind,
+                "status": rng.choice(["active", "inactive", "pending"]),
+                "created_at": "2024-07-15T10:00:00Z",
+                "version": i + 1,
+            }
+        )
+    counters = {
+        "requests": 0,
+        "errors_injected": 0,
+        "throttled": 0,
+        "actions": 0,
+        "not_modified": 0,
+        "deltas": 0,
+        "mcp_sessions": 0,
+        "mcp_calls": 0,
+    }
+    # Recent stats snapshots by ETag, so "since" polls can be answered with a delta
+    snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    window = {"second": 0, "count": 0}
+    versions = {"latest": len(resources)}
+
+    app = FastAPI(title="NeonPanel API stand-in")
+    app.state.config = config
+    app.state.counters = counters
+
+    def latency() -> float:
+        seconds = config.latency_ms / 1000.0
+        if config.latency_sigma > 0:
+            seconds *= math.exp(rng.gauss(0, config.latency_sigma))
+        if rng.random() < config.tail_probability:
+            seconds *= config.tail_multiplier
+        return seconds
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        counters["requests"] += 1
+        if config.rate_limit > 0 and not request.url.path.startswith("/_"):
+            second = int(time.time())
+            if window["second"] != second:
+                window["second"], window["count"] = second, 0
+            window["count"] += 1
+            if window["count"] > config.rate_limit:
+                counters["throttled"] += 1
+                return JSONResponse(
+                    {"error": "rate limited"},
+                    status_code=429,
+                    headers={"Retry-After": "1"},
+                )
+        await asyncio.sleep(latency())
+        if not request.url.path.startswith("/_") and rng.random() < config.error_rate:
+            counters["errors_injected"] += 1
+            return JSONResponse({"error": "injected failure"}, status_code=503)
+        return await call_next(request)
+
+    def user(user_id: str) -> Dict[str, Any]:
+        record = {
+            "user_id": user_id,
+            "username": f"user_{user_id}",
+            "email": f"{user_id}@example.com",
+            "created_at": "2024-01-15T10:30:00Z",
+            "status": "active",
+        }
+        if padding:
+            record["profile"] = padding
+        return record
+
+    def etag_for(body: Any) -> str:
+        return (
+            '"%s"'
+            % hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16]
+        )
+
+    def conditional(
+        request: Request,
+        body: Any,
+        modified: float,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        # 304 when the client's ETag still matches, else the full body with validators
+        etag = etag_for(body)
+        headers = dict(
+            headers or {},
+            ETag=etag,
+            **{"Last-Modified": formatdate(modified, usegmt=True)},
+        )
+        if etag in request.headers.get("If-None-Match", ""):
+            counters["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(body, headers=headers)
+
+    @app.get("/users/{user_id}")
+    async def get_user(user_id: str):
+        return user(user_id)
+
+    @app.post("/users/batch")
+    async def get_users(body: Dict[str, List[str]]):
+        return {
+            "users": [user(user_id) for user_id in body.get("ids", [])],
+            "errors": {},
+        }
+
+    @app.get("/servers/stats")
+    async def server_stats(request: Request, since: Optional[str] = None):
+        stats, sampled = current_stats()
+        etag = etag_for(stats)
+        snapshots[etag] = stats
+        while len(snapshots) > 64:
+            snapshots.popitem(last=False)
+        headers = {"X-Changes-Cursor": etag}
+
+        previous = snapshots.get(since) if since else None
+        if previous is not None and etag not in request.headers.get(
+            "If-None-Match", ""
+        ):
+            counters["deltas"] += 1
+            delta = {
+                "changes": {
+                    key: value
+                    for key, value in stats.items()
+                    if previous.get(key) != value
+                },
+                "removed": [key for key in previous if key not in stats],
+            }
+            return JSONResponse(
+                delta,
+                headers=dict(
+                    headers,
+                    ETag=etag,
+                    **{
+                        "X-Delta": "true",
+                        "Last-Modified": formatdate(sampled, usegmt=True),
+                    },
+                ),
+            )
+        return conditional(request, stats, sampled, headers)
+
+    def current_stats():
+        # Smooth drift, sampled every stats_interval seconds so repeated polls
+        # within an interval can be answered with 304
+        now = time.time()
+        sampled = (
+            now - (now - started) % config.stats_interval
+            if config.stats_interval > 0
+            else now
+        )
+        phase = (sampled - started) / 60.0
+        running = sum(1 for server in servers if server["status"] == "running")
+        cpu = sum(server["base_cpu"] for server in servers) / max(1, len(servers))
+        stats = {
+            "total_servers": len(servers),
+            "active_servers": running,
+            "cpu_usage": round(cpu + 10 * math.sin(phase), 1),
+            "memory_usage": round(50 + 15 * math.sin(phase / 2), 1),
+            "disk_usage": round(60 + 5 * math.cos(phase / 3), 1),
+            "network_in": round(300 + 100 * math.sin(phase * 2), 2),
+            "network_out": round(180 + 60 * math.cos(phase * 2), 2),
+            "uptime": f"{int(sampled - started)} seconds",
+        }
+        return stats, sampled
+
+    @app.post("/servers/{server_id}/actions")
+    async def server_action(server_id: str, body: Dict[str, str]):
+        try:
+            return apply_action(server_id, body.get("action", "status"))
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+    def apply_action(server_id: str, action: str) -> Dict[str, Any]:
+        index = (
+            int(server_id.split("_")[-1]) if server_id.split("_")[-1].isdigit() else -1
+        )
+        if not 0 <= index < len(servers):
+            raise KeyError(f"Unknown server {server_id}")
+        server = servers[index]
+        if action in ("start", "restart"):
+            server["status"] = "running"
+        elif action == "stop":
+            server["status"] = "stopped"
+        counters["actions"] += 1
+        if index < len(resources) and action in ("start", "restart", "stop"):
+            # Resource N mirrors server N, so the changes feed has something to report
+            versions["latest"] += 1
+            resources[index]["status"] = "inactive" if action == "stop" else "active"
+            resources[index]["version"] = versions["latest"]
+        return {
+            "server_id": server_id,
+            "action": action,
+            "status": server["status"],
+            "completed": True,
+        }
+
+    @app.get("/search")
+    async def search(
+        request: Request, q: str = "", limit: int = 50, cursor: Optional[str] = None
+    ):
+        return conditional(request, search_page(q, limit, cursor), started)
+
+    def search_page(q: str, limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+        needle = q.lower()
+        matches = [
+            resource
+            for resource in resources
+            if needle in resource["name"] or needle in resource["type"]
+        ]
+        offset = int(cursor) if cursor else 0
+        page = matches[offset : offset + limit]
+        if padding:
+            page = [dict(resource, details=padding) for resource in page]
+        next_offset = offset + limit
+        return {
+            "results": page,
+            "total": len(matches),
+            "next_cursor": str(next_offset) if next_offset < len(matches) else None,
+        }
+
+    @app.get("/resources/changes")
+    async def resource_changes(since: int = 0, limit: int = 500):
+        # Resources whose version is newer than the cursor, oldest change first
+        changed = sorted(
+            (resource for resource in resources if resource["version"] > since),
+            key=lambda resource: resource["version"],
+        )
+        page = changed[:limit]
+        if padding:
+            page = [dict(resource, details=padding) for resource in page]
+        return {
+            "resources": page,
+            "deleted": [],
+            "cursor": str(page[-1]["version"]) if page else str(since),
+            "has_more": len(changed) > limit,
+        }
+
+    # MCP over WebSocket: JSON-RPC tool calls for the same data, plus
+    # notifications/resources/updated pushes when the stats sample changes
+    tools = {
+        "get_server_stats": lambda arguments: current_stats()[0],
+        "get_user_data": lambda arguments: user(str(arguments["user_id"])),
+        "search_resources": lambda arguments: search_page(
+            arguments.get("query", ""),
+            int(arguments.get("limit", 50)),
+            arguments.get("cursor"),
+        ),
+        "execute_server_action": lambda arguments: apply_action(
+            str(arguments["server_id"]), arguments.get("action", "status")
+        ),
+    }
+
+    @app.websocket("/mcp")
+    async def mcp_endpoint(websocket: WebSocket):
+        await websocket.accept(
+            subprotocol="mcp"
+            if "mcp" in websocket.scope.get("subprotocols", [])
+            else None
+        )
+        counters["mcp_sessions"] += 1
+        subscriptions = set()
+        send_lock = asyncio.Lock()
+
+        async def send(message: Dict[str, Any]):
+            async with send_lock:
+                await websocket.send_json(message)
+
+        async def watch_stats():
+            last = None
+            while True:
+                await asyncio.sleep(max(0.1, config.stats_interval / 2))
+                etag = etag_for(current_stats()[0])
+                if (
+                    last is not None
+                    and etag != last
+                    and "neonpanel://servers/stats" in subscriptions
+                ):
+                    await send(
+                        {
+                            "jsonrpc": "2.0",
+                            "method": "notifications/resources/updated",
+                            "params": {"uri": "neonpanel://servers/stats"},
+                        }
+                    )
+                last = etag
+
+        async def handle(message: Dict[str, Any]):
+            # Each request is answered independently, so slow calls don't block others
+            method, params = message.get("method"), message.get("params") or {}
+            counters["mcp_calls"] += 1
+            await asyncio.sleep(latency())
+            try:
+                if method == "initialize":
+                    result = {
+                        "protocolVersion": params.get("protocolVersion", "2025-03-26"),
+                        "capabilities": {"tools": {}, "resources": {"subscribe": True}},
+                        "serverInfo": {
+                            "name": "neonpanel-stand-in",
+                            "version": "1.0.0",
+                        },
+                    }
+                elif method == "ping":
+                    result = {}
+                elif method == "tools/list":
+                    result = {
+                        "tools": [
+                            {"name": name, "inputSchema": {"type": "object"}}
+                            for name in tools
+                        ]
+                    }
+                elif method == "tools/call":
+                    if rng.random() < config.error_rate:
+                        counters["errors_injected"] += 1
+                        result = {
+                            "content": [{"type": "text", "text": "injected failure"}],
+                            "isError": True,
+                        }
+                    elif params.get("name") not in tools:
+                        raise LookupError(f"Unknown tool {params.get('name')}")
+                    else:
+                        try:
+                            value = tools[params["name"]](params.get("arguments") or {})
+                            result = {
+                                "content": [
+                                    {"type": "text", "text": json.dumps(value)}
+                                ],
+                                "isError": False,
+                            }
+                        except KeyError as e:
+                            result = {
+                                "content": [{"type": "text", "text": str(e.args[0])}],
+                                "isError": True,
+                            }
+                elif method == "resources/subscribe":
+                    subscriptions.add(params.get("uri"))
+                    result = {}
+                elif (
+                    method == "resources/read"
+                    and params.get("uri") == "neonpanel://servers/stats"
+                ):
+                    result = {
+                        "contents": [
+                            {
+                                "uri": params["uri"],
+                                "mimeType": "application/json",
+                                "text": json.dumps(current_stats()[0]),
+                            }
+                        ]
+                    }
+                else:
+                    raise LookupError(f"Method not found: {method}")
+                reply = {"jsonrpc": "2.0", "id": message["id"], "result": result}
+            except LookupError as e:
+                reply = {
+                    "jsonrpc": "2.0",
+                    "id": message["id"],
+                    "error": {"code": -32601, "message": str(e)},
+                }
+            await send(reply)
+
+        watcher = asyncio.ensure_future(watch_stats())
+        handlers = set()
+        try:
+            while True:
+                message = await websocket.receive_json()
+                if "id" in message and "method" in message:
+                    task = asyncio.ensure_future(handle(message))
+                    handlers.add(task)
+                    task.add_done_callback(handlers.discard)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            watcher.cancel()
+            for task in handlers:
+                task.cancel()
+
+    @app.get("/_stats")
+    async def fake_server_stats():
+        return counters
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local NeonPanel API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tail-probability", type=float, default=0.01)
+    parser.add_argument("--tail-multiplier", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fleet-size", type=int, default=500)
+    parser.add_argument("--resource-count", type=int, default=2000)
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--stats-interval", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeServerConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tail_probability=args.tail_probability,
+        tail_multiplier=args.tail_multiplier,
+        error_rate=args.error_rate,
+        fleet_size=args.fleet_size,
+        resource_count=args.resource_count,
+        payload_bytes=args.payload_bytes,
+        rate_limit=args.rate_limit,
+        stats_interval=args.stats_interval,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Load driver for NeonPanelMCPClient
+Fires concurrent client calls at a NeonPanel API (normally the local stand-in
+in mcp/fake_server.py) and reports latency percentiles and throughput.
+
+    python -m mcp.fake_server --port 8765 &
+    python -m mcp.load_test --base-url http://127.0.0.1:8765 \
+        --endpoint stats --requests 2000
+
+The benchmark client gets its own rate limiter, unlimited by default, and no
+catalog mirror, so the percentiles measure the API rather than the client's
+throttling. Pass --rate-limit or --catalog to include them.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_load(
+    client, endpoint: str, total: int, concurrency: int, query: str
+) -> dict:
+    """Issue total calls with at most concurrency in flight and collect timings"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            if endpoint == "stats":
+                result = await client.get_server_stats()
+            elif endpoint == "users":
+                result = await client.get_user_data(f"user{i % 1000}")
+            else:
+                result = await client.search_resources(query)
+            latencies.append(time.perf_counter() - start)
+            if isinstance(result, dict) and "error" in result:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    return {
+        "endpoint": endpoint,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the NeonPanel client")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8765")
+    parser.add_argument(
+        "--endpoint", choices=["stats", "users", "search"], default="stats"
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--query", default="server")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable response caching to measure raw HTTP",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.0,
+        help="Client requests/second per endpoint (0 = unlimited)",
+    )
+    parser.add_argument("--rate-burst", type=float, default=40.0)
+    parser.add_argument(
+        "--catalog",
+        action="store_true",
+        help="Answer searches from the local catalog mirror when fresh",
+    )
+    args = parser.parse_args()
+
+    # The client reads its configuration from the environment at construction
+    os.environ["NEONPANEL_BASE_URL"] = args.base_url
+    os.environ.setdefault("NEONPANEL_API_KEY", "load-test")
+    if args.no_cache:
+        for name in ("STATS", "USERS", "SEARCH"):
+            os.environ[f"NEONPANEL_CACHE_TTL_{name}"] = "0"
+        os.environ["NEONPANEL_CACHE_STALE_TTL"] = "0"
+    os.environ["NEONPANEL_CATALOG_MIRROR"] = "true" if args.catalog else "false"
+
+    from mcp.neonpanel_client import NeonPanelMCPClient
+    from mcp.rate_limit import RateLimiter
+
+    # Per-request access logs would dominate the run
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    client = NeonPanelMCPClient(demo_mode=False)
+    # Not the process-wide limiter: its default 20 rps would cap every run
+    client.rate_limiter = RateLimiter(rate=args.rate_limit, burst=args.rate_burst)
+    report = asyncio.run(
+        run_load(client, args.endpoint, args.requests, args.concurrency, args.query)
+    )
+    report["rate_limit"] = args.rate_limit or None
+    report["catalog"] = args.catalog
+    report["client"] = client.metrics()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
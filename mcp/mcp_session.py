@@ -0,0 +1,311 @@
+"""
+Model Context Protocol session over WebSocket
+One persistent connection carries every JSON-RPC call: requests are matched
+to responses by id, so any number of tool calls can be in flight at once.
+Server notifications are dispatched to registered handlers, and the session
+reconnects (re-initialising and re-subscribing) when the connection drops.
+Like the HTTP pool, a session must only be used from the shared NeonPanel loop.
+"""
+
+import asyncio
+import itertools
+import json
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .decoding import loads
+from .resilience import NeonPanelError, RetryPolicy
+
+PROTOCOL_VERSION = "2025-03-26"
+
+# JSON-RPC error code for methods the client does not implement
+METHOD_NOT_FOUND = -32601
+
+
+class MCPError(NeonPanelError):
+    """A JSON-RPC error response, or a tool result flagged isError"""
+
+    def __init__(self, message: str, code: Optional[int] = None, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class MCPConnectionError(NeonPanelError, ConnectionError):
+    """The session is not connected, or the connection dropped mid-call"""
+
+
+def websocket_url(url: str) -> str:
+    """Map http(s):// server URLs to ws(s)://"""
+    if url.startswith("http://"):
+        return "ws://" + url[len("http://") :]
+    if url.startswith("https://"):
+        return "wss://" + url[len("https://") :]
+    return url
+
+
+class MCPSession:
+    """Multiplexed JSON-RPC 2.0 session with an MCP server"""
+
+    def __init__(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        client_name: str = "neonpanel-client",
+        client_version: str = "1.0.0",
+        reconnect_policy: Optional[RetryPolicy] = None,
+        connect_timeout: float = 5.0,
+    ):
+        self.url = websocket_url(url)
+        self.headers = headers or {}
+        self.client_info = {"name": client_name, "version": client_version}
+        self.reconnect_policy = reconnect_policy or RetryPolicy(
+            base_delay=0.5, max_delay=30.0
+        )
+        self.connect_timeout = connect_timeout
+        self.server_info: Dict[str, Any] = {}
+        self.server_capabilities: Dict[str, Any] = {}
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, "asyncio.Future"] = {}
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], Any]]] = {}
+        self._subscriptions: Set[str] = set()
+        self._websocket = None
+        self._connected: Optional[asyncio.Event] = None
+        self._runner: Optional["asyncio.Task"] = None
+        self._closing = False
+        self.calls = 0
+        self.notifications = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connected is not None and self._connected.is_set()
+
+    async def start(self, timeout: Optional[float] = None):
+        """Connect in the background; wait up to timeout for the first connection"""
+        if self._runner is None or self._runner.done():
+            self._closing = False
+            self._connected = asyncio.Event()
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+        if timeout is not None:
+            await self._wait_connected(timeout)
+
+    async def close(self):
+        self._closing = True
+        if self._runner is not None:
+            self._runner.cancel()
+        if self._websocket is not None:
+            await self._websocket.close()
+        self._fail_pending(MCPConnectionError("MCP session closed"))
+
+    async def _wait_connected(self, timeout: float):
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise MCPConnectionError(
+                f"MCP server {self.url} not reachable"
+                + (f": {self.last_error}" if self.last_error else "")
+            ) from None
+
+    async def _run(self):
+        # Connection loop: (re)connect, handshake, read until the socket drops
+        from websockets.asyncio.client import connect
+
+        attempt = 0
+        while not self._closing:
+            try:
+                async with connect(
+                    self.url,
+                    subprotocols=["mcp"],
+                    additional_headers=self.headers,
+                    open_timeout=self.connect_timeout,
+                ) as websocket:
+                    self._websocket = websocket
+                    reader = asyncio.get_running_loop().create_task(
+                        self._read(websocket)
+                    )
+                    try:
+                        await self._handshake()
+                        attempt = 0
+                        self._connected.set()
+                        await reader
+                    finally:
+                        reader.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+            finally:
+                self._websocket = None
+                if self._connected is not None:
+                    self._connected.clear()
+                self._fail_pending(
+                    MCPConnectionError(f"MCP connection to {self.url} lost")
+                )
+            if self._closing:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(self.reconnect_policy.backoff(attempt))
+            attempt += 1
+
+    async def _handshake(self):
+        result = await self._call(
+            "initialize",
+            {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": self.client_info,
+            },
+            timeout=self.connect_timeout,
+        )
+        self.server_info = result.get("serverInfo", {})
+        self.server_capabilities = result.get("capabilities", {})
+        await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        for uri in self._subscriptions:
+            await self._call(
+                "resources/subscribe", {"uri": uri}, timeout=self.connect_timeout
+            )
+
+    async def _read(self, websocket):
+        async for raw in websocket:
+            try:
+                message = loads(raw)
+            except ValueError:
+                continue
+            for item in message if isinstance(message, list) else [message]:
+                await self._dispatch(item)
+
+    async def _dispatch(self, message: Dict[str, Any]):
+        if "method" not in message:
+            future = self._pending.pop(message.get("id"), None)
+            if future is None or future.done():
+                return
+            if "error" in message:
+                error = message["error"] or {}
+                future.set_exception(
+                    MCPError(
+                        error.get("message", "MCP error"),
+                        error.get("code"),
+                        error.get("data"),
+                    )
+                )
+            else:
+                future.set_result(message.get("result", {}))
+            return
+
+        if "id" in message:
+            # Server-initiated request; ping is the only one the client answers
+            if message["method"] == "ping":
+                await self._send({"jsonrpc": "2.0", "id": message["id"], "result": {}})
+            else:
+                await self._send(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": message["id"],
+                        "error": {
+                            "code": METHOD_NOT_FOUND,
+                            "message": f"Method not found: {message['method']}",
+                        },
+                    }
+                )
+            return
+
+        self.notifications += 1
+        params = message.get("params") or {}
+        for handler in self._handlers.get(message["method"], []):
+            try:
+                result = handler(params)
+                if asyncio.iscoroutine(result):
+                    asyncio.get_running_loop().create_task(result)
+            except Exception as e:
+                print(f"Error handling MCP notification {message['method']}: {e}")
+
+    async def _send(self, message: Dict[str, Any]):
+        if self._websocket is None:
+            raise MCPConnectionError("MCP session is not connected")
+        await self._websocket.send(json.dumps(message))
+
+    async def _call(
+        self, method: str, params: Optional[Dict[str, Any]], timeout: Optional[float]
+    ) -> Any:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        try:
+            await self._send(message)
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(
+                f"MCP call {method} timed out after {timeout}s"
+            ) from None
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _fail_pending(self, error: Exception):
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def request(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = 10.0,
+    ) -> Any:
+        """Send one JSON-RPC request over the shared connection and await its result"""
+        await self.start()
+        if not self.connected:
+            await self._wait_connected(timeout or self.connect_timeout)
+        self.calls += 1
+        return await self._call(method, params, timeout)
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = 10.0,
+        decode: Callable[[bytes], Any] = loads,
+    ) -> Any:
+        """Call an MCP tool and decode its first text content block as JSON"""
+        result = await self.request(
+            "tools/call", {"name": name, "arguments": arguments or {}}, timeout
+        )
+        text = next(
+            (
+                block.get("text", "")
+                for block in result.get("content", [])
+                if block.get("type") == "text"
+            ),
+            "",
+        )
+        if result.get("isError"):
+            raise MCPError(text or f"Tool {name} failed")
+        return decode(text.encode()) if text else None
+
+    async def subscribe(self, uri: str):
+        """Subscribe to resource updates; renewed after every reconnect"""
+        self._subscriptions.add(uri)
+        if self.connected:
+            await self._call(
+                "resources/subscribe", {"uri": uri}, timeout=self.connect_timeout
+            )
+
+    def on_notification(self, method: str, handler: Callable[[Dict[str, Any]], Any]):
+        """Register handler(params) for a notification; coroutines run as tasks"""
+        self._handlers.setdefault(method, []).append(handler)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "connected": self.connected,
+            "server": self.server_info.get("name"),
+            "calls": self.calls,
+            "in_flight": len(self._pending),
+            "notifications": self.notifications,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
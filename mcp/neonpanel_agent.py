@@ -3,110 +3,797 @@ NeonPanel Agent - Specialized agent for NeonPanel operations
 """
 
 import asyncio
-from typing import Dict, Any, List
-from agent_squad.agents import BedrockLLMAgent, BedrockLLMAgentOptions
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, AsyncIterator, Callable, Hashable, List, Optional, Tuple
+from agent_squad.agents import (
+    Agent,
+    AgentOptions,
+    AgentProcessingResult,
+    AgentResponse,
+    AgentStreamResponse,
+    BedrockLLMAgent,
+    BedrockLLMAgentOptions,
+)
+from agent_squad.types import ConversationMessage
+from mcp.agent_pool import AgentPool
+from mcp.context_diff import ContextDiffer
+from mcp.context_render import ContextRenderer, estimate_tokens
+from mcp.data_sources import DataSource, DataSourceRegistry
+from mcp.event_loop import shared_loop
 from mcp.neonpanel_client import neonpanel_client
+from mcp.rate_limit import PRIORITY_BACKGROUND
+
+DIFF_NOTE = (
+    "Note: sections marked as changes or unchanged update the NeonPanel data "
+    "given earlier in this conversation.\n"
+)
+
+
+def message_text(message: Any) -> str:
+    """Text of a ConversationMessage (its text blocks joined), or str(message)"""
+    content = getattr(message, "content", None)
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") for block in content if isinstance(block, dict)
+        )
+    return str(content if content is not None else message)
+
+
+class Prefetch:
+    """Speculative source fetches started for one message before routing picks an agent
+
+    Fetches run on the shared NeonPanel loop, so they outlive the asyncio.run()
+    call that started them. fetches maps source name to (args, future, started_at).
+    """
+
+    __slots__ = ("user_input", "user_id", "created_at", "fetches", "finished_at")
+
+    def __init__(self, user_input: str, user_id: Optional[str]):
+        self.user_input = user_input
+        self.user_id = user_id
+        self.created_at = time.monotonic()
+        self.fetches: Dict[str, tuple] = {}
+        self.finished_at: Dict[str, float] = {}
+
+    def start(self, name: str, args: tuple, coro):
+        future = shared_loop.spawn(coro)
+        future.add_done_callback(
+            lambda done: self.finished_at.setdefault(name, time.monotonic())
+        )
+        self.fetches[name] = (args, future, time.monotonic())
+
+    def cancel(self) -> int:
+        """Cancel whatever is still running; returns how many fetches there were"""
+        for _, future, _ in self.fetches.values():
+            future.cancel()
+        return len(self.fetches)
+
 
 class NeonPanelAgent:
     """Agent specialized for NeonPanel operations and data retrieval"""
-    
-    def __init__(self, name: str = "NeonPanel Agent"):
+
+    def __init__(
+        self,
+        name: str = "NeonPanel Agent",
+        source_timeout: float = 2.0,
+        gather_deadline: float = 4.0,
+        context_token_budget: int = 1200,
+        llm_agent=None,
+        context_diffing: bool = True,
+    ):
         self.name = name
         self.description = """
-        Specializes in NeonPanel server management, user data retrieval, 
+        Specializes in NeonPanel server management, user data retrieval,
         server statistics, and resource operations. Can help with:
         - Server status and monitoring
         - User account management
         - Resource allocation and usage
         - System administration tasks
         """
-        
-        # Initialize the underlying LLM agent
-        self.llm_agent = BedrockLLMAgent(BedrockLLMAgentOptions(
-            name=self.name,
-            description=self.description,
+
+        # Cap on search results pulled into a prompt
+        self.max_search_results = 20
+
+        # Data sources are fetched concurrently; each gets source_timeout seconds
+        # and all of them together gather_deadline, after which the agent answers
+        # with whatever arrived (or cached data for the ones that did not)
+        self.source_timeout = source_timeout
+        self.gather_deadline = gather_deadline
+
+        # Where prompt context comes from; register_source() adds more
+        self.sources = DataSourceRegistry(self._default_sources())
+
+        # Gathered data is rendered as compact summaries and tables within this
+        # many (estimated) tokens. Pooled agents serve many sessions at once, so
+        # per-request reports are returned to the caller, never kept on self
+        self.context_renderer = ContextRenderer(budget=context_token_budget)
+
+        # Within a session (context["session_id"]) follow-up prompts carry only
+        # what changed since the data the LLM was last shown
+        self.context_differ = ContextDiffer() if context_diffing else None
+
+        # Speculative prefetches keyed by (message, user ID), waiting to be
+        # claimed by the gather step or discarded when another agent answers
+        self.prefetch_ttl = 30.0
+        self.max_prefetches = 16
+        self._prefetches: "OrderedDict[tuple, Prefetch]" = OrderedDict()
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_stats = {
+            "prefetches": 0,
+            "fetches": 0,
+            "used": 0,
+            "wasted": 0,
+            "latency_saved_ms": 0.0,
+        }
+
+        # Initialize the underlying LLM agent (any agent_squad agent will do,
+        # e.g. the Anthropic agent the chat page already configured)
+        self.llm_agent = llm_agent or BedrockLLMAgent(
+            BedrockLLMAgentOptions(
+                name=self.name,
+                description=self.description,
+                streaming=True,
+                model_id="anthropic.claude-3-sonnet-20240229-v1:0",
+            )
+        )
+
+    def warm_up(self):
+        """Compile the intent matcher and open the NeonPanel connection pool early"""
+        self.sources.match("")
+        shared_loop.spawn(neonpanel_client.startup())
+
+    def close(self):
+        """Cancel outstanding prefetches; called when the pool evicts this agent"""
+        with self._prefetch_lock:
+            prefetches, self._prefetches = (
+                list(self._prefetches.values()),
+                OrderedDict(),
+            )
+            for prefetch in prefetches:
+                self._prefetch_stats["wasted"] += prefetch.cancel()
+
+    async def process_request(
+        self,
+        user_input: str,
+        context: Dict[str, Any] = None,
+        user_id: str = "",
+        session_id: str = "",
+        chat_history: Optional[List[ConversationMessage]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        """Process user request with NeonPanel-specific functionality
+
+        Returns whatever the LLM agent returns, as agent_squad agents do: a
+        ConversationMessage, or a stream of AgentStreamResponse chunks when
+        it streams. A metadata dict, if given, receives the prepare_prompt()
+        report.
+        """
+        if session_id and not (context or {}).get("session_id"):
+            context = dict(context or {}, session_id=session_id)
+        enhanced_prompt, prepared = await self.prepare_prompt(
+            user_input, context, chat_history
+        )
+        if metadata is not None:
+            metadata.update(prepared)
+        return await self.llm_agent.process_request(
+            enhanced_prompt, user_id, session_id, chat_history or [], None
+        )
+
+    async def stream_request(
+        self,
+        user_input: str,
+        context: Dict[str, Any] = None,
+        user_id: str = "",
+        session_id: str = "",
+        chat_history: Optional[List[ConversationMessage]] = None,
+        on_first_token: Optional[Callable[[float], Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[AgentStreamResponse]:
+        """Answer user_input as a stream of AgentStreamResponse chunks
+
+        Text is yielded as the LLM produces it, so the first token arrives one
+        LLM time-to-first-token after data gathering. on_first_token(seconds)
+        is called as soon as it does. A metadata dict, if given, receives this
+        request's prepare_prompt() report and then ttft_ms and llm_ttft_ms.
+        A non-streaming LLM agent yields its answer as one chunk.
+        """
+        started = time.perf_counter()
+        if session_id and not (context or {}).get("session_id"):
+            context = dict(context or {}, session_id=session_id)
+        enhanced_prompt, prepared = await self.prepare_prompt(
+            user_input, context, chat_history
+        )
+        if metadata is not None:
+            metadata.update(prepared)
+        async for chunk in self._stream_llm(
+            enhanced_prompt,
+            user_id,
+            session_id,
+            chat_history,
+            started,
+            on_first_token,
+            metadata,
+        ):
+            yield chunk
+
+    async def _stream_llm(
+        self,
+        enhanced_prompt: str,
+        user_id: str,
+        session_id: str,
+        chat_history: Optional[List[ConversationMessage]],
+        started: float,
+        on_first_token: Optional[Callable[[float], Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[AgentStreamResponse]:
+        llm_started = time.perf_counter()
+
+        # Process through the LLM agent
+        result = await self.llm_agent.process_request(
+            enhanced_prompt, user_id, session_id, chat_history or [], None
+        )
+        chunks = result if hasattr(result, "__aiter__") else self._single_chunk(result)
+
+        first = True
+        async for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = AgentStreamResponse(text=chunk)
+            if first and chunk.text:
+                first = False
+                now = time.perf_counter()
+                if metadata is not None:
+                    metadata["ttft_ms"] = round((now - started) * 1000, 1)
+                    metadata["llm_ttft_ms"] = round((now - llm_started) * 1000, 1)
+                if on_first_token is not None:
+                    on_first_token(now - started)
+            yield chunk
+
+    @staticmethod
+    async def _single_chunk(message: Any) -> AsyncIterator[AgentStreamResponse]:
+        content = getattr(message, "content", None)
+        yield AgentStreamResponse(
+            text=message_text(message),
+            final_message=message if content is not None else None,
+        )
+
+    async def respond(
+        self,
+        user_input: str,
+        user_id: str,
+        session_id: str,
+        context: Dict[str, Any] = None,
+        chat_history: Optional[List[ConversationMessage]] = None,
+        on_first_token: Optional[Callable[[float], Any]] = None,
+    ) -> AgentResponse:
+        """stream_request as a streaming AgentResponse, like route_request returns
+
+        Data is gathered before this returns, so the request's source report
+        is already in metadata.additional_params["neonpanel"]; ttft_ms and
+        llm_ttft_ms are added to it once the first token streams.
+        additional_params["agent_input"] is the prompt sent to the LLM: callers
+        keeping their own chat history should store it as the user turn, so
+        later turns can send only what changed.
+        """
+        started = time.perf_counter()
+        context = dict(context or {}, user_id=(context or {}).get("user_id", user_id))
+        if session_id and not context.get("session_id"):
+            context["session_id"] = session_id
+        enhanced_prompt, metadata = await self.prepare_prompt(
+            user_input, context, chat_history
+        )
+        return AgentResponse(
+            metadata=AgentProcessingResult(
+                user_input=user_input,
+                agent_id=getattr(self.llm_agent, "id", self.name),
+                agent_name=self.name,
+                user_id=user_id,
+                session_id=session_id,
+                additional_params={
+                    "neonpanel": metadata,
+                    "agent_input": enhanced_prompt,
+                },
+            ),
+            output=self._stream_llm(
+                enhanced_prompt,
+                user_id,
+                session_id,
+                chat_history,
+                started,
+                on_first_token,
+                metadata,
+            ),
             streaming=True,
-            model_id="anthropic.claude-3-sonnet-20240229-v1:0"
-        ))
-    
-    async def process_request(self, user_input: str, context: Dict[str, Any] = None) -> str:
-        """Process user request with NeonPanel-specific functionality"""
-        
+        )
+
+    async def prepare_prompt(
+        self,
+        user_input: str,
+        context: Dict[str, Any] = None,
+        chat_history: Optional[List[ConversationMessage]] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Gather NeonPanel data for user_input: the enhanced prompt and its metadata
+
+        Uses a matching prefetch() when there is one. When context has a
+        session_id, sources already sent in a prompt that is still in
+        chat_history are reduced to their changes; the prompt has to be
+        stored in the history as returned. The metadata reports every source
+        (neonpanel_sources), whether any was skipped or stale (partial),
+        gather_ms and context_tokens for this request.
+        """
         # Analyze the request to determine what NeonPanel data is needed
         neonpanel_data = await self._gather_neonpanel_data(user_input, context)
-        
+
         # Enhance the prompt with NeonPanel data
-        enhanced_prompt = self._enhance_prompt_with_data(user_input, neonpanel_data)
-        
-        # Process through the LLM agent
-        response = await self.llm_agent.process_request(enhanced_prompt, context)
-        
-        return response
-    
-    async def _gather_neonpanel_data(self, user_input: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Gather relevant NeonPanel data based on user input"""
+        session_key = (context or {}).get("session_id")
+        enhanced_prompt, context_report = self._enhance_prompt_with_data(
+            user_input, neonpanel_data, session_key, chat_history
+        )
+        sources = neonpanel_data.get("sources", {})
+        return enhanced_prompt, {
+            "neonpanel_sources": sources,
+            "partial": any(
+                source["status"] not in ("ok", "cached") for source in sources.values()
+            ),
+            "gather_ms": neonpanel_data.get("gather_ms", 0.0),
+            "context_tokens": context_report,
+        }
+
+    def prefetch(
+        self, user_input: str, context: Dict[str, Any] = None
+    ) -> Optional[Prefetch]:
+        """Start the fetches user_input will likely need, before routing picks an agent
+
+        Call as soon as a message arrives and run classification meanwhile. If
+        this agent is chosen, prepare_prompt() picks the results up; otherwise
+        call discard_prefetch(). Sources with fresh cached data are not fetched.
+        """
+        context = context or {}
+        plan = self._plan_sources(user_input, context)
+        prefetch = Prefetch(user_input, context.get("user_id"))
+        for name, (source, args, _) in plan.items():
+            cached = (
+                source.cached(*args) if source.cached and source.max_age > 0 else None
+            )
+            if cached is None or cached[1] > source.max_age:
+                prefetch.start(name, args, source.fetch(*args))
+        if not prefetch.fetches:
+            return None
+
+        with self._prefetch_lock:
+            expired = [
+                key
+                for key, old in self._prefetches.items()
+                if prefetch.created_at - old.created_at > self.prefetch_ttl
+            ]
+            expired += list(self._prefetches)[
+                : max(0, len(self._prefetches) - self.max_prefetches + 1)
+            ]
+            for key in dict.fromkeys(expired):
+                self._prefetch_stats["wasted"] += self._prefetches.pop(key).cancel()
+            replaced = self._prefetches.pop((user_input, prefetch.user_id), None)
+            if replaced is not None:
+                self._prefetch_stats["wasted"] += replaced.cancel()
+            self._prefetches[(user_input, prefetch.user_id)] = prefetch
+            self._prefetch_stats["prefetches"] += 1
+            self._prefetch_stats["fetches"] += len(prefetch.fetches)
+        return prefetch
+
+    def discard_prefetch(self, user_input: str, context: Dict[str, Any] = None):
+        """Drop the prefetch for a message another agent answers; cancels its fetches"""
+        user_id = (context or {}).get("user_id")
+        with self._prefetch_lock:
+            prefetch = self._prefetches.pop((user_input, user_id), None)
+            if prefetch is not None:
+                self._prefetch_stats["wasted"] += prefetch.cancel()
+
+    def _claim_prefetch(
+        self, user_input: str, context: Dict[str, Any]
+    ) -> Optional[Prefetch]:
+        with self._prefetch_lock:
+            prefetch = self._prefetches.pop((user_input, context.get("user_id")), None)
+        if (
+            prefetch is not None
+            and time.monotonic() - prefetch.created_at > self.prefetch_ttl
+        ):
+            with self._prefetch_lock:
+                self._prefetch_stats["wasted"] += prefetch.cancel()
+            return None
+        return prefetch
+
+    def prefetch_stats(self) -> Dict[str, Any]:
+        with self._prefetch_lock:
+            stats = dict(self._prefetch_stats, pending=len(self._prefetches))
+        stats["latency_saved_ms"] = round(stats["latency_saved_ms"], 1)
+        stats["hit_ratio"] = (
+            round(stats["used"] / stats["fetches"], 3) if stats["fetches"] else 0.0
+        )
+        return stats
+
+    async def _gather_neonpanel_data(
+        self, user_input: str, context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Gather relevant NeonPanel data based on user input
+
+        Sources run concurrently. data["sources"] reports each one as ok,
+        cached (fresh enough to skip the fetch), stale (timed out or failed,
+        older cached data used), timeout or error, with its relevance.
+        """
         data = {}
-        
-        # Convert to lowercase for easier matching
-        input_lower = user_input.lower()
-        
-        try:
-            # If asking about servers or stats
-            if any(keyword in input_lower for keyword in ['server', 'stats', 'status', 'performance']):
-                data['server_stats'] = await neonpanel_client.get_server_stats()
-            
-            # If asking about users
-            if any(keyword in input_lower for keyword in ['user', 'account', 'profile']):
-                # Get user ID from context if available
-                user_id = context.get('user_id') if context else None
-                if user_id:
-                    data['user_data'] = await neonpanel_client.get_user_data(user_id)
-            
-            # If asking about search or specific resources
-            if any(keyword in input_lower for keyword in ['search', 'find', 'list', 'show']):
-                # Extract search terms (simple implementation)
-                search_terms = self._extract_search_terms(user_input)
-                if search_terms:
-                    data['search_results'] = await neonpanel_client.search_resources(search_terms)
-        
-        except Exception as e:
-            print(f"Error gathering NeonPanel data: {e}")
-            data['error'] = str(e)
-        
+        context = context or {}
+        plan = self._plan_sources(user_input, context)
+        prefetch = self._claim_prefetch(user_input, context)
+        if not plan:
+            if prefetch is not None:
+                with self._prefetch_lock:
+                    self._prefetch_stats["wasted"] += prefetch.cancel()
+            return data
+
+        started = time.perf_counter()
+        claimed_at = time.monotonic()
+        prefetched = prefetch.fetches if prefetch is not None else {}
+        report = {}
+        tasks = {}
+        used, saved = 0, 0.0
+        for name, (source, args, relevance) in plan.items():
+            if name in prefetched and prefetched[name][0] == args:
+                _, future, fetch_started = prefetched[name]
+                # How long the fetch had run (or took in full) before we needed it
+                saved += prefetch.finished_at.get(name, claimed_at) - fetch_started
+                used += 1
+                tasks[name] = asyncio.ensure_future(
+                    asyncio.wait_for(asyncio.wrap_future(future), self.source_timeout)
+                )
+                continue
+            cached = (
+                source.cached(*args) if source.cached and source.max_age > 0 else None
+            )
+            if cached is not None and cached[1] <= source.max_age:
+                data[name] = cached[0]
+                report[name] = {
+                    "status": "cached",
+                    "relevance": relevance,
+                    "age_seconds": round(cached[1], 1),
+                }
+            else:
+                tasks[name] = asyncio.ensure_future(
+                    asyncio.wait_for(source.fetch(*args), self.source_timeout)
+                )
+        if prefetch is not None:
+            for name, (args, future, _) in prefetched.items():
+                if name not in plan or plan[name][1] != args:
+                    future.cancel()
+            with self._prefetch_lock:
+                self._prefetch_stats["used"] += used
+                self._prefetch_stats["wasted"] += len(prefetched) - used
+                self._prefetch_stats["latency_saved_ms"] += saved * 1000
+
+        pending = set()
+        if tasks:
+            _, pending = await asyncio.wait(
+                tasks.values(), timeout=self.gather_deadline
+            )
+        for task in pending:
+            task.cancel()
+
+        for name, task in tasks.items():
+            source, args, relevance = plan[name]
+            if task in pending or isinstance(task.exception(), asyncio.TimeoutError):
+                limit = min(self.source_timeout, self.gather_deadline)
+                status, error = "timeout", f"no response within {limit:g}s"
+            elif task.exception() is not None:
+                status, error = "error", str(task.exception())
+            elif isinstance(task.result(), dict) and "error" in task.result():
+                # The client reports failures as {"error": ...} instead of raising
+                status, error = "error", task.result()["error"]
+            else:
+                data[name] = task.result()
+                report[name] = {"status": "ok", "relevance": relevance}
+                if name in prefetched:
+                    report[name]["prefetched"] = True
+                continue
+
+            report[name] = {"status": status, "relevance": relevance, "error": error}
+            cached = source.cached(*args) if source.cached else None
+            if cached is not None:
+                data[name], age = cached
+                report[name].update(status="stale", age_seconds=round(age, 1))
+
+        data["sources"] = report
+        data["gather_ms"] = round((time.perf_counter() - started) * 1000, 1)
         return data
-    
+
+    def _plan_sources(
+        self, user_input: str, context: Dict[str, Any]
+    ) -> Dict[str, tuple]:
+        """Pick the data sources worth fetching: {name: (source, args, relevance)}"""
+        plan = {}
+        for source, relevance in self.sources.select(user_input):
+            args = source.prepare(user_input, context)
+            if args is not None:
+                plan[source.name] = (source, args, relevance)
+        return plan
+
+    def register_source(self, source: DataSource) -> DataSource:
+        """Add a data source the agent can pull into its prompts"""
+        return self.sources.register(source)
+
+    def _default_sources(self) -> List[DataSource]:
+        return [
+            DataSource(
+                "server_stats",
+                {
+                    "server": 0.6,
+                    "stats": 0.9,
+                    "statistics": 0.9,
+                    "status": 0.8,
+                    "performance": 0.8,
+                    "cpu": 0.7,
+                    "memory": 0.7,
+                    "disk": 0.7,
+                    "load": 0.5,
+                    "uptime": 0.7,
+                },
+                fetch=lambda: neonpanel_client.get_server_stats(
+                    priority=PRIORITY_BACKGROUND
+                ),
+                cached=lambda: neonpanel_client.peek_cached(("server_stats",)),
+                cost=0.3,
+                max_age=neonpanel_client.cache_ttls["server_stats"],
+                label="Server Statistics",
+            ),
+            DataSource(
+                "user_data",
+                {"user": 0.6, "account": 0.8, "profile": 0.8},
+                fetch=lambda user_id: neonpanel_client.get_user_data(
+                    user_id, priority=PRIORITY_BACKGROUND
+                ),
+                cached=lambda user_id: neonpanel_client.peek_cached(
+                    ("user_data", user_id)
+                ),
+                prepare=lambda user_input, context: (context["user_id"],)
+                if context.get("user_id")
+                else None,
+                cost=0.3,
+                max_age=neonpanel_client.cache_ttls["user_data"],
+                label="User Data",
+            ),
+            DataSource(
+                "search_results",
+                {"search": 0.9, "find": 0.9, "list": 0.7, "show": 0.5, "which": 0.4},
+                fetch=self._search,
+                cached=self._cached_search,
+                prepare=self._search_args,
+                cost=1.0,
+                label="Search Results",
+            ),
+        ]
+
+    def _search_args(self, user_input: str, context: Dict[str, Any]) -> Optional[tuple]:
+        search_terms = self._extract_search_terms(user_input)
+        return (search_terms,) if search_terms else None
+
+    async def _search(self, search_terms: str) -> List[Dict[str, Any]]:
+        return [
+            result
+            async for result in neonpanel_client.iter_search_resources(
+                search_terms,
+                max_results=self.max_search_results,
+                priority=PRIORITY_BACKGROUND,
+            )
+        ]
+
+    def _cached_search(self, search_terms: str) -> Optional[tuple]:
+        page_size = min(neonpanel_client.search_page_size, self.max_search_results)
+        cached = neonpanel_client.peek_cached(("search", search_terms, None, page_size))
+        if cached is None:
+            return None
+        page, age = cached
+        return list(page.get("results", []))[: self.max_search_results], age
+
     def _extract_search_terms(self, user_input: str) -> str:
         """Extract search terms from user input (simple implementation)"""
         # Remove common words and extract meaningful terms
-        stop_words = {'what', 'is', 'are', 'the', 'show', 'me', 'list', 'find', 'search', 'for'}
+        stop_words = {
+            "what",
+            "is",
+            "are",
+            "the",
+            "show",
+            "me",
+            "list",
+            "find",
+            "search",
+            "for",
+        }
         words = user_input.lower().split()
-        search_terms = [word for word in words if word not in stop_words and len(word) > 2]
-        return ' '.join(search_terms[:3])  # Limit to first 3 meaningful terms
-    
-    def _enhance_prompt_with_data(self, user_input: str, neonpanel_data: Dict[str, Any]) -> str:
-        """Enhance the user prompt with NeonPanel data"""
+        search_terms = [
+            word for word in words if word not in stop_words and len(word) > 2
+        ]
+        return " ".join(search_terms[:3])  # Limit to first 3 meaningful terms
+
+    def _render_context(
+        self,
+        user_input: str,
+        neonpanel_data: Dict[str, Any],
+        session_key: Any = None,
+        chat_history: Optional[List[ConversationMessage]] = None,
+    ) -> tuple:
+        """Compact text for gathered sources, most relevant first, and a token report
+
+        With a session key, sources the LLM has seen in chat_history are
+        reduced to their changes; the report then also has each source's mode
+        and the tokens the full rendering would have taken.
+        """
+        report = neonpanel_data.get("sources", {})
+        sections = sorted(
+            (
+                (source.name, source.label, neonpanel_data[source.name])
+                for source in self.sources
+                if source.name in neonpanel_data
+            ),
+            key=lambda section: report.get(section[0], {}).get("relevance", 0.0),
+            reverse=True,
+        )
+        query = self._extract_search_terms(user_input)
+        if session_key is None or self.context_differ is None:
+            return self.context_renderer.render(sections, query=query)
+
+        history = [message_text(message) for message in chat_history or ()]
+        sent, modes = self.context_differ.apply(session_key, sections, history)
+        if all(mode == "full" for mode in modes.values()):
+            text, rendered = self.context_renderer.render(sections, query=query)
+            return text, dict(
+                rendered, modes=modes, full_context_tokens=rendered["rendered_tokens"]
+            )
+
+        full_text, _ = self.context_renderer.render(sections, query=query, record=False)
+        full_tokens = estimate_tokens(full_text)
+        text, rendered = self.context_renderer.render(sent, query=query)
+        if rendered["rendered_tokens"] + estimate_tokens(DIFF_NOTE) >= full_tokens:
+            # Small sources are cheaper to resend than to explain as a diff
+            text, rendered = self.context_renderer.render(sections, query=query)
+            modes = {name: "full" for name in modes}
+        return text, dict(rendered, modes=modes, full_context_tokens=full_tokens)
+
+    def _enhance_prompt_with_data(
+        self,
+        user_input: str,
+        neonpanel_data: Dict[str, Any],
+        session_key: Any = None,
+        chat_history: Optional[List[ConversationMessage]] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Add NeonPanel data to the user prompt; returns it and its token report"""
         enhanced_prompt = f"User Question: {user_input}\n\n"
-        
+        report: Dict[str, Any] = {}
+
         if neonpanel_data:
             enhanced_prompt += "Available NeonPanel Data:\n"
-            
-            if 'server_stats' in neonpanel_data:
-                enhanced_prompt += f"Server Statistics: {neonpanel_data['server_stats']}\n"
-            
-            if 'user_data' in neonpanel_data:
-                enhanced_prompt += f"User Data: {neonpanel_data['user_data']}\n"
-            
-            if 'search_results' in neonpanel_data:
-                enhanced_prompt += f"Search Results: {neonpanel_data['search_results']}\n"
-            
-            if 'error' in neonpanel_data:
-                enhanced_prompt += f"Note: There was an issue accessing some data: {neonpanel_data['error']}\n"
-            
-            enhanced_prompt += "\nPlease answer the user's question using the available NeonPanel data above. If no relevant data is available, provide a helpful response based on your knowledge of NeonPanel operations.\n"
-        
-        return enhanced_prompt
+
+            context, report = self._render_context(
+                user_input, neonpanel_data, session_key, chat_history
+            )
+            if context:
+                enhanced_prompt += context + "\n"
+            if any(mode != "full" for mode in report.get("modes", {}).values()):
+                enhanced_prompt += DIFF_NOTE
+
+            if "error" in neonpanel_data:
+                enhanced_prompt += (
+                    "Note: There was an issue accessing some data: "
+                    f"{neonpanel_data['error']}\n"
+                )
+
+            for name, source in neonpanel_data.get("sources", {}).items():
+                label = self.sources.get(name).label if self.sources.get(name) else name
+                if source["status"] == "stale":
+                    enhanced_prompt += (
+                        f"Note: {label} is cached data from "
+                        f"{source['age_seconds']:g}s ago ({source['error']}).\n"
+                    )
+                elif source["status"] not in ("ok", "cached"):
+                    enhanced_prompt += (
+                        f"Note: {label} was skipped ({source['error']}); "
+                        "say so if it matters to the answer.\n"
+                    )
+
+            enhanced_prompt += (
+                "\nPlease answer the user's question using the available NeonPanel "
+                "data above. If no relevant data is available, provide a helpful "
+                "response based on your knowledge of NeonPanel operations.\n"
+            )
+
+            # Input tokens this turn as sent, and as they would be without diffing
+            after = estimate_tokens(enhanced_prompt)
+            sent = report.get("rendered_tokens", 0)
+            before = after - sent + report.get("full_context_tokens", sent)
+            report["input_tokens"] = {"before": before, "after": after}
+            if session_key is not None and self.context_differ is not None:
+                self.context_differ.record_prompt(session_key, enhanced_prompt)
+                self.context_differ.record_tokens(session_key, before, after)
+
+        return enhanced_prompt, report
+
+
+class NeonPanelSquadAgent(Agent):
+    """agent_squad adapter so an orchestrator can route to a (pooled) NeonPanelAgent
+
+    Adapters are cheap; create one per orchestrator around a shared agent.
+    The orchestrator stores input_text rather than the enhanced prompt in
+    its history, so every turn carries the full NeonPanel data.
+    """
+
+    def __init__(self, neonpanel_agent: NeonPanelAgent):
+        super().__init__(
+            AgentOptions(
+                name=neonpanel_agent.name, description=neonpanel_agent.description
+            )
+        )
+        self.neonpanel_agent = neonpanel_agent
+
+    def is_streaming_enabled(self) -> bool:
+        llm_agent = self.neonpanel_agent.llm_agent
+        return (
+            llm_agent.is_streaming_enabled()
+            if hasattr(llm_agent, "is_streaming_enabled")
+            else False
+        )
+
+    async def process_request(
+        self,
+        input_text: str,
+        user_id: str,
+        session_id: str,
+        chat_history: List[ConversationMessage],
+        additional_params: Optional[Dict[str, str]] = None,
+    ):
+        context = dict(additional_params or {}, user_id=user_id, session_id=session_id)
+        metadata: Dict[str, Any] = {}
+        if additional_params is not None:
+            # The orchestrator builds the response metadata from this same dict
+            # after dispatching, so the source report reaches the caller
+            additional_params["neonpanel"] = metadata
+        return await self.neonpanel_agent.process_request(
+            input_text, context, user_id, session_id, chat_history, metadata
+        )
+
 
 # Factory function for easy integration
-def create_neonpanel_agent() -> NeonPanelAgent:
-    """Create and return a NeonPanel agent instance"""
-    return NeonPanelAgent()
+def create_neonpanel_agent(llm_agent=None) -> NeonPanelAgent:
+    """Create a new NeonPanel agent (get_neonpanel_agent returns a shared one)"""
+    return NeonPanelAgent(llm_agent=llm_agent)
+
+
+# Process-wide pool: sessions with the same configuration share one agent,
+# and with it the LLM client and its warm connections
+neonpanel_agent_pool = AgentPool(
+    max_size=int(os.getenv("NEONPANEL_AGENT_POOL_SIZE", "8")),
+    idle_timeout=float(os.getenv("NEONPANEL_AGENT_POOL_IDLE_TIMEOUT", "900")),
+)
+
+
+def llm_config_key(*parts: Any) -> str:
+    """Pool key for an LLM configuration, hashed so API keys are never kept in clear"""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+
+def get_neonpanel_agent(
+    llm_key: Hashable = None,
+    llm_factory: Optional[Callable[[], Any]] = None,
+    **options: Any,
+) -> NeonPanelAgent:
+    """Shared NeonPanelAgent for this configuration, from the process-wide pool
+
+    llm_key identifies what llm_factory builds (use llm_config_key() for
+    anything containing secrets); options are NeonPanelAgent arguments.
+    """
+    key = (llm_key, tuple(sorted(options.items())))
+    return neonpanel_agent_pool.get(
+        key,
+        lambda: NeonPanelAgent(
+            llm_agent=llm_factory() if llm_factory else None, **options
+        ),
+    )
@@ -4,147 +4,1319 @@ Handles communication with NeonPanel API through MCP server
 """
 
 import os
-import json
 import asyncio
+import threading
+import time
 import httpx
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterable, Tuple
 from dotenv import load_dotenv
 
+from .batching import BatchLoader
+from .catalog import CatalogMirror
+from .decoding import JSON_BACKEND, SearchPage, loads
+from .cache import ResponseCache, Validated, Validators, FRESH, STALE
+from .event_loop import shared_loop
+from .mcp_session import MCPConnectionError, MCPSession
+from .rate_limit import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    rate_limiter,
+    retry_after_seconds,
+)
+from .resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    hedged,
+    is_server_failure,
+)
+from .simulator import FleetSimulator
+from .singleflight import SingleFlight
+from .timeseries import StatsTimeSeries
+
 load_dotenv()
 
+# MCP resource whose update notifications mean the fleet stats changed
+STATS_RESOURCE_URI = "neonpanel://servers/stats"
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
 class NeonPanelMCPClient:
     """Client for communicating with NeonPanel via MCP server"""
-    
+
     def __init__(self, demo_mode=False):
         self.base_url = os.getenv("NEONPANEL_BASE_URL", "https://api.neonpanel.com")
         self.api_key = os.getenv("NEONPANEL_API_KEY")
-        self.mcp_server_url = os.getenv("NEONPANEL_MCP_SERVER_URL", "http://localhost:3000")
+        self.mcp_server_url = os.getenv(
+            "NEONPANEL_MCP_SERVER_URL", "http://localhost:3000"
+        )
         self.demo_mode = demo_mode or not self.api_key
-        
+        # "rest" calls base_url directly; "mcp" sends tool calls over one
+        # persistent MCP session with mcp_server_url (WebSocket)
+        self.transport = os.getenv("NEONPANEL_TRANSPORT", "rest").lower()
+
         if not self.api_key and not demo_mode:
             import warnings
+
             warnings.warn("NEONPANEL_API_KEY not found - running in demo mode")
             self.demo_mode = True
-    
-    async def get_user_data(self, user_id: str) -> Dict[str, Any]:
+
+        # Connection pool settings for the shared transport
+        self.http2 = (
+            HTTP2_AVAILABLE and os.getenv("NEONPANEL_HTTP2", "true").lower() == "true"
+        )
+        self.max_connections = int(os.getenv("NEONPANEL_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = int(
+            os.getenv("NEONPANEL_MAX_KEEPALIVE_CONNECTIONS", "20")
+        )
+        self.keepalive_expiry = float(os.getenv("NEONPANEL_KEEPALIVE_EXPIRY", "30"))
+        self.connect_timeout = float(os.getenv("NEONPANEL_CONNECT_TIMEOUT", "5"))
+        self.request_timeout = float(os.getenv("NEONPANEL_REQUEST_TIMEOUT", "10"))
+
+        self._loop = shared_loop
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._mcp_session: Optional[MCPSession] = None
+        self._stats_listeners = []
+
+        # Resilience: retries for idempotent calls, per-endpoint circuit breakers,
+        # and hedged requests for reads that opt in (0 disables hedging)
+        self.retry_policy = RetryPolicy(
+            max_attempts=int(os.getenv("NEONPANEL_RETRY_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("NEONPANEL_RETRY_BASE_DELAY", "0.2")),
+            max_delay=float(os.getenv("NEONPANEL_RETRY_MAX_DELAY", "5")),
+        )
+        self.breaker_threshold = int(os.getenv("NEONPANEL_BREAKER_THRESHOLD", "5"))
+        self.breaker_reset_timeout = float(
+            os.getenv("NEONPANEL_BREAKER_RESET_TIMEOUT", "30")
+        )
+        self.hedge_delay = float(os.getenv("NEONPANEL_HEDGE_DELAY", "0"))
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._retries: Dict[str, int] = {}
+        self._hedges = {"fired": 0, "won": 0}
+
+        # Process-wide token buckets: dashboard reads (interactive) are released
+        # ahead of agent and refresh traffic (background)
+        self.rate_limiter = rate_limiter
+
+        # Response cache: TTLs in seconds per endpoint, stale entries are served
+        # for up to NEONPANEL_CACHE_STALE_TTL while a background refresh runs
+        self.cache_ttls = {
+            "server_stats": float(os.getenv("NEONPANEL_CACHE_TTL_STATS", "5")),
+            "user_data": float(os.getenv("NEONPANEL_CACHE_TTL_USERS", "60")),
+            "search": float(os.getenv("NEONPANEL_CACHE_TTL_SEARCH", "30")),
+        }
+        self.cache = ResponseCache(
+            max_entries=int(os.getenv("NEONPANEL_CACHE_MAX_ENTRIES", "1024")),
+            stale_ttl=float(os.getenv("NEONPANEL_CACHE_STALE_TTL", "60")),
+        )
+        self._refreshing = set()
+
+        # Conditional requests: cached bodies keep their ETag/Last-Modified so a
+        # refetch can be answered with 304, and stats polling asks only for
+        # changes since the last cursor when the API supports it
+        self.conditional_requests = (
+            os.getenv("NEONPANEL_CONDITIONAL_REQUESTS", "true").lower() == "true"
+        )
+        self._transfer: Dict[str, Dict[str, int]] = {}
+
+        # Identical concurrent reads share one request; the shared loop makes
+        # this hold across the separate loops the Streamlit pages run
+        self.flights = SingleFlight()
+
+        # Bulk user lookups: batch endpoint if the API has one, else bounded fan-out
+        self.users_batch_size = int(os.getenv("NEONPANEL_USERS_BATCH_SIZE", "100"))
+        self.bulk_concurrency = int(os.getenv("NEONPANEL_BULK_CONCURRENCY", "10"))
+        self._users_batch_supported: Optional[bool] = None
+        self._user_loader = BatchLoader(
+            self._fetch_users_batch,
+            max_batch_size=self.users_batch_size,
+            max_concurrency=max(1, self.bulk_concurrency // 2),
+        )
+        self._fanout_semaphore: Optional[asyncio.Semaphore] = None
+
+        # Every stats sample fetched is kept for the dashboard's Trends panel
+        self.stats_history = StatsTimeSeries(
+            capacity=int(os.getenv("NEONPANEL_STATS_HISTORY", "2880"))
+        )
+
+        # Paginated search: page size and how many pages to buffer ahead of the reader
+        self.search_page_size = int(os.getenv("NEONPANEL_SEARCH_PAGE_SIZE", "50"))
+        self.search_prefetch_pages = int(
+            os.getenv("NEONPANEL_SEARCH_PREFETCH_PAGES", "2")
+        )
+
+        # Local catalog mirror (opt-in): searches are answered from SQLite while
+        # the last sync is younger than NEONPANEL_CATALOG_MAX_STALENESS seconds.
+        # Incremental syncs run every sync interval; an API without a changes
+        # feed is re-read in full only at startup and every full sync interval
+        self.catalog_enabled = (
+            os.getenv("NEONPANEL_CATALOG_MIRROR", "false").lower() == "true"
+        )
+        self.catalog_path = os.getenv("NEONPANEL_CATALOG_PATH", "neonpanel_catalog.db")
+        self.catalog_max_staleness = float(
+            os.getenv("NEONPANEL_CATALOG_MAX_STALENESS", "300")
+        )
+        self.catalog_sync_interval = float(
+            os.getenv("NEONPANEL_CATALOG_SYNC_INTERVAL", "60")
+        )
+        self.catalog_full_sync_interval = float(
+            os.getenv("NEONPANEL_CATALOG_FULL_SYNC_INTERVAL", "3600")
+        )
+        self.catalog_page_size = int(os.getenv("NEONPANEL_CATALOG_PAGE_SIZE", "500"))
+        self._catalog: Optional[CatalogMirror] = None
+        self._catalog_lock = threading.Lock()
+        self._catalog_sync_job = None
+        self._catalog_wakeup: Optional[asyncio.Event] = None
+        self._changes_feed_supported: Optional[bool] = None
+        self._last_full_sync: Optional[float] = None
+
+        # Demo mode answers from a seeded fleet simulator, built on first use
+        self.demo_fleet_size = int(os.getenv("NEONPANEL_DEMO_FLEET_SIZE", "20"))
+        self.demo_resource_count = int(
+            os.getenv("NEONPANEL_DEMO_RESOURCE_COUNT", "100")
+        )
+        self.demo_seed = int(os.getenv("NEONPANEL_DEMO_SEED", "42"))
+        self._simulator: Optional[FleetSimulator] = None
+        self._simulator_lock = threading.Lock()
+
+    @property
+    def simulator(self) -> FleetSimulator:
+        """The demo fleet (pages may run on different threads, so creation is locked)"""
+        if self._simulator is None:
+            with self._simulator_lock:
+                if self._simulator is None:
+                    self._simulator = FleetSimulator(
+                        fleet_size=self.demo_fleet_size,
+                        resource_count=self.demo_resource_count,
+                        seed=self.demo_seed,
+                    )
+        return self._simulator
+
+    @property
+    def catalog(self) -> Optional[CatalogMirror]:
+        """The local catalog mirror; None in demo mode, over MCP (it syncs via REST)
+        or when disabled
+        """
+        if self.demo_mode or self.transport == "mcp" or not self.catalog_enabled:
+            return None
+        if self._catalog is None:
+            with self._catalog_lock:
+                if self._catalog is None:
+                    self._catalog = CatalogMirror(
+                        self.catalog_path, self.catalog_max_staleness
+                    )
+        return self._catalog
+
+    def _headers(self) -> Dict[str, str]:
+        """Build request headers (the API key may be changed at runtime by the pages)"""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on the shared loop if needed"""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    self.request_timeout, connect=self.connect_timeout
+                ),
+            )
+        return self._http_client
+
+    async def startup(self):
+        """Open the connection pool ahead of the first request"""
+        if not self.demo_mode:
+            await self._loop.run(self._startup())
+
+    async def _startup(self):
+        if self.transport == "mcp":
+            await self._mcp().start()
+        else:
+            self._get_http_client()
+
+    async def shutdown(self):
+        """Close pooled connections; the pool is recreated lazily on next use"""
+        await self._loop.run(self._shutdown())
+
+    async def _shutdown(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        if self._mcp_session is not None:
+            await self._mcp_session.close()
+            self._mcp_session = None
+
+    def _mcp(self) -> MCPSession:
+        """The persistent MCP session, created on the shared loop on first use"""
+        if self._mcp_session is None:
+            self._mcp_session = MCPSession(
+                self.mcp_server_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                connect_timeout=self.connect_timeout,
+            )
+            self._mcp_session.on_notification(
+                "notifications/resources/updated", self._on_resource_updated
+            )
+            self._loop.loop.create_task(self._mcp_session.subscribe(STATS_RESOURCE_URI))
+        return self._mcp_session
+
+    async def _call_tool(
+        self,
+        name: str,
+        arguments: Dict[str, Any],
+        endpoint: str,
+        priority: int = PRIORITY_INTERACTIVE,
+        idempotent: bool = True,
+        decode=loads,
+    ) -> Any:
+        """Call an MCP tool over the shared session, from any caller's event loop
+
+        Uses the same rate limiter and circuit breakers as HTTP requests.
+        Idempotent tools are retried when the connection drops mid-call, once
+        the session has reconnected.
+        """
+        return await self._loop.run(
+            self._call_tool_on_loop(
+                name, arguments, endpoint, priority, idempotent, decode
+            )
+        )
+
+    async def _call_tool_on_loop(
+        self,
+        name: str,
+        arguments: Dict[str, Any],
+        endpoint: str,
+        priority: int,
+        idempotent: bool,
+        decode,
+    ) -> Any:
+        session = self._mcp()
+        breaker = self._breaker(endpoint)
+        attempts = self.retry_policy.max_attempts
+        last_error: Optional[Exception] = None
+        for attempt in range(attempts):
+            await self.rate_limiter.acquire(endpoint, priority)
+            self._admit(breaker, endpoint, last_error)
+            try:
+                result = await session.call_tool(
+                    name, arguments, timeout=self.request_timeout, decode=decode
+                )
+            except Exception as e:
+                last_error = e
+                if is_server_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                retryable = idempotent and isinstance(
+                    e, (MCPConnectionError, asyncio.TimeoutError)
+                )
+                if attempt + 1 >= attempts or not retryable:
+                    raise
+                self._retries[endpoint] = self._retries.get(endpoint, 0) + 1
+                await asyncio.sleep(self.retry_policy.backoff(attempt))
+            except BaseException:
+                # Cancelled mid-call: no outcome to record, but the probe slot
+                # must be freed or a half-open breaker rejects calls for good
+                breaker.release_probe()
+                raise
+            else:
+                breaker.record_success()
+                return result
+
+    def _on_resource_updated(self, params: Dict[str, Any]):
+        # Runs on the shared loop when the MCP server pushes a resource change
+        if params.get("uri") != STATS_RESOURCE_URI:
+            return
+        key = ("server_stats",)
+        self.cache.invalidate(key=key)
+
+        async def refresh():
+            try:
+                stats = await self.flights.do(
+                    key,
+                    lambda: self._fetch_and_store(
+                        key, self._fetch_server_stats, PRIORITY_BACKGROUND
+                    ),
+                )
+            except Exception as e:
+                print(f"Error refreshing server stats after notification: {e}")
+                return
+            for listener in list(self._stats_listeners):
+                try:
+                    listener(stats)
+                except Exception as e:
+                    print(f"Error in server stats listener: {e}")
+
+        return refresh()
+
+    def add_stats_listener(self, callback):
+        """Call callback(stats) whenever the MCP server reports changed stats
+
+        Callbacks run on the shared NeonPanel loop thread and must not block.
+        """
+        self._stats_listeners.append(callback)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        timeout: Optional[float] = None,
+        idempotent: Optional[bool] = None,
+        hedge: bool = False,
+        priority: int = PRIORITY_INTERACTIVE,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a request over the shared pool, from any caller's event loop
+
+        Every attempt waits for a rate-limiter token in its priority lane and goes
+        through the endpoint's circuit breaker. Idempotent calls (GET by default)
+        are retried with backoff, and any call is retried after a 429 once the
+        Retry-After pause has passed. hedge=True races a backup request when the
+        first is slower than hedge_delay.
+        """
+        if idempotent is None:
+            idempotent = method == "GET"
+        return await self._loop.run(
+            self._send(
+                method, path, endpoint, timeout, idempotent, hedge, priority, **kwargs
+            )
+        )
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self._breakers:
+            self._breakers[endpoint] = CircuitBreaker(
+                self.breaker_threshold, self.breaker_reset_timeout
+            )
+        return self._breakers[endpoint]
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        timeout: Optional[float],
+        idempotent: bool,
+        hedge: bool,
+        priority: int,
+        **kwargs,
+    ) -> httpx.Response:
+        # Runs on the shared loop, which owns the pool's connections
+        breaker = self._breaker(endpoint)
+        attempts = self.retry_policy.max_attempts
+        last_error: Optional[Exception] = None
+        for attempt in range(attempts):
+            await self.rate_limiter.acquire(endpoint, priority)
+            self._admit(breaker, endpoint, last_error)
+            try:
+                if hedge and self.hedge_delay > 0:
+                    response, index = await hedged(
+                        lambda: self._send_once(method, path, timeout, **kwargs),
+                        self.hedge_delay,
+                        on_hedge=self._count_hedge,
+                    )
+                    if index:
+                        self._hedges["won"] += 1
+                else:
+                    response = await self._send_once(method, path, timeout, **kwargs)
+            except Exception as e:
+                last_error = e
+                if is_server_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                throttled = (
+                    isinstance(e, httpx.HTTPStatusError)
+                    and e.response.status_code == 429
+                )
+                retryable = self.retry_policy.should_retry(e) and (
+                    idempotent or throttled
+                )
+                if attempt + 1 >= attempts or not retryable:
+                    raise
+                self._retries[endpoint] = self._retries.get(endpoint, 0) + 1
+                if throttled:
+                    # A 429 means the request was not processed; the limiter holds
+                    # every caller of this endpoint until Retry-After has passed
+                    delay = retry_after_seconds(e.response)
+                    self.rate_limiter.pause(
+                        endpoint,
+                        delay
+                        if delay is not None
+                        else self.retry_policy.backoff(attempt),
+                    )
+                else:
+                    await asyncio.sleep(self.retry_policy.backoff(attempt))
+            except BaseException:
+                breaker.release_probe()
+                raise
+            else:
+                breaker.record_success()
+                return response
+
+    @staticmethod
+    def _admit(breaker: CircuitBreaker, endpoint: str, last_error: Optional[Exception]):
+        # A breaker opened by this call's own retries reports the upstream
+        # error that opened it, not CircuitOpenError
+        try:
+            breaker.before_call(endpoint)
+        except CircuitOpenError:
+            if last_error is not None:
+                raise last_error
+            raise
+
+    def _count_hedge(self):
+        self._hedges["fired"] += 1
+
+    async def _send_once(
+        self, method: str, path: str, timeout: Optional[float], **kwargs
+    ) -> httpx.Response:
+        client = self._get_http_client()
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout, connect=self.connect_timeout)
+        headers = dict(self._headers(), **kwargs.pop("headers", {}))
+        response = await client.request(method, path, headers=headers, **kwargs)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    async def _conditional_get(
+        self,
+        key: tuple,
+        path: str,
+        endpoint: str,
+        priority: int,
+        params: Optional[Dict[str, Any]] = None,
+        hedge: bool = False,
+        delta: bool = False,
+        decode=loads,
+    ) -> Validated:
+        """GET path, revalidating the body cached under key when it has validators
+
+        A 304 returns the cached body unchanged. With delta=True and a cursor
+        from the previous response, the API may answer with only the changed
+        fields (X-Delta: true), which are merged into the cached body.
+        decode(bytes) turns a full response body into the value to cache.
+        """
+        previous = self.cache.peek(key) if self.conditional_requests else None
+        validators = previous.validators if previous is not None else None
+        params = dict(params or {})
+        headers: Dict[str, str] = {}
+        if validators:
+            if validators.etag:
+                headers["If-None-Match"] = validators.etag
+            if validators.last_modified:
+                headers["If-Modified-Since"] = validators.last_modified
+            if delta and validators.cursor:
+                params["since"] = validators.cursor
+
+        response = await self._request(
+            "GET",
+            path,
+            endpoint,
+            hedge=hedge,
+            priority=priority,
+            params=params,
+            headers=headers,
+        )
+        transfer = self._transfer.setdefault(
+            endpoint,
+            {
+                "requests": 0,
+                "conditional": 0,
+                "not_modified": 0,
+                "deltas": 0,
+                "bytes_received": 0,
+                "bytes_saved": 0,
+            },
+        )
+        transfer["requests"] += 1
+        transfer["conditional"] += 1 if headers else 0
+        transfer["bytes_received"] += len(response.content)
+
+        if response.status_code == 304 and validators:
+            transfer["not_modified"] += 1
+            transfer["bytes_saved"] += max(0, validators.size - len(response.content))
+            return Validated(previous.value, validators)
+
+        size = len(response.content)
+        if response.headers.get("X-Delta", "").lower() == "true" and validators:
+            transfer["deltas"] += 1
+            transfer["bytes_saved"] += max(0, validators.size - size)
+            body = self._apply_delta(previous.value, loads(response.content))
+            size = validators.size
+        else:
+            body = decode(response.content)
+        return Validated(
+            body,
+            Validators(
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                cursor=response.headers.get("X-Changes-Cursor"),
+                size=size,
+            ),
+        )
+
+    @staticmethod
+    def _apply_delta(previous: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+        merged = dict(previous, **delta.get("changes", {}))
+        for field in delta.get("removed", []):
+            merged.pop(field, None)
+        return merged
+
+    async def _cached(
+        self, key: tuple, fetch, priority: int = PRIORITY_INTERACTIVE
+    ) -> Any:
+        """Serve key from the cache, fetching on a miss and revalidating stale entries
+
+        fetch(priority) performs the request; refreshes, which run in the
+        background, use the background lane.
+        """
+        entry, state = self.cache.lookup(key)
+        if state == FRESH:
+            return entry.value
+        if state == STALE:
+            self._schedule_refresh(key, fetch)
+            return entry.value
+        return await self.flights.do(
+            key, lambda: self._fetch_and_store(key, fetch, priority)
+        )
+
+    async def _fetch_and_store(self, key: tuple, fetch, priority: int) -> Any:
+        value = await fetch(priority)
+        validators = None
+        if isinstance(value, Validated):
+            value, validators = value.value, value.validators
+        self.cache.set(key, value, self.cache_ttls[key[0]], validators)
+        return value
+
+    def _schedule_refresh(self, key: tuple, fetch):
+        # Must be called on the shared loop so the refresh outlives the caller's loop
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                await self.flights.do(
+                    key, lambda: self._fetch_and_store(key, fetch, PRIORITY_BACKGROUND)
+                )
+            except Exception as e:
+                print(f"Error refreshing cached {key[0]}: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        asyncio.get_running_loop().create_task(refresh())
+
+    def peek_cached(self, key: tuple) -> Optional[Tuple[Any, float]]:
+        """(value, age in seconds) of whatever is cached under key, however old, or None
+
+        For callers that would rather show stale data than nothing, e.g. on timeout.
+        """
+        entry = self.cache.peek(key)
+        return (entry.value, entry.age) if entry is not None else None
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counters for dashboards and scraping"""
+        return self.cache.stats()
+
+    def metrics(self) -> Dict[str, Any]:
+        """All client counters in one dictionary"""
+        return {
+            "cache": self.cache_stats(),
+            "singleflight": self.flights.stats(),
+            "user_batches": dict(
+                self._user_loader.stats(), batch_endpoint=self._users_batch_supported
+            ),
+            "resilience": self.resilience_stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "conditional": self.conditional_stats(),
+            "catalog": self.catalog.stats() if self.catalog is not None else None,
+            "json_backend": JSON_BACKEND,
+            "mcp": self._mcp_session.stats() if self._mcp_session is not None else None,
+        }
+
+    def conditional_stats(self) -> Dict[str, Any]:
+        """304 and delta rates and bytes saved by conditional requests, per endpoint"""
+        endpoints = {}
+        totals: Dict[str, int] = {}
+        for endpoint, counters in self._transfer.items():
+            endpoints[endpoint] = dict(
+                counters,
+                not_modified_rate=round(
+                    counters["not_modified"] / counters["requests"], 3
+                )
+                if counters["requests"]
+                else 0.0,
+            )
+            for counter, amount in counters.items():
+                totals[counter] = totals.get(counter, 0) + amount
+        requests = totals.get("requests", 0)
+        return {
+            "enabled": self.conditional_requests,
+            "not_modified_rate": round(totals.get("not_modified", 0) / requests, 3)
+            if requests
+            else 0.0,
+            "totals": totals,
+            "endpoints": endpoints,
+        }
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        """Circuit breaker states, retry counts and hedging outcomes"""
+        return {
+            "breakers": {
+                endpoint: breaker.stats()
+                for endpoint, breaker in self._breakers.items()
+            },
+            "retries": dict(self._retries),
+            "hedges": dict(self._hedges),
+        }
+
+    async def _fetch_user_data(
+        self, user_id: str, priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict[str, Any]:
+        if self.transport == "mcp":
+            return await self._call_tool(
+                "get_user_data", {"user_id": user_id}, "user_data", priority
+            )
+        response = await self._request(
+            "GET", f"/users/{user_id}", "user_data", priority=priority
+        )
+        return loads(response.content)
+
+    async def _fetch_search_page(
+        self,
+        query: str,
+        cursor: Optional[str],
+        limit: int,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Any:
+        if self.transport == "mcp":
+            return await self._call_tool(
+                "search_resources",
+                {"query": query, "limit": limit, "cursor": cursor},
+                "search",
+                priority,
+                decode=SearchPage.from_json,
+            )
+        params = {"q": query, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        return await self._conditional_get(
+            ("search", query, cursor, limit),
+            "/search",
+            "search",
+            priority,
+            params,
+            decode=SearchPage.from_json,
+        )
+
+    async def _fetch_users_batch(
+        self, user_ids: List[str], priority: int
+    ) -> Dict[str, Any]:
+        """Resolve a batch of user IDs to user dicts or per-ID exceptions"""
+        # Over MCP, individual calls are multiplexed on one session instead
+        if self.transport != "mcp" and self._users_batch_supported is not False:
+            try:
+                response = await self._request(
+                    "POST",
+                    "/users/batch",
+                    "users_batch",
+                    idempotent=True,
+                    priority=priority,
+                    json={"ids": user_ids},
+                )
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (404, 405, 501):
+                    raise
+                self._users_batch_supported = False
+            else:
+                self._users_batch_supported = True
+                body = loads(response.content)
+                results: Dict[str, Any] = {}
+                for user in body.get("users", []):
+                    results[str(user.get("user_id", user.get("id")))] = user
+                for user_id, error in body.get("errors", {}).items():
+                    results[str(user_id)] = LookupError(error)
+                return results
+
+        # No batch endpoint: one request per user, bounded across all batches
+        if self._fanout_semaphore is None:
+            self._fanout_semaphore = asyncio.Semaphore(self.bulk_concurrency)
+
+        async def fetch_one(user_id: str):
+            async with self._fanout_semaphore:
+                try:
+                    return user_id, await self._fetch_user_data(user_id, priority)
+                except Exception as e:
+                    return user_id, e
+
+        return dict(await asyncio.gather(*(fetch_one(user_id) for user_id in user_ids)))
+
+    async def _fetch_server_stats(
+        self, priority: int = PRIORITY_INTERACTIVE
+    ) -> Validated:
+        if self.transport == "mcp":
+            stats = await self._call_tool(
+                "get_server_stats", {}, "server_stats", priority
+            )
+            self.stats_history.record(stats)
+            return Validated(stats, None)
+        fetched = await self._conditional_get(
+            ("server_stats",),
+            "/servers/stats",
+            "server_stats",
+            priority,
+            hedge=True,
+            delta=True,
+        )
+        self.stats_history.record(fetched.value)
+        return fetched
+
+    async def _fetch_search(
+        self, query: str, priority: int = PRIORITY_INTERACTIVE
+    ) -> Any:
+        if self.transport == "mcp":
+            return await self._call_tool(
+                "search_resources",
+                {"query": query},
+                "search",
+                priority,
+                decode=SearchPage.from_json,
+            )
+        # Validators apply to the whole response, so the full page is cached
+        return await self._conditional_get(
+            ("search", query),
+            "/search",
+            "search",
+            priority,
+            {"q": query},
+            decode=SearchPage.from_json,
+        )
+
+    async def get_user_data(
+        self, user_id: str, priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict[str, Any]:
         """Fetch user data from NeonPanel"""
         if self.demo_mode:
-            return {
-                "user_id": user_id,
-                "username": f"demo_user_{user_id[:8]}",
-                "email": f"demo_{user_id[:8]}@example.com",
-                "created_at": "2024-01-15T10:30:00Z",
-                "last_login": "2024-07-16T09:15:00Z",
-                "status": "active",
-                "demo_mode": True
-            }
-        
+            return self._demo_user(user_id)
+
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                response = await client.get(
-                    f"{self.base_url}/users/{user_id}",
-                    headers=headers
+            return await self._loop.run(
+                self._cached(
+                    ("user_data", user_id),
+                    lambda lane: self._fetch_user_data(user_id, lane),
+                    priority,
                 )
-                response.raise_for_status()
-                return response.json()
+            )
         except Exception as e:
             print(f"Error fetching user data: {e}")
-            return {}
-    
-    async def get_server_stats(self) -> Dict[str, Any]:
-        """Get server statistics from NeonPanel"""
+            return {"error": str(e)}
+
+    def _demo_user(self, user_id: str) -> Dict[str, Any]:
+        return {
+            "user_id": user_id,
+            "username": f"demo_user_{user_id[:8]}",
+            "email": f"demo_{user_id[:8]}@example.com",
+            "created_at": "2024-01-15T10:30:00Z",
+            "last_login": "2024-07-16T09:15:00Z",
+            "status": "active",
+            "demo_mode": True,
+        }
+
+    async def iter_users(
+        self, user_ids: Iterable[str], priority: int = PRIORITY_INTERACTIVE
+    ) -> AsyncIterator[Tuple[int, str, Dict[str, Any]]]:
+        """Yield (index, user_id, user_data) for many users as each lookup finishes
+
+        Failed lookups yield {"user_id": ..., "error": ...} instead of raising.
+        Results share the cache with get_user_data().
+        """
+        user_ids = [str(user_id) for user_id in user_ids]
         if self.demo_mode:
-            import random
-            return {
-                "total_servers": random.randint(15, 25),
-                "active_servers": random.randint(12, 20),
-                "cpu_usage": round(random.uniform(20, 80), 1),
-                "memory_usage": round(random.uniform(30, 70), 1),
-                "disk_usage": round(random.uniform(40, 85), 1),
-                "network_in": round(random.uniform(100, 500), 2),
-                "network_out": round(random.uniform(50, 300), 2),
-                "uptime": "15 days, 8 hours, 23 minutes",
-                "demo_mode": True
-            }
-        
+            for index, user_id in enumerate(user_ids):
+                yield index, user_id, self._demo_user(user_id)
+            return
+
+        # Lookups run on the shared loop; results are handed back to this loop
+        results: asyncio.Queue = asyncio.Queue()
+        caller_loop = asyncio.get_running_loop()
+
+        def deliver(item):
+            caller_loop.call_soon_threadsafe(results.put_nowait, item)
+
+        def on_done(done):
+            if not done.cancelled() and done.exception() is not None:
+                deliver(done.exception())
+
+        job = self._loop.spawn(self._lookup_users(user_ids, priority, deliver))
+        job.add_done_callback(on_done)
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                response = await client.get(
-                    f"{self.base_url}/servers/stats",
-                    headers=headers
+            for _ in range(len(user_ids)):
+                item = await results.get()
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            job.cancel()
+
+    async def _lookup_users(self, user_ids: List[str], priority: int, deliver):
+        async def lookup(index: int, user_id: str):
+            try:
+                user = await self._cached(
+                    ("user_data", user_id),
+                    lambda lane: self._user_loader.load(user_id, group=lane),
+                    priority,
                 )
-                response.raise_for_status()
-                return response.json()
+            except Exception as e:
+                user = {"user_id": user_id, "error": str(e)}
+            deliver((index, user_id, user))
+
+        await asyncio.gather(
+            *(lookup(index, user_id) for index, user_id in enumerate(user_ids))
+        )
+
+    async def get_users(
+        self, user_ids: Iterable[str], priority: int = PRIORITY_INTERACTIVE
+    ) -> List[Dict[str, Any]]:
+        """Fetch many users at once, returned in the same order as user_ids"""
+        user_ids = list(user_ids)
+        users: List[Dict[str, Any]] = [{} for _ in user_ids]
+        async for index, _, user in self.iter_users(user_ids, priority):
+            users[index] = user
+        return users
+
+    async def get_server_stats(
+        self, priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict[str, Any]:
+        """Get server statistics from NeonPanel"""
+        if self.demo_mode:
+            stats = self.simulator.stats()
+            self.stats_history.record(stats)
+            return stats
+
+        try:
+            return await self._loop.run(
+                self._cached(("server_stats",), self._fetch_server_stats, priority)
+            )
         except Exception as e:
             print(f"Error fetching server stats: {e}")
-            return {}
-    
-    async def execute_server_action(self, server_id: str, action: str) -> Dict[str, Any]:
+            return {"error": str(e)}
+
+    async def execute_server_action(
+        self, server_id: str, action: str
+    ) -> Dict[str, Any]:
         """Execute an action on a server"""
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                payload = {"action": action}
-                response = await client.post(
-                    f"{self.base_url}/servers/{server_id}/actions",
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                return response.json()
+            return await self._execute_action(server_id, action)
         except Exception as e:
             print(f"Error executing server action: {e}")
             return {"error": str(e)}
-    
-    async def search_resources(self, query: str) -> List[Dict[str, Any]]:
-        """Search for resources in NeonPanel"""
+        finally:
+            # The action may have changed server state even if it reported failure
+            self._invalidate_server_state()
+
+    async def _execute_action(self, server_id: str, action: str) -> Dict[str, Any]:
+        if self.demo_mode:
+            await asyncio.sleep(0.05)
+            result = {
+                "server_id": server_id,
+                "action": action,
+                "status": "completed",
+                "demo_mode": True,
+            }
+            server_status = self.simulator.apply_action(server_id, action)
+            if server_status is not None:
+                result["server_status"] = server_status
+            return result
+        if self.transport == "mcp":
+            return await self._call_tool(
+                "execute_server_action",
+                {"server_id": server_id, "action": action},
+                "server_action",
+                idempotent=False,
+            )
+        payload = {"action": action}
+        response = await self._request(
+            "POST", f"/servers/{server_id}/actions", "server_action", json=payload
+        )
+        return loads(response.content)
+
+    def _invalidate_server_state(self):
+        self.cache.invalidate("server_stats")
+        self.cache.invalidate("search")
+        self.request_catalog_sync()
+
+    def start_catalog_sync(self):
+        """Start the background catalog sync on the shared loop (idempotent)"""
+        if self.catalog is None:
+            return
+        with self._catalog_lock:
+            if self._catalog_sync_job is None or self._catalog_sync_job.done():
+                self._catalog_sync_job = self._loop.spawn(self._catalog_sync_forever())
+
+    def request_catalog_sync(self):
+        """Ask the background sync to run now instead of at its next interval"""
+        wakeup = self._catalog_wakeup
+        if wakeup is not None:
+            self._loop.loop.call_soon_threadsafe(wakeup.set)
+
+    async def _catalog_sync_forever(self):
+        self._catalog_wakeup = asyncio.Event()
+        while True:
+            self._catalog_wakeup.clear()
+            try:
+                await self.sync_catalog()
+            except Exception as e:
+                self.catalog.sync_errors += 1
+                print(f"Error syncing resource catalog: {e}")
+            interval = self.catalog_sync_interval
+            if self._changes_feed_supported is False:
+                interval = self.catalog_full_sync_interval
+            try:
+                await asyncio.wait_for(self._catalog_wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def sync_catalog(self) -> int:
+        """Pull catalog changes into the mirror; returns how many resources were written
+
+        Uses the /resources/changes feed from the stored cursor; if the API has
+        no feed, the whole catalog is re-read through paginated search, at most
+        once per catalog_full_sync_interval (earlier requests return 0).
+        """
+        catalog = self.catalog
+        if catalog is None:
+            return 0
+        loop = asyncio.get_running_loop()
+        written = 0
+        if self._changes_feed_supported is not False:
+            try:
+                cursor = catalog.cursor or "0"
+                while True:
+                    response = await self._request(
+                        "GET",
+                        "/resources/changes",
+                        "catalog_sync",
+                        priority=PRIORITY_BACKGROUND,
+                        params={"since": cursor, "limit": self.catalog_page_size},
+                    )
+                    body = loads(response.content)
+                    changed = body.get("resources", [])
+                    cursor = body.get("cursor") or cursor
+                    # SQLite writes happen off the event loop
+                    await loop.run_in_executor(
+                        None,
+                        catalog.apply_changes,
+                        changed,
+                        body.get("deleted", []),
+                        cursor,
+                    )
+                    written += len(changed)
+                    if not body.get("has_more"):
+                        break
+                self._changes_feed_supported = True
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (404, 405, 501):
+                    raise
+                self._changes_feed_supported = False
+
+        if self._changes_feed_supported is False:
+            if self._last_full_sync is not None and (
+                time.monotonic() - self._last_full_sync
+                < self.catalog_full_sync_interval
+            ):
+                return 0
+            self._last_full_sync = time.monotonic()
+            resources = []
+            cursor = None
+            while True:
+                params = {"q": "", "limit": self.catalog_page_size}
+                if cursor:
+                    params["cursor"] = cursor
+                response = await self._request(
+                    "GET",
+                    "/search",
+                    "catalog_sync",
+                    priority=PRIORITY_BACKGROUND,
+                    params=params,
+                )
+                page = SearchPage.from_json(response.content)
+                resources.extend(page.get("results", []))
+                cursor = page.get("next_cursor")
+                if not cursor:
+                    break
+            await loop.run_in_executor(None, catalog.replace_all, resources)
+            written = len(resources)
+
+        catalog.mark_synced()
+        return written
+
+    def _search_catalog(
+        self, query: str, limit: Optional[int]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Matches from the mirror, or None when it is stale, has none or fails
+
+        Callers use the API whenever this returns None.
+        """
+        try:
+            catalog = self.catalog
+            if catalog is None:
+                return None
+            self.start_catalog_sync()
+            if catalog.is_fresh:
+                results = catalog.search(query, limit=limit)
+                if results:
+                    catalog.hits += 1
+                    return results
+            catalog.misses += 1
+        except Exception as e:
+            print(f"Error searching resource catalog: {e}")
+        return None
+
+    async def resolve_server_selector(self, selector: Dict[str, Any]) -> List[str]:
+        """Expand a selector like {"query": "web", "status": "active"} into server IDs
+
+        "query" is passed to resource search; every other key must match the
+        resource's field exactly. Only resources of type "server" are returned.
+        """
+        filters = {key: value for key, value in selector.items() if key != "query"}
+        server_ids = []
+        async for resource in self.iter_search_resources(selector.get("query", "")):
+            if resource.get("type", "server") != "server":
+                continue
+            if all(resource.get(key) == value for key, value in filters.items()):
+                server_ids.append(resource["id"])
+        return server_ids
+
+    async def iter_bulk_server_action(
+        self,
+        action: str,
+        server_ids: Optional[Iterable[str]] = None,
+        selector: Optional[Dict[str, Any]] = None,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_failures: Optional[int] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run action on many servers and yield a progress event as each one finishes
+
+        Targets are server_ids, or the servers matching selector. At most
+        concurrency actions run at once. With batch_size, servers are processed
+        in rolling batches and each batch must finish before the next starts;
+        once more than max_failures actions have failed, remaining servers are
+        skipped. Setting cancel_event stops launching new actions; closing the
+        iterator also cancels the ones in flight.
+
+        Events look like {"server_id", "status", "result"/"error", "batch",
+        "completed", "total"} with status one of succeeded, failed, cancelled
+        or skipped.
+        """
+        if server_ids is None:
+            server_ids = await self.resolve_server_selector(selector or {})
+        targets = list(dict.fromkeys(server_ids))
+        total = len(targets)
+        concurrency = concurrency or self.bulk_concurrency
+        batches = (
+            [targets[i : i + batch_size] for i in range(0, total, batch_size)]
+            if batch_size
+            else [targets]
+        )
+        semaphore = asyncio.Semaphore(concurrency)
+        completed = 0
+        failures = 0
+        pending = set()
+
+        def event(server_id: str, status: str, batch: int, **details) -> Dict[str, Any]:
+            return dict(
+                server_id=server_id,
+                status=status,
+                batch=batch,
+                completed=completed,
+                total=total,
+                **details,
+            )
+
+        def aborted() -> bool:
+            return max_failures is not None and failures > max_failures
+
+        async def run(server_id: str):
+            nonlocal failures
+            async with semaphore:
+                # Checked per action, not just per batch: without batch_size
+                # every action is queued up front
+                if cancel_event is not None and cancel_event.is_set():
+                    return server_id, "cancelled", {}
+                if aborted():
+                    return server_id, "skipped", {}
+                try:
+                    result = await self._execute_action(server_id, action)
+                except Exception as e:
+                    failures += 1
+                    return server_id, "failed", {"error": str(e)}
+                return server_id, "succeeded", {"result": result}
+
+        try:
+            for batch_number, batch in enumerate(batches, 1):
+                cancelled = cancel_event is not None and cancel_event.is_set()
+                if cancelled or aborted():
+                    status = "cancelled" if cancelled else "skipped"
+                    for server_id in batch:
+                        completed += 1
+                        yield event(server_id, status, batch_number)
+                    continue
+
+                pending = {asyncio.ensure_future(run(server_id)) for server_id in batch}
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        server_id, status, details = task.result()
+                        completed += 1
+                        yield event(server_id, status, batch_number, **details)
+        finally:
+            for task in pending:
+                task.cancel()
+            self._invalidate_server_state()
+
+    async def bulk_server_action(
+        self, action: str, server_ids: Optional[Iterable[str]] = None, **options
+    ) -> Dict[str, Any]:
+        """Run iter_bulk_server_action to completion and summarise the outcome"""
+        summary: Dict[str, Any] = {
+            "succeeded": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "skipped": 0,
+            "results": [],
+        }
+        async for progress in self.iter_bulk_server_action(
+            action, server_ids, **options
+        ):
+            summary[progress["status"]] += 1
+            summary["results"].append(progress)
+        return summary
+
+    async def search_resources(
+        self, query: str, priority: int = PRIORITY_INTERACTIVE
+    ) -> List[Dict[str, Any]]:
+        """Search for resources in NeonPanel
+
+        Answered from the local catalog mirror while it is within its staleness
+        bound; misses and stale mirrors fall back to the API.
+        """
         if self.demo_mode:
-            import random
-            return [
-                {
-                    "id": f"res_{i}",
-                    "name": f"Demo Resource {i}",
-                    "type": random.choice(["server", "database", "service"]),
-                    "status": random.choice(["active", "inactive", "pending"]),
-                    "created_at": "2024-07-15T10:00:00Z",
-                    "demo_mode": True
-                }
-                for i in range(1, random.randint(3, 8))
-                if query.lower() in f"demo resource {i}".lower()
-            ]
-        
+            return self.simulator.search(query, limit=self.search_page_size)["results"]
+
+        mirrored = self._search_catalog(query, self.search_page_size)
+        if mirrored is not None:
+            return mirrored
+
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                params = {"q": query}
-                response = await client.get(
-                    f"{self.base_url}/search",
-                    headers=headers,
-                    params=params
+            page = await self._loop.run(
+                self._cached(
+                    ("search", query),
+                    lambda lane: self._fetch_search(query, lane),
+                    priority,
                 )
-                response.raise_for_status()
-                return response.json().get("results", [])
+            )
+            return list(page.results)
         except Exception as e:
             print(f"Error searching resources: {e}")
             return []
 
-# Global client instance with demo mode enabled
+    async def iter_search_resources(
+        self,
+        query: str,
+        max_results: Optional[int] = None,
+        page_size: Optional[int] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield search results one at a time, following pagination cursors
+
+        The next page is fetched while the caller consumes the current one, with
+        at most search_prefetch_pages pages buffered. Stop iterating (or pass
+        max_results) to end early; outstanding page fetches are cancelled.
+        A fresh catalog mirror with matches answers without any API calls.
+        """
+        page_size = page_size or self.search_page_size
+        if max_results is not None:
+            page_size = min(page_size, max_results)
+        if self.demo_mode:
+            ids = self.simulator.search_ids(query)[:max_results]
+            for start in range(0, len(ids), page_size):
+                for index in ids[start : start + page_size]:
+                    yield self.simulator.resource(int(index))
+                await asyncio.sleep(0)
+            return
+
+        mirrored = self._search_catalog(query, max_results)
+        if mirrored is not None:
+            for result in mirrored:
+                yield result
+            return
+        pages: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.search_prefetch_pages))
+
+        async def produce():
+            cursor = None
+            try:
+                while True:
+                    page = await self._loop.run(
+                        self._cached(
+                            ("search", query, cursor, page_size),
+                            # Bound now: a stale hit refreshes this page later,
+                            # after cursor has moved on
+                            lambda lane, cursor=cursor: self._fetch_search_page(
+                                query, cursor, page_size, lane
+                            ),
+                            priority,
+                        )
+                    )
+                    await pages.put(page.get("results", []))
+                    cursor = page.get("next_cursor")
+                    if not cursor:
+                        break
+            except Exception as e:
+                print(f"Error searching resources: {e}")
+            await pages.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        yielded = 0
+        try:
+            while max_results is None or yielded < max_results:
+                results = await pages.get()
+                if results is None:
+                    break
+                for result in results:
+                    yield result
+                    yielded += 1
+                    if max_results is not None and yielded >= max_results:
+                        break
+        finally:
+            producer.cancel()
+
+
+# Global client instance; demo mode unless NEONPANEL_DEMO_MODE=false
+# (e.g. against mcp/fake_server.py)
 try:
-    neonpanel_client = NeonPanelMCPClient(demo_mode=True)
+    neonpanel_client = NeonPanelMCPClient(
+        demo_mode=os.getenv("NEONPANEL_DEMO_MODE", "true").lower() == "true"
+    )
 except Exception:
     # Fallback for any initialization issues
     neonpanel_client = NeonPanelMCPClient(demo_mode=True)
@@ -0,0 +1,181 @@
+"""
+Client-side rate limiting for NeonPanel requests
+Per-endpoint token buckets with priority lanes and Retry-After pauses. One
+limiter is shared by every client in the process, and it must only be used
+from the shared NeonPanel event loop.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+# Lower numbers are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given as seconds or as an HTTP date"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        # "-0000" dates parse as naive; HTTP dates are always UTC
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate tokens per second"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated: Optional[float] = None
+        self.blocked_until = 0.0
+        self.waiters: List[Tuple[int, int, "asyncio.Future", float]] = []
+        self.dispatcher: Optional["asyncio.Task"] = None
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0
+
+    def _refill(self, now: float):
+        if self.updated is not None:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token can be taken (0 when one is available now)"""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """Per-endpoint token buckets; waiting requests are released in priority order"""
+
+    def __init__(
+        self,
+        rate: float = 20.0,
+        burst: float = 40.0,
+        endpoint_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.endpoint_limits = endpoint_limits or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._sequence = itertools.count()
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        if endpoint not in self._buckets:
+            rate, burst = self.endpoint_limits.get(endpoint, (self.rate, self.burst))
+            self._buckets[endpoint] = TokenBucket(rate, burst)
+        return self._buckets[endpoint]
+
+    async def acquire(
+        self, endpoint: str, priority: int = PRIORITY_INTERACTIVE
+    ) -> float:
+        """Wait for a token for endpoint and return how long that took"""
+        if self.rate <= 0:
+            return 0.0
+        bucket = self._bucket(endpoint)
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if not bucket.waiters and bucket.delay(now) == 0:
+            bucket.take()
+            bucket.granted += 1
+            return 0.0
+
+        future = loop.create_future()
+        heapq.heappush(bucket.waiters, (priority, next(self._sequence), future, now))
+        if bucket.dispatcher is None or bucket.dispatcher.done():
+            bucket.dispatcher = loop.create_task(self._dispatch(bucket))
+        await future
+
+        waited = loop.time() - now
+        bucket.total_wait += waited
+        bucket.max_wait = max(bucket.max_wait, waited)
+        return waited
+
+    async def _dispatch(self, bucket: TokenBucket):
+        loop = asyncio.get_running_loop()
+        while bucket.waiters:
+            future = bucket.waiters[0][2]
+            if future.done():
+                # Caller gave up (cancelled) while queued
+                heapq.heappop(bucket.waiters)
+                continue
+            delay = bucket.delay(loop.time())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(bucket.waiters)
+            bucket.take()
+            bucket.granted += 1
+            future.set_result(None)
+
+    def pause(self, endpoint: str, seconds: float):
+        """Hold all requests to endpoint for seconds, e.g. on a 429 with Retry-After"""
+        bucket = self._bucket(endpoint)
+        now = asyncio.get_running_loop().time()
+        bucket.throttled += 1
+        bucket.tokens = 0
+        bucket.blocked_until = max(bucket.blocked_until, now + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth per priority lane and wait times per endpoint"""
+        endpoints = {}
+        for endpoint, bucket in self._buckets.items():
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, future, _ in bucket.waiters:
+                if not future.done():
+                    name = PRIORITY_NAMES.get(priority, str(priority))
+                    depth[name] = depth.get(name, 0) + 1
+            endpoints[endpoint] = {
+                "rate": bucket.rate,
+                "burst": bucket.capacity,
+                "queue_depth": depth,
+                "granted": bucket.granted,
+                "throttled": bucket.throttled,
+                "avg_wait_ms": round(bucket.total_wait / bucket.granted * 1000, 2)
+                if bucket.granted
+                else 0.0,
+                "max_wait_ms": round(bucket.max_wait * 1000, 2),
+            }
+        return {"rate": self.rate, "burst": self.burst, "endpoints": endpoints}
+
+
+# Shared by every NeonPanel client in the process, since they share one API key
+rate_limiter = RateLimiter(
+    rate=float(os.getenv("NEONPANEL_RATE_LIMIT", "20")),
+    burst=float(os.getenv("NEONPANEL_RATE_BURST", "40")),
+)
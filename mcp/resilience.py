@@ -0,0 +1,153 @@
+"""
+Resilience primitives for the NeonPanel client
+Retry with jittered exponential backoff, per-endpoint circuit breakers and
+hedged requests for latency-sensitive reads
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class NeonPanelError(Exception):
+    """Base error raised by the NeonPanel client internals"""
+
+
+class CircuitOpenError(NeonPanelError):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(
+            f"NeonPanel endpoint '{endpoint}' is unavailable "
+            f"(circuit open, retry in {retry_in:.0f}s)"
+        )
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def is_server_failure(error: Exception) -> bool:
+    """True for errors meaning the upstream is unhealthy, not the request wrong"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(
+        error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError)
+    )
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(
+        self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 5.0
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number attempt + 1 (attempt counts from 0)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2**attempt)))
+
+    def should_retry(self, error: Exception) -> bool:
+        return not isinstance(error, CircuitOpenError) and is_server_failure(error)
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one probe through after reset_timeout"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def before_call(self, endpoint: str):
+        """Raise CircuitOpenError if calls to this endpoint should fail fast"""
+        if self.state == OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(endpoint, self.reset_timeout - elapsed)
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(endpoint, 0)
+            self._probe_in_flight = True
+
+    def release_probe(self):
+        """Let another probe through after one ended with no outcome (e.g. cancelled)"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if (
+            self.state == HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != OPEN:
+                self.times_opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+async def hedged(
+    fn: Callable[[], Awaitable[Any]],
+    delay: float,
+    max_hedges: int = 1,
+    on_hedge: Optional[Callable[[], None]] = None,
+) -> Tuple[Any, int]:
+    """Run fn(), starting a backup copy each time delay passes without an answer
+
+    Returns (result, index) where index 0 is the original call and 1+ are hedges.
+    The first successful copy wins and the rest are cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    pending: Dict["asyncio.Task", int] = {loop.create_task(fn()): 0}
+    launched = 1
+    last_error: Optional[BaseException] = None
+    try:
+        while pending:
+            timeout = delay if launched <= max_hedges else None
+            done, _ = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                index = pending.pop(task)
+                if task.exception() is None:
+                    return task.result(), index
+                last_error = task.exception()
+            if not done:
+                if on_hedge is not None:
+                    on_hedge()
+                pending[loop.create_task(fn())] = launched
+                launched += 1
+        raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
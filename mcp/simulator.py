@@ -0,0 +1,304 @@
+"""
+Deterministic NeonPanel fleet simulator for demo mode
+Models a seeded fleet of servers plus databases and services with NumPy
+arrays: per-server metrics evolve smoothly with time, and resource search is
+answered from an inverted index over name, type, status and region tokens.
+The same seed and timestamp always produce the same data.
+"""
+
+import bisect
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+RESOURCE_TYPES = ("server", "database", "service")
+ROLES = {
+    "server": ("web", "api", "worker", "batch", "edge"),
+    "database": ("postgres", "mysql", "redis", "mongo"),
+    "service": ("auth", "billing", "search", "queue", "mailer"),
+}
+STATUSES = ("active", "inactive", "pending")
+REGIONS = ("us-east-1", "us-west-2", "eu-west-1", "ap-southeast-1")
+
+# Fleet history starts here; created_at dates are spread over the following year
+CREATED_BASE = datetime(2023, 1, 1, tzinfo=timezone.utc)
+# Default start of the metric clock and of uptime. Fixed, so two simulators with
+# the same seed agree at any timestamp, whenever they were created
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9-]*")
+
+
+class FleetSimulator:
+    """Seeded fleet of `fleet_size` servers and `resource_count` other resources
+
+    Resources 0..fleet_size-1 are the servers (ids "srv_N"); the rest are
+    databases and services (ids "res_N"). Each server has its own baseline,
+    amplitude, period and phase, so fleet averages drift coherently over time
+    instead of jumping between calls. Metrics are held constant within each
+    `interval` second tick.
+    """
+
+    def __init__(
+        self,
+        fleet_size: int = 200,
+        resource_count: int = 100,
+        seed: int = 42,
+        interval: float = 5.0,
+        epoch: float = EPOCH,
+    ):
+        self.fleet_size = fleet_size
+        self.resource_count = resource_count
+        self.seed = seed
+        self.interval = interval
+        self.epoch = epoch
+        total = fleet_size + resource_count
+        self.width = max(5, len(str(max(0, total - 1))))
+        rng = np.random.default_rng(seed)
+
+        # Resource attributes as small integer codes
+        self.types = np.zeros(total, dtype=np.int8)
+        self.types[fleet_size:] = rng.integers(1, len(RESOURCE_TYPES), resource_count)
+        self.roles = np.empty(total, dtype=np.int8)
+        for code, kind in enumerate(RESOURCE_TYPES):
+            mask = self.types == code
+            self.roles[mask] = rng.integers(0, len(ROLES[kind]), int(mask.sum()))
+        self.statuses = rng.choice(len(STATUSES), total, p=(0.85, 0.1, 0.05)).astype(
+            np.int8
+        )
+        self.regions = rng.integers(0, len(REGIONS), total).astype(np.int8)
+        self.created_days = rng.integers(0, 365, total).astype(np.int16)
+
+        # Per-server metric model
+        n = fleet_size
+        self.base_cpu = rng.uniform(10, 60, n)
+        self.cpu_amplitude = rng.uniform(5, 25, n)
+        self.period = rng.uniform(600, 7200, n)
+        self.phase = rng.uniform(0, 2 * np.pi, n)
+        self.base_memory = rng.uniform(25, 65, n)
+        self.base_disk = rng.uniform(30, 70, n)
+        self.disk_growth = rng.uniform(0.01, 0.2, n)  # percent per hour
+        self.base_network = rng.lognormal(5.2, 0.4, n)  # MB/s
+        # Fleet-wide load wave shared by every server, so averages over large
+        # fleets still move instead of flattening out
+        self.fleet_period = rng.uniform(1800, 3600)
+        self.fleet_phase = rng.uniform(0, 2 * np.pi)
+
+        # Vocabulary: every token a resource can match, mapped to (field, code)
+        self._fields = {
+            "type": self.types,
+            "role": self.roles,
+            "status": self.statuses,
+            "region": self.regions,
+        }
+        self._vocabulary: Dict[str, List[tuple]] = {}
+        for code, kind in enumerate(RESOURCE_TYPES):
+            self._add_token(kind, "type", code)
+        for kind, roles in ROLES.items():
+            for code, role in enumerate(roles):
+                self._add_token(role, "role", (RESOURCE_TYPES.index(kind), code))
+        for code, status in enumerate(STATUSES):
+            self._add_token(status, "status", code)
+        for code, region in enumerate(REGIONS):
+            self._add_token(region, "region", code)
+        self._terms = sorted(self._vocabulary)
+        self._postings: Dict[tuple, np.ndarray] = {}
+        self._metrics: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def _add_token(self, token: str, field: str, code: Any):
+        self._vocabulary.setdefault(token, []).append((field, code))
+
+    def __len__(self) -> int:
+        return self.fleet_size + self.resource_count
+
+    # Index
+
+    def _posting(self, field: str, code: Any) -> np.ndarray:
+        """Sorted resource indexes with field == code, one argsort per field"""
+        key = (field, code)
+        with self._lock:
+            if key not in self._postings:
+                if field == "role":
+                    kind, role = code
+                    ids = np.flatnonzero((self.types == kind) & (self.roles == role))
+                    self._postings[key] = ids
+                else:
+                    values = self._fields[field]
+                    order = np.argsort(values, kind="stable")
+                    bounds = np.searchsorted(values[order], np.arange(values.max() + 2))
+                    for value in range(len(bounds) - 1):
+                        self._postings[(field, value)] = order[
+                            bounds[value] : bounds[value + 1]
+                        ]
+            return self._postings.get(key, np.empty(0, dtype=np.int64))
+
+    def _match_term(self, term: str) -> np.ndarray:
+        """Boolean mask over all resources matching one query term"""
+        mask = np.zeros(len(self), dtype=bool)
+        # Numeric terms are prefixes of the zero-padded resource number
+        if term.isdigit():
+            if len(term) <= self.width:
+                scale = 10 ** (self.width - len(term))
+                mask[int(term) * scale : (int(term) + 1) * scale] = True
+            return mask
+        # Word terms match every vocabulary token they prefix ("post" -> postgres),
+        # and simple plurals match their singular ("servers" -> server)
+        tokens = self._prefixed(term)
+        if not tokens and term.endswith("s") and term[:-1] in self._vocabulary:
+            tokens = [term[:-1]]
+        for token in tokens:
+            for field, code in self._vocabulary[token]:
+                mask[self._posting(field, code)] = True
+        return mask
+
+    def _prefixed(self, term: str) -> List[str]:
+        lo = bisect.bisect_left(self._terms, term)
+        hi = bisect.bisect_left(self._terms, term + "\uffff")
+        return self._terms[lo:hi]
+
+    def search_ids(self, query: str) -> np.ndarray:
+        """Indexes of resources matching every term of query, in id order"""
+        terms = []
+        for token in _TOKEN.findall(query.lower()):
+            if self._prefixed(token):
+                terms.append(token)
+            else:
+                # "web-00012" and "server-0001" split into a word and a number
+                terms.extend(part for part in token.split("-") if part)
+        if not terms:
+            return np.arange(len(self))
+        matches = self._match_term(terms[0])
+        for term in terms[1:]:
+            matches &= self._match_term(term)
+        return np.flatnonzero(matches)
+
+    def search(
+        self, query: str, limit: int = 50, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """One page of matches in the API's {"results", "total", "next_cursor"} shape"""
+        ids = self.search_ids(query)
+        offset = int(cursor) if cursor else 0
+        end = offset + limit
+        return {
+            "results": [self.resource(int(index)) for index in ids[offset:end]],
+            "total": int(len(ids)),
+            "next_cursor": str(end) if end < len(ids) else None,
+        }
+
+    # Records
+
+    def resource_id(self, index: int) -> str:
+        return f"srv_{index}" if index < self.fleet_size else f"res_{index}"
+
+    def index_of(self, resource_id: str) -> Optional[int]:
+        prefix, _, number = resource_id.partition("_")
+        if not number.isdigit():
+            return None
+        index = int(number)
+        if (prefix == "srv" and index < self.fleet_size) or (
+            prefix == "res" and self.fleet_size <= index < len(self)
+        ):
+            return index
+        return None
+
+    def resource(self, index: int) -> Dict[str, Any]:
+        kind = RESOURCE_TYPES[self.types[index]]
+        created = CREATED_BASE + timedelta(days=int(self.created_days[index]))
+        return {
+            "id": self.resource_id(index),
+            "name": f"{ROLES[kind][self.roles[index]]}-{index:0{self.width}d}",
+            "type": kind,
+            "status": STATUSES[self.statuses[index]],
+            "region": REGIONS[self.regions[index]],
+            "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "demo_mode": True,
+        }
+
+    def apply_action(self, server_id: str, action: str) -> Optional[str]:
+        """Apply start/stop/restart to a server; returns its status (None if unknown)"""
+        index = self.index_of(server_id)
+        if index is None or index >= self.fleet_size:
+            return None
+        new_status = {"start": "active", "restart": "active", "stop": "inactive"}.get(
+            action
+        )
+        with self._lock:
+            if new_status is not None and STATUSES[self.statuses[index]] != new_status:
+                self.statuses[index] = STATUSES.index(new_status)
+                # Status postings are rebuilt on the next search that needs them
+                for key in [key for key in self._postings if key[0] == "status"]:
+                    del self._postings[key]
+            return STATUSES[self.statuses[index]]
+
+    # Metrics
+
+    def server_metrics(self, at: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Per-server metric vectors at time `at` (default now), memoised per tick"""
+        now = time.time() if at is None else at
+        tick = (
+            int((now - self.epoch) // self.interval)
+            if self.interval > 0
+            else int(now - self.epoch)
+        )
+        t = tick * self.interval if self.interval > 0 else now - self.epoch
+        cached = self._metrics
+        if cached is not None and cached[0] == tick:
+            return cached[1]
+        noise = np.random.default_rng([self.seed, max(0, tick)]).normal(
+            0, 1, (3, self.fleet_size)
+        )
+        angle = 2 * np.pi * t / self.period + self.phase
+        fleet_load = np.sin(2 * np.pi * t / self.fleet_period + self.fleet_phase)
+        cpu = (
+            self.base_cpu
+            + self.cpu_amplitude * np.sin(angle)
+            + 10.0 * fleet_load
+            + 2.0 * noise[0]
+        )
+        memory = (
+            self.base_memory
+            + 0.4 * self.cpu_amplitude * np.sin(angle / 1.7 + 1.0)
+            + 5.0 * fleet_load
+            + 1.0 * noise[1]
+        )
+        # Disk fills slowly and is cleaned up every 20 percentage points
+        disk = self.base_disk + np.mod(self.disk_growth * t / 3600.0, 20.0)
+        load = 1 + 0.3 * np.sin(angle * 2) + 0.2 * fleet_load
+        metrics = {
+            "cpu_usage": np.clip(cpu, 0, 100),
+            "memory_usage": np.clip(memory, 0, 100),
+            "disk_usage": np.clip(disk, 0, 100),
+            "network_in": self.base_network * load * (1 + 0.05 * noise[2]),
+            "network_out": 0.6 * self.base_network * load,
+        }
+        self._metrics = (tick, metrics)
+        return metrics
+
+    def stats(self, at: Optional[float] = None) -> Dict[str, Any]:
+        """Fleet-wide stats in the /servers/stats shape, averaged over active servers"""
+        now = time.time() if at is None else at
+        metrics = self.server_metrics(now)
+        active = self.statuses[: self.fleet_size] == STATUSES.index("active")
+        selected = active if active.any() else np.ones(self.fleet_size, dtype=bool)
+        uptime = int(max(0.0, now - self.epoch))
+        stats: Dict[str, Any] = {
+            "total_servers": self.fleet_size,
+            "active_servers": int(active.sum()),
+        }
+        for name, values in metrics.items():
+            digits = 2 if name.startswith("network") else 1
+            stats[name] = (
+                round(float(values[selected].mean()), digits)
+                if self.fleet_size
+                else 0.0
+            )
+        days, seconds = divmod(uptime, 86400)
+        hours, seconds = divmod(seconds, 3600)
+        stats["uptime"] = f"{days} days, {hours} hours, {seconds // 60} minutes"
+        stats["demo_mode"] = True
+        return stats
@@ -0,0 +1,139 @@
+"""
+In-memory time series for NeonPanel server statistics
+Fixed-size NumPy ring buffers, one row per metric, with vectorised window
+aggregations for the dashboard's Trends panel
+"""
+
+import threading
+import time
+import warnings
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+STATS_METRICS = ("cpu_usage", "memory_usage", "disk_usage", "network_in", "network_out")
+
+# Some API versions report fleet averages under these names
+METRIC_ALIASES = {
+    "avg_cpu_usage": "cpu_usage",
+    "avg_memory_usage": "memory_usage",
+    "avg_disk_usage": "disk_usage",
+}
+
+
+class StatsTimeSeries:
+    """Ring buffer holding the last `capacity` samples of each metric
+
+    Memory is fixed at construction: 8 bytes per timestamp plus 4 bytes per
+    metric value per slot. Missing metrics are stored as NaN and ignored by
+    the aggregations.
+    """
+
+    def __init__(self, capacity: int = 2880, metrics: Sequence[str] = STATS_METRICS):
+        self.capacity = capacity
+        self.metrics = tuple(metrics)
+        self._index = {name: row for row, name in enumerate(self.metrics)}
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._values = np.full((len(self.metrics), capacity), np.nan, dtype=np.float32)
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def record(self, stats: Dict[str, Any], timestamp: Optional[float] = None):
+        """Append one stats sample; unknown keys and non-numeric values are ignored"""
+        row = np.full(len(self.metrics), np.nan, dtype=np.float32)
+        for key, value in stats.items():
+            name = METRIC_ALIASES.get(key, key)
+            if name in self._index and isinstance(value, (int, float)):
+                row[self._index[name]] = value
+        with self._lock:
+            self._timestamps[self._head] = (
+                time.time() if timestamp is None else timestamp
+            )
+            self._values[:, self._head] = row
+            self._head = (self._head + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def window(self, seconds: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) oldest first, values shaped (metrics, samples)"""
+        with self._lock:
+            if self._size < self.capacity:
+                timestamps = self._timestamps[: self._size].copy()
+                values = self._values[:, : self._size].copy()
+            else:
+                order = np.r_[self._head : self.capacity, 0 : self._head]
+                timestamps = self._timestamps[order]
+                values = self._values[:, order]
+        if seconds is not None and len(timestamps):
+            start = np.searchsorted(timestamps, timestamps[-1] - seconds, side="left")
+            timestamps, values = timestamps[start:], values[:, start:]
+        return timestamps, values
+
+    def aggregate(
+        self, seconds: Optional[float] = None, percentiles: Iterable[float] = (50, 95)
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """Min/max/mean/percentiles/last and rate of change per minute per metric"""
+        percentiles = tuple(percentiles)
+        timestamps, values = self.window(seconds)
+        empty = {
+            "count": 0,
+            "min": None,
+            "max": None,
+            "mean": None,
+            "last": None,
+            "rate_per_min": None,
+        }
+        empty.update({f"p{p:g}": None for p in percentiles})
+        if not len(timestamps):
+            return {name: dict(empty) for name in self.metrics}
+
+        values = values.astype(np.float64)
+        valid = ~np.isnan(values)
+        counts = valid.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+            # All-NaN metrics are reported as empty below
+            warnings.simplefilter("ignore", RuntimeWarning)
+            # Least-squares slope per metric, ignoring NaN samples
+            t = np.broadcast_to(timestamps - timestamps[0], values.shape)
+            t_mean = np.where(valid, t, 0).sum(axis=1) / counts
+            v_mean = np.nanmean(values, axis=1)
+            dt = np.where(valid, t - t_mean[:, None], 0)
+            dv = np.where(valid, values - v_mean[:, None], 0)
+            slopes = (dt * dv).sum(axis=1) / (dt * dt).sum(axis=1)
+            stats = {
+                "min": np.nanmin(values, axis=1),
+                "max": np.nanmax(values, axis=1),
+                "mean": v_mean,
+                "rate_per_min": slopes * 60,
+            }
+            for p in percentiles:
+                stats[f"p{p:g}"] = np.nanpercentile(values, p, axis=1)
+        last_index = np.where(valid, np.arange(values.shape[1]), -1).max(axis=1)
+
+        result = {}
+        for row, name in enumerate(self.metrics):
+            if not counts[row]:
+                result[name] = dict(empty)
+                continue
+            summary = {
+                "count": int(counts[row]),
+                "last": round(float(values[row, last_index[row]]), 2),
+            }
+            for key, column in stats.items():
+                value = float(column[row])
+                summary[key] = None if np.isnan(value) else round(value, 2)
+            result[name] = summary
+        return result
+
+    def to_columns(self, seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Chronological samples as {"timestamp": [...], metric: [...]} chart columns"""
+        timestamps, values = self.window(seconds)
+        columns: Dict[str, Any] = {
+            "timestamp": (timestamps * 1000).astype(np.int64).astype("datetime64[ms]")
+        }
+        for row, name in enumerate(self.metrics):
+            columns[name] = values[row]
+        return columns
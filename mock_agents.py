@@ -5,24 +5,299 @@ A lightweight alternative to agent-squad for demo purposes
 
 import asyncio
 import json
+import math
 import os
-from typing import Dict, Any, List, Optional
+import random
+import time
+from typing import Dict, Any, AsyncIterator, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
 import streamlit as st
 
 
+class MockAgentError(Exception):
+    """Simulated provider failure, e.g. an overloaded or 5xx response"""
+
+
+def estimate_input_tokens(text: str) -> int:
+    """Rough token count of a prompt: about 1.3 tokens per word"""
+    return max(1, round(len(text.split()) * 1.3))
+
+
+class LatencySample:
+    """Timing and outcome of one simulated LLM call; times are in seconds"""
+
+    __slots__ = (
+        "ttft",
+        "tokens_per_second",
+        "input_tokens",
+        "output_tokens",
+        "outcome",
+        "timeout",
+    )
+
+    def __init__(
+        self,
+        ttft: float,
+        tokens_per_second: float,
+        input_tokens: int,
+        output_tokens: int,
+        outcome: str = "ok",
+        timeout: float = 0.0,
+    ):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.outcome = outcome
+        self.timeout = timeout
+
+    @property
+    def generation_time(self) -> float:
+        return (
+            self.output_tokens / self.tokens_per_second
+            if self.tokens_per_second > 0
+            else 0.0
+        )
+
+    @property
+    def total(self) -> float:
+        """Time until the call completes (or fails)"""
+        if self.outcome == "timeout":
+            return self.timeout
+        if self.outcome == "error":
+            return self.ttft
+        return self.ttft + self.generation_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "outcome": self.outcome,
+            "ttft_ms": round(self.ttft * 1000, 1),
+            "tokens_per_second": round(self.tokens_per_second, 1),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_ms": round(self.total * 1000, 1),
+        }
+
+
+class LatencyModel:
+    """Latency and throughput of an LLM endpoint, sampled per request
+
+    Time to first token and tokens per second are lognormal around their
+    medians. With probability tail_probability the TTFT is also multiplied by
+    a Pareto(tail_alpha) factor, giving the heavy tail seen under provider
+    load; calls whose total time exceeds timeout end as timeouts. Output
+    length grows with input length: output_base + output_ratio * input tokens,
+    with lognormal noise. error_rate and timeout_rate inject failures
+    directly. time_scale multiplies every duration (0 for instant runs).
+    """
+
+    def __init__(
+        self,
+        ttft_median: float = 0.6,
+        ttft_sigma: float = 0.35,
+        tps_median: float = 60.0,
+        tps_sigma: float = 0.25,
+        tail_probability: float = 0.02,
+        tail_alpha: float = 1.5,
+        output_base: int = 60,
+        output_ratio: float = 0.8,
+        output_sigma: float = 0.4,
+        max_output_tokens: int = 1024,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout: float = 30.0,
+        time_scale: float = 1.0,
+        seed: Optional[int] = None,
+    ):
+        self.ttft_median = ttft_median
+        self.ttft_sigma = ttft_sigma
+        self.tps_median = tps_median
+        self.tps_sigma = tps_sigma
+        self.tail_probability = tail_probability
+        self.tail_alpha = tail_alpha
+        self.output_base = output_base
+        self.output_ratio = output_ratio
+        self.output_sigma = output_sigma
+        self.max_output_tokens = max_output_tokens
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout = timeout
+        self.time_scale = time_scale
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_env(cls, profile: str = "anthropic", **overrides) -> "LatencyModel":
+        """Model for a named profile, adjusted by environment variables
+
+        MOCK_LATENCY_SCALE, MOCK_ERROR_RATE, MOCK_TIMEOUT_RATE and MOCK_SEED
+        override the profile's values.
+        """
+        options = dict(LATENCY_PROFILES.get(profile, LATENCY_PROFILES["anthropic"]))
+        options["time_scale"] = float(os.getenv("MOCK_LATENCY_SCALE", "1"))
+        options["error_rate"] = float(
+            os.getenv("MOCK_ERROR_RATE", options.get("error_rate", 0.0))
+        )
+        options["timeout_rate"] = float(
+            os.getenv("MOCK_TIMEOUT_RATE", options.get("timeout_rate", 0.0))
+        )
+        if os.getenv("MOCK_SEED"):
+            options["seed"] = int(os.getenv("MOCK_SEED"))
+        options.update(overrides)
+        return cls(**options)
+
+    def sample(self, input_tokens: int) -> LatencySample:
+        rng = self.rng
+        ttft = self.ttft_median * rng.lognormvariate(0.0, self.ttft_sigma)
+        if rng.random() < self.tail_probability:
+            ttft *= rng.paretovariate(self.tail_alpha)
+        tps = self.tps_median * rng.lognormvariate(0.0, self.tps_sigma)
+        mean_output = self.output_base + self.output_ratio * input_tokens
+        output_tokens = int(
+            min(
+                self.max_output_tokens,
+                max(1, mean_output * rng.lognormvariate(0.0, self.output_sigma)),
+            )
+        )
+
+        draw = rng.random()
+        if draw < self.error_rate:
+            outcome = "error"
+        elif (
+            draw < self.error_rate + self.timeout_rate
+            or ttft + output_tokens / tps > self.timeout
+        ):
+            outcome = "timeout"
+        else:
+            outcome = "ok"
+        scale = self.time_scale
+        return LatencySample(
+            ttft * scale,
+            tps / scale if scale > 0 else math.inf,
+            input_tokens,
+            output_tokens,
+            outcome,
+            self.timeout * scale,
+        )
+
+    def describe(self, input_tokens: int = 200, samples: int = 10000) -> Dict[str, Any]:
+        """Percentiles of TTFT and total time over many samples, for capacity plans"""
+        drawn = [self.sample(input_tokens) for _ in range(samples)]
+        ok = [s for s in drawn if s.outcome == "ok"]
+
+        def percentiles(values: List[float]) -> Dict[str, float]:
+            values = sorted(values)
+            if not values:
+                return {}
+            return {
+                f"p{p}": round(
+                    values[min(len(values) - 1, int(len(values) * p / 100))] * 1000, 1
+                )
+                for p in (50, 90, 99)
+            }
+
+        return {
+            "samples": samples,
+            "input_tokens": input_tokens,
+            "error_rate": round(sum(s.outcome == "error" for s in drawn) / samples, 4),
+            "timeout_rate": round(
+                sum(s.outcome == "timeout" for s in drawn) / samples, 4
+            ),
+            "ttft_ms": percentiles([s.ttft for s in ok]),
+            "total_ms": percentiles([s.total for s in ok]),
+            "mean_output_tokens": round(sum(s.output_tokens for s in ok) / len(ok), 1)
+            if ok
+            else 0.0,
+        }
+
+
+# Roughly calibrated to hosted Claude Sonnet-class models; neonpanel adds the
+# data gathering that precedes its LLM call
+LATENCY_PROFILES = {
+    "anthropic": dict(
+        ttft_median=0.6, ttft_sigma=0.35, tps_median=65.0, tps_sigma=0.25
+    ),
+    "bedrock": dict(
+        ttft_median=0.8,
+        ttft_sigma=0.45,
+        tps_median=55.0,
+        tps_sigma=0.3,
+        tail_probability=0.04,
+    ),
+    "neonpanel": dict(
+        ttft_median=0.9,
+        ttft_sigma=0.4,
+        tps_median=60.0,
+        tps_sigma=0.25,
+        output_ratio=0.5,
+    ),
+    "auto": dict(ttft_median=0.6, ttft_sigma=0.35, tps_median=65.0, tps_sigma=0.25),
+}
+
+_FILLER = (
+    "the",
+    "request",
+    "is",
+    "handled",
+    "by",
+    "checking",
+    "current",
+    "state",
+    "and",
+    "then",
+    "applying",
+    "the",
+    "recommended",
+    "settings",
+    "for",
+    "your",
+    "workload",
+    "which",
+    "keeps",
+    "latency",
+    "low",
+    "while",
+    "usage",
+    "stays",
+    "within",
+    "limits",
+    "so",
+    "that",
+    "each",
+    "step",
+    "can",
+    "be",
+    "reviewed",
+    "before",
+    "changes",
+    "go",
+    "live",
+)
+
+
 class MockAgent:
-    """Mock agent for demo purposes"""
+    """Mock agent for demo purposes
     
-    def __init__(self, name: str, description: str, agent_type: str = "mock"):
+    Responses take as long as latency (a LatencyModel, by default the profile
+    for agent_type) says, and are as long as its sampled output length.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        agent_type: str = "mock",
+        latency: Optional[LatencyModel] = None,
+    ):
         self.name = name
         self.description = description
         self.agent_type = agent_type
+        self.latency = latency or LatencyModel.from_env(agent_type)
+        self.last_sample: Optional[LatencySample] = None
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
     
-    async def process_message(self, message: str, context: Dict[str, Any] = None) -> str:
-        """Process a message and return a response"""
-        await asyncio.sleep(0.5)  # Simulate processing time
-        
+    def _intro(self, message: str) -> str:
         if self.agent_type == "anthropic":
             return f"🤖 **Anthropic Claude Response**: I understand you're asking about '{message[:50]}...'. This is a demo response showing how Claude would analyze and respond to your query with detailed insights and helpful suggestions."
         
@@ -35,6 +310,100 @@ class MockAgent:
         else:
             return f"🚀 **AI Assistant**: Thank you for your message about '{message[:30]}...'. This is a demo response showing the multi-agent system in action. Each agent specializes in different tasks!"
 
+    def _compose(self, message: str, output_tokens: int) -> str:
+        """The canned reply for this agent type, padded or cut to ~output_tokens"""
+        words = self._intro(message).split()
+        target = max(1, round(output_tokens / 1.3))
+        filler = self.latency.rng
+        while len(words) < target:
+            words.append(filler.choice(_FILLER))
+        return " ".join(words[:target])
+
+    def _sample(self, message: str) -> LatencySample:
+        sample = self.latency.sample(estimate_input_tokens(message))
+        self.last_sample = sample
+        self.requests += 1
+        return sample
+
+    async def _fail(self, sample: LatencySample):
+        await asyncio.sleep(sample.total)
+        if sample.outcome == "error":
+            self.errors += 1
+            raise MockAgentError(f"{self.name}: simulated provider error")
+        self.timeouts += 1
+        raise asyncio.TimeoutError(
+            f"{self.name}: no response within {sample.timeout:g}s"
+        )
+
+    async def process_message(
+        self,
+        message: str,
+        context: Dict[str, Any] = None,
+        sample: Optional[LatencySample] = None,
+    ) -> str:
+        """Process a message and return a response"""
+        sample = sample or self._sample(message)
+        if sample.outcome != "ok":
+            await self._fail(sample)
+        await asyncio.sleep(sample.total)  # Simulate processing time
+        return self._compose(message, sample.output_tokens)
+
+    async def stream_message(
+        self,
+        message: str,
+        context: Dict[str, Any] = None,
+        sample: Optional[LatencySample] = None,
+        buffer: int = 8,
+        chunk_interval: float = 0.03,
+    ) -> AsyncIterator[str]:
+        """Yield the response in chunks as it is "generated"
+
+        A producer task emits words on the sampled TTFT and tokens/sec schedule,
+        grouping those due within chunk_interval, into a queue of at most
+        buffer chunks. A slow consumer makes the producer wait (backpressure)
+        rather than buffer the whole reply. Injected errors and timeouts are
+        raised before the first chunk. Stop iterating to cancel the producer.
+        """
+        sample = sample or self._sample(message)
+        if sample.outcome != "ok":
+            await self._fail(sample)
+        words = self._compose(message, sample.output_tokens).split(" ")
+        per_word = sample.generation_time / len(words)
+        group = max(1, int(chunk_interval / per_word)) if per_word > 0 else len(words)
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer))
+
+        async def produce():
+            started = time.perf_counter() + sample.ttft
+            for start in range(0, len(words), group):
+                end = min(start + group, len(words))
+                # Paced against the schedule, so time spent blocked on a full
+                # queue is caught up
+                delay = started + end * per_word - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await chunks.put(
+                    " ".join(words[start:end]) + (" " if end < len(words) else "")
+                )
+            await chunks.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            producer.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "last": self.last_sample.to_dict() if self.last_sample else None,
+        }
+
 
 class MockOrchestrator:
     """Mock orchestrator for managing multiple agents"""
@@ -56,29 +425,173 @@ class MockOrchestrator:
         """Add an agent to the orchestrator"""
         self.agents[agent.agent_type] = agent
     
-    async def process_message(self, message: str, agent_type: str = "auto", context: Dict[str, Any] = None) -> str:
-        """Process a message using the specified agent"""
+    def route(self, message: str, agent_type: str = "auto") -> Tuple[str, MockAgent]:
+        """Pick the agent for a message: (agent type, agent)"""
         if agent_type == "auto":
             # Simple auto-selection logic for demo
-            if any(word in message.lower() for word in ["database", "sql", "query", "neon"]):
+            text = message.lower()
+            if any(word in text for word in ["database", "sql", "query", "neon"]):
                 agent_type = "neonpanel"
-            elif any(word in message.lower() for word in ["aws", "enterprise", "scale"]):
+            elif any(word in text for word in ["aws", "enterprise", "scale"]):
                 agent_type = "bedrock"
             else:
                 agent_type = "anthropic"
         
-        agent = self.agents.get(agent_type, self.agents["anthropic"])
-        response = await agent.process_message(message, context)
-        
+        return agent_type, self.agents.get(agent_type, self.agents["anthropic"])
+
+    def _metadata(
+        self, agent: MockAgent, agent_type: str, sample: LatencySample
+    ) -> Dict[str, Any]:
         # Add metadata for demo
-        metadata = {
+        return {
             "agent_used": agent.name,
             "agent_type": agent_type,
             "timestamp": datetime.now().isoformat(),
-            "demo_mode": True
+            "demo_mode": True,
+            "latency": sample.to_dict(),
         }
+
+    async def process_message(
+        self, message: str, agent_type: str = "auto", context: Dict[str, Any] = None
+    ) -> str:
+        """Process a message using the specified agent"""
+        agent_type, agent = self.route(message, agent_type)
+        sample = agent._sample(message)
+        response = await agent.process_message(message, context, sample)
+        return response, self._metadata(agent, agent_type, sample)
+
+    def stream_message(
+        self,
+        message: str,
+        agent_type: str = "auto",
+        context: Dict[str, Any] = None,
+        buffer: int = 8,
+    ) -> Tuple[AsyncIterator[str], Dict[str, Any]]:
+        """Route a message and return (chunk stream, metadata)
         
-        return response, metadata
+        Nothing runs until the stream is iterated. metadata gains ttft_ms when
+        the first chunk arrives and total_ms when the stream ends.
+        """
+        agent_type, agent = self.route(message, agent_type)
+        sample = agent._sample(message)
+        metadata = self._metadata(agent, agent_type, sample)
+
+        async def stream():
+            started = time.perf_counter()
+            async for chunk in agent.stream_message(
+                message, context, sample, buffer=buffer
+            ):
+                if "ttft_ms" not in metadata:
+                    metadata["ttft_ms"] = round(
+                        (time.perf_counter() - started) * 1000, 1
+                    )
+                yield chunk
+            metadata["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        return stream(), metadata
+
+    async def _run_item(
+        self,
+        index: int,
+        item: Union[str, Dict[str, Any]],
+        agent_type: str,
+        timeout: Optional[float],
+    ) -> Dict[str, Any]:
+        if isinstance(item, dict):
+            message = item["message"]
+            agent_type = item.get("agent_type", agent_type)
+            context = item.get("context")
+        else:
+            message, context = item, None
+        started = time.perf_counter()
+        agent_type, agent = self.route(message, agent_type)
+        routed = time.perf_counter()
+        sample = agent._sample(message)
+        result = {
+            "index": index,
+            "message": message,
+            "agent_type": agent_type,
+            "agent_used": agent.name,
+            "status": "ok",
+            "response": None,
+            "error": None,
+            "route_ms": round((routed - started) * 1000, 3),
+        }
+        # asyncio.wait rather than wait_for, so the batch deadline and the
+        # agent's own (simulated) timeout stay distinguishable
+        call = asyncio.ensure_future(agent.process_message(message, context, sample))
+        try:
+            done, _ = await asyncio.wait({call}, timeout=timeout)
+        except BaseException:
+            call.cancel()
+            raise
+        if not done:
+            call.cancel()
+            await asyncio.gather(call, return_exceptions=True)
+            result["status"] = "timeout"
+            result["error"] = f"No response within the batch timeout of {timeout:g}s"
+        elif isinstance(call.exception(), asyncio.TimeoutError):
+            result["status"] = "agent_timeout"
+            result["error"] = str(call.exception()) or f"{agent.name} timed out"
+        elif call.exception() is not None:
+            result["status"] = "error"
+            result["error"] = str(call.exception()) or type(call.exception()).__name__
+        else:
+            result["response"] = call.result()
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["metadata"] = self._metadata(agent, agent_type, sample)
+        return result
+
+    async def process_batch(
+        self,
+        messages: Iterable[Union[str, Dict[str, Any]]],
+        agent_type: str = "auto",
+        concurrency: int = 32,
+        timeout: Optional[float] = 30.0,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Route and run many messages concurrently, yielding results as they complete
+
+        messages are strings or dicts with "message" and optional "agent_type"
+        and "context". At most `concurrency` run at once: that many workers
+        pull from the messages iterable, so a generator of thousands is never
+        materialised. Each item gets `timeout` seconds (None for no limit).
+        Failures come back as results rather than ending the batch, with
+        status "timeout" (the batch's per-item timeout), "agent_timeout" (the
+        agent itself timed out) or "error". Results carry the input
+        index, since completion order differs from input order. Stop
+        iterating to cancel the remaining work.
+        """
+        pending = enumerate(messages)
+        workers = max(1, concurrency)
+        results: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+
+        async def worker():
+            try:
+                for index, item in pending:
+                    await results.put(
+                        await self._run_item(index, item, agent_type, timeout)
+                    )
+            except Exception:
+                await results.put(None)
+                raise
+            await results.put(None)
+
+        tasks = [asyncio.ensure_future(worker()) for _ in range(workers)]
+        try:
+            running = len(tasks)
+            while running:
+                result = await results.get()
+                if result is None:
+                    running -= 1
+                    continue
+                yield result
+            for task in tasks:
+                # Re-raise anything that broke a worker, e.g. a malformed item
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
 
 # Mock classes to replace agent-squad imports
@@ -130,6 +643,64 @@ def create_demo_orchestrator():
     return MockOrchestrator()
 
 
+def synthetic_messages(count: int, seed: Optional[int] = None) -> List[str]:
+    """Varied demo questions, spread across the auto-routing keywords, for load tests"""
+    rng = random.Random(seed)
+    openers = [
+        "How do I",
+        "What's the best way to",
+        "Can you explain how to",
+        "Help me",
+    ]
+    topics = [
+        "optimize a slow SQL query",
+        "back up my Neon database",
+        "tune database connection pools",
+        "scale my app on AWS",
+        "set up enterprise SSO",
+        "write a Python retry decorator",
+        "structure a REST API",
+        "summarize this error log",
+        "plan a schema migration",
+        "reduce cloud costs at scale",
+    ]
+    return [
+        f"{rng.choice(openers)} {rng.choice(topics)}?"
+        + " Please be detailed." * rng.randint(0, 3)
+        for _ in range(count)
+    ]
+
+
+def summarize_batch(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles of process_batch results"""
+    latencies = sorted(r["latency_ms"] for r in results if r["status"] == "ok")
+
+    def percentile(p: float) -> Optional[float]:
+        return (
+            latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+            if latencies
+            else None
+        )
+
+    by_agent: Dict[str, int] = {}
+    by_status: Dict[str, int] = {}
+    for r in results:
+        by_agent[r["agent_type"]] = by_agent.get(r["agent_type"], 0) + 1
+        by_status[r["status"]] = by_status.get(r["status"], 0) + 1
+    return {
+        "messages": len(results),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_s": round(len(results) / elapsed, 1) if elapsed > 0 else None,
+        "latency_p50_ms": percentile(0.5),
+        "latency_p95_ms": percentile(0.95),
+        "route_ms_avg": round(sum(r["route_ms"] for r in results) / len(results), 4)
+        if results
+        else None,
+        "by_status": by_status,
+        "by_agent": by_agent,
+    }
+
+
 def get_agent_status():
     """Get status of available agents"""
     return {
@@ -149,3 +720,16 @@ def simulate_streaming_response(text: str):
         yield chunk + " "
         import time
         time.sleep(0.1)
+
+
+async def simulate_streaming_response_async(
+    text: str, chunk_delay: float = 0.1
+) -> AsyncIterator[str]:
+    """simulate_streaming_response as an async generator
+
+    Same three-word chunks, but the delays do not block the event loop.
+    """
+    words = text.split()
+    for i in range(0, len(words), 3):
+        yield " ".join(words[i : i + 3]) + " "
+        await asyncio.sleep(chunk_delay)
@@ -16,7 +16,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:
     from agent_squad.orchestrator import AgentSquad
     from agent_squad.agents import BedrockLLMAgent, BedrockLLMAgentOptions, AnthropicAgent, AnthropicAgentOptions
-    from mcp.neonpanel_agent import create_neonpanel_agent
+    from agent_squad.types import ConversationMessage, ParticipantRole
+    from mcp.neonpanel_agent import get_neonpanel_agent, llm_config_key, message_text
+
     AGENTS_AVAILABLE = True
 except ImportError:
     # Use mock agents for demo
@@ -60,9 +62,23 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
 if "orchestrator" not in st.session_state:
     st.session_state.orchestrator = None
+if "neonpanel_agent" not in st.session_state:
+    st.session_state.neonpanel_agent = None
 if "user_id" not in st.session_state:
     st.session_state.user_id = "user_" + str(hash(str(datetime.now())))
 
+
+def chat_session_id() -> str:
+    return f"session_{st.session_state.user_id}"
+
+
+def reset_neonpanel_context():
+    """Make the NeonPanel agent send full data again once the LLM history is gone"""
+    neonpanel_agent = st.session_state.neonpanel_agent
+    if neonpanel_agent is not None and neonpanel_agent.context_differ is not None:
+        neonpanel_agent.context_differ.reset(chat_session_id())
+
+
 # Sidebar configuration
 with st.sidebar:
     st.header("⚙️ Configuration")
@@ -99,6 +115,8 @@ with st.sidebar:
                     streaming,
                     temperature
                 )
+                # The new orchestrator starts with empty chat storage
+                reset_neonpanel_context()
                 st.success("Agents initialized successfully!")
         else:
             st.error("Please provide at least an Anthropic API key to get started.")
@@ -152,10 +170,19 @@ def initialize_orchestrator(anthropic_key: str, aws_region: str, neonpanel_key:
             # Set environment variable for the NeonPanel client
             os.environ["NEONPANEL_API_KEY"] = neonpanel_key
             try:
-                neonpanel_agent = create_neonpanel_agent()
-                # Note: NeonPanel agent needs to be adapted to work with the orchestrator
-                # For now, we'll create a wrapper
-                orchestrator.add_agent(create_neonpanel_wrapper(neonpanel_agent, anthropic_key, streaming, temperature))
+                # The orchestrator routes to the Anthropic wrapper; the NeonPanel agent
+                # gathers data for its prompts and answers through the same model.
+                # Sessions with the same settings share one pooled agent.
+                neonpanel_agent = get_neonpanel_agent(
+                    llm_key=llm_config_key(
+                        "anthropic", anthropic_key, streaming, temperature
+                    ),
+                    llm_factory=lambda: create_neonpanel_wrapper(
+                        anthropic_key, streaming, temperature
+                    ),
+                )
+                st.session_state.neonpanel_agent = neonpanel_agent
+                orchestrator.add_agent(neonpanel_agent.llm_agent)
             except:
                 st.warning("NeonPanel agent unavailable - using mock version")
     
@@ -165,7 +192,8 @@ def initialize_orchestrator(anthropic_key: str, aws_region: str, neonpanel_key:
     
     return orchestrator
 
-def create_neonpanel_wrapper(neonpanel_agent, anthropic_key: str, streaming: bool, temperature: float):
+
+def create_neonpanel_wrapper(anthropic_key: str, streaming: bool, temperature: float):
     """Create a wrapper for NeonPanel agent to work with the orchestrator"""
     return AnthropicAgent(AnthropicAgentOptions(
         name="NeonPanel Agent",
@@ -178,6 +206,93 @@ def create_neonpanel_wrapper(neonpanel_agent, anthropic_key: str, streaming: boo
         temperature=temperature
     ))
 
+
+def save_streamed_turn(orchestrator, agent, response, user_id: str, session_id: str):
+    """Pass response's stream through, then store the turn in the chat storage
+
+    The user turn is stored as the prompt the LLM was sent, so the NeonPanel
+    agent can diff later turns against the data it carried.
+    """
+    source = response.output
+
+    async def stream():
+        parts, final_message = [], None
+        async for chunk in source:
+            parts.append(chunk.text or "")
+            final_message = chunk.final_message or final_message
+            yield chunk
+        agent_input = response.metadata.additional_params.get(
+            "agent_input", response.metadata.user_input
+        )
+        await orchestrator.save_message(
+            ConversationMessage(
+                role=ParticipantRole.USER.value, content=[{"text": agent_input}]
+            ),
+            user_id,
+            session_id,
+            agent,
+        )
+        if final_message is None or not message_text(final_message):
+            final_message = ConversationMessage(
+                role=ParticipantRole.ASSISTANT.value, content=[{"text": "".join(parts)}]
+            )
+        await orchestrator.save_message(final_message, user_id, session_id, agent)
+
+    response.output = stream()
+    return response
+
+
+async def route_with_prefetch(
+    orchestrator,
+    neonpanel_agent,
+    prompt: str,
+    user_id: str,
+    session_id: str,
+    stream_response: bool,
+):
+    """Route prompt, prefetching the NeonPanel data it likely needs while classifying
+
+    If the NeonPanel agent is selected it answers through respond(), streaming
+    from the prefetched data; otherwise the prefetch is discarded.
+    """
+    if neonpanel_agent is None or not hasattr(orchestrator, "classify_request"):
+        return await orchestrator.route_request(
+            prompt, user_id, session_id, {}, stream_response
+        )
+
+    context = {"user_id": user_id, "session_id": session_id}
+    neonpanel_agent.prefetch(prompt, context)
+    try:
+        classifier_result = await orchestrator.classify_request(
+            prompt, user_id, session_id
+        )
+    except Exception:
+        neonpanel_agent.discard_prefetch(prompt, context)
+        raise
+
+    selected = classifier_result.selected_agent
+    if selected is None or selected.name != neonpanel_agent.name:
+        neonpanel_agent.discard_prefetch(prompt, context)
+    if selected is None:
+        # Let the orchestrator produce its usual "no agent" reply
+        return await orchestrator.route_request(
+            prompt, user_id, session_id, {}, stream_response
+        )
+
+    if selected.name == neonpanel_agent.name:
+        # Data already in this history can be sent as changes only
+        chat_history = await orchestrator.storage.fetch_chat(
+            user_id, session_id, selected.id
+        )
+        response = await neonpanel_agent.respond(
+            prompt, user_id, session_id, context, chat_history
+        )
+        return save_streamed_turn(orchestrator, selected, response, user_id, session_id)
+    return await orchestrator.agent_process_request(
+        prompt, user_id, session_id, classifier_result, {}, stream_response
+    )
+
+
 # Chat interface
 if st.session_state.orchestrator:
     # Display chat messages
@@ -201,32 +316,37 @@ if st.session_state.orchestrator:
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
                 try:
-                    response = asyncio.run(
-                        st.session_state.orchestrator.route_request(
+                    content_placeholder = st.empty()
+                    content_ref = [""]
+
+                    async def route_and_stream():
+                        # Route and consume the stream on one loop: the stream's
+                        # connections belong to the loop that opened them
+                        response = await route_with_prefetch(
+                            st.session_state.orchestrator,
+                            st.session_state.neonpanel_agent,
                             prompt,
                             st.session_state.user_id,
-                            f"session_{st.session_state.user_id}",
-                            {},
-                            streaming=True
+                            chat_session_id(),
+                            stream_response=True,
                         )
-                    )
-                    
-                    if hasattr(response, 'streaming') and response.streaming:
-                        # Handle streaming response
-                        content_placeholder = st.empty()
-                        full_content = ""
-                        
-                        async def stream_response(content_ref):
+                        if hasattr(response, "streaming") and response.streaming:
                             async for chunk in response.output:
-                                if hasattr(chunk, 'text'):
-                                    content_ref[0] += chunk.text
-                                    content_placeholder.markdown(f"**{response.metadata.agent_name}:** {content_ref[0]}")
+                                if hasattr(chunk, "text"):
+                                    content_ref[0] += chunk.text or ""
                                 elif isinstance(chunk, str):
                                     content_ref[0] += chunk
-                                    content_placeholder.markdown(f"**{response.metadata.agent_name}:** {content_ref[0]}")
-                        
-                        content_ref = [full_content]
-                        asyncio.run(stream_response(content_ref))
+                                else:
+                                    continue
+                                agent_name = response.metadata.agent_name
+                                content_placeholder.markdown(
+                                    f"**{agent_name}:** {content_ref[0]}"
+                                )
+                        return response
+
+                    response = asyncio.run(route_and_stream())
+                    
+                    if hasattr(response, 'streaming') and response.streaming:
                         full_content = content_ref[0]
                         
                         # Add to chat history
@@ -293,4 +413,5 @@ else:
 if st.session_state.messages:
     if st.button("🗑️ Clear Chat History"):
         st.session_state.messages = []
+        reset_neonpanel_context()
         st.rerun()
@@ -8,6 +8,8 @@ import asyncio
 import json
 import sys
 import os
+import threading
+import pandas as pd
 from datetime import datetime
 from typing import Dict, Any, List
 
@@ -64,6 +66,10 @@ with st.sidebar:
     if auto_refresh:
         st.info("Dashboard will auto-refresh every 30 seconds")
 
+    # Client-side cache and transport counters
+    with st.expander("📈 Client Metrics"):
+        st.json(neonpanel_client.metrics())
+
 # Check if configured
 if not os.getenv("NEONPANEL_API_KEY"):
     st.warning("Please configure your NeonPanel API key in the sidebar to access the dashboard.")
@@ -122,10 +128,31 @@ with tab1:
                     delta=f"{server_stats.get('memory_change', 0)}%"
                 )
             
-            # Additional charts or data visualization could go here
+            # Trends from the client's in-memory stats history (no refetching)
             st.subheader("📈 Trends")
-            st.info("Charts and graphs will be displayed here when real data is available")
-            
+            history = neonpanel_client.stats_history
+            windows = {
+                "Last 5 minutes": 300,
+                "Last 15 minutes": 900,
+                "Last hour": 3600,
+                "All history": None,
+            }
+            trend_window = windows[st.selectbox("Window", list(windows), index=1)]
+
+            if len(history) >= 2:
+                columns = history.to_columns(trend_window)
+                chart_data = pd.DataFrame(columns).set_index("timestamp")
+                st.line_chart(chart_data[["cpu_usage", "memory_usage", "disk_usage"]])
+                st.line_chart(chart_data[["network_in", "network_out"]])
+
+                summary = history.aggregate(trend_window, percentiles=(50, 95))
+                st.dataframe(pd.DataFrame(summary).T, use_container_width=True)
+            else:
+                st.info(
+                    f"Collected {len(history)} stats sample(s); trends appear once "
+                    "at least two have been recorded"
+                )
+
         else:
             st.error("Unable to fetch server statistics. Please check your API key and connection.")
             if server_stats.get('error'):
@@ -168,6 +195,111 @@ with tab2:
             else:
                 st.warning("Please provide both server ID and action")
 
+    st.divider()
+    st.subheader("Bulk Actions")
+
+    if "bulk_cancel" not in st.session_state:
+        st.session_state.bulk_cancel = threading.Event()
+
+    target_mode = st.radio("Targets", ["Server IDs", "Selector"], horizontal=True)
+    if target_mode == "Server IDs":
+        bulk_ids_text = st.text_area(
+            "Server IDs (one per line or comma-separated)", key="bulk_server_ids"
+        )
+        bulk_server_ids = [
+            sid.strip()
+            for sid in bulk_ids_text.replace(",", "\n").splitlines()
+            if sid.strip()
+        ]
+        bulk_selector = None
+    else:
+        selector_query = st.text_input("Search query", key="bulk_selector_query")
+        selector_status = st.selectbox(
+            "Status",
+            ["any", "active", "inactive", "pending"],
+            key="bulk_selector_status",
+        )
+        bulk_server_ids = None
+        bulk_selector = {"query": selector_query}
+        if selector_status != "any":
+            bulk_selector["status"] = selector_status
+
+    bcol1, bcol2, bcol3, bcol4 = st.columns(4)
+    with bcol1:
+        bulk_action = st.selectbox(
+            "Bulk action", ["restart", "start", "stop", "status"]
+        )
+    with bcol2:
+        bulk_concurrency = st.number_input(
+            "Parallelism", min_value=1, max_value=100, value=10
+        )
+    with bcol3:
+        bulk_batch_size = st.number_input(
+            "Rolling batch size (0 = all at once)", min_value=0, max_value=1000, value=0
+        )
+    with bcol4:
+        bulk_max_failures = st.number_input(
+            "Abort after failures", min_value=0, max_value=1000, value=5
+        )
+
+    run_col, cancel_col = st.columns([1, 1])
+    with cancel_col:
+        if st.button("⏹️ Cancel Bulk Action"):
+            st.session_state.bulk_cancel.set()
+    with run_col:
+        run_bulk = st.button("▶️ Run Bulk Action")
+
+    if run_bulk:
+        if bulk_server_ids or bulk_selector:
+            st.session_state.bulk_cancel = threading.Event()
+            progress = st.progress(0.0, text="Starting...")
+            results_table = st.empty()
+
+            async def run_bulk_action():
+                rows = []
+                async for event in neonpanel_client.iter_bulk_server_action(
+                    bulk_action,
+                    server_ids=bulk_server_ids,
+                    selector=bulk_selector,
+                    concurrency=int(bulk_concurrency),
+                    batch_size=int(bulk_batch_size) or None,
+                    max_failures=int(bulk_max_failures),
+                    cancel_event=st.session_state.bulk_cancel,
+                ):
+                    rows.append(
+                        {
+                            "server_id": event["server_id"],
+                            "status": event["status"],
+                            "batch": event["batch"],
+                            "detail": event.get("error")
+                            or event.get("result", {}).get("status", ""),
+                        }
+                    )
+                    progress.progress(
+                        event["completed"] / event["total"],
+                        text=f"{event['completed']}/{event['total']} servers processed",
+                    )
+                    results_table.dataframe(rows, use_container_width=True)
+                return rows
+
+            try:
+                rows = asyncio.run(run_bulk_action())
+                if rows:
+                    counts = {}
+                    for row in rows:
+                        counts[row["status"]] = counts.get(row["status"], 0) + 1
+                    st.success(
+                        ", ".join(
+                            f"{count} {status}" for status, count in counts.items()
+                        )
+                    )
+                else:
+                    st.info("No servers matched the selection")
+            except Exception as e:
+                st.error(f"Error running bulk action: {str(e)}")
+        else:
+            st.warning("Please provide server IDs or a selector")
+
 with tab3:
     st.header("👥 User Management")
     
@@ -199,29 +331,76 @@ with tab3:
                 st.warning("Please provide a user ID")
     
     with col2:
-        st.subheader("User Statistics")
-        st.info("User statistics will be displayed here")
+        st.subheader("Bulk User Lookup")
+        bulk_user_ids = st.text_area("User IDs (one per line or comma-separated)")
+
+        if st.button("Get Users"):
+            ids = [
+                uid.strip()
+                for uid in bulk_user_ids.replace(",", "\n").splitlines()
+                if uid.strip()
+            ]
+            if ids:
+                progress = st.progress(0.0, text=f"Fetching {len(ids)} users...")
+                table = st.empty()
+
+                async def fetch_users():
+                    rows = [None] * len(ids)
+                    done = 0
+                    async for index, uid, user in neonpanel_client.iter_users(ids):
+                        rows[index] = {"user_id": uid, **user}
+                        done += 1
+                        progress.progress(
+                            done / len(ids), text=f"Fetched {done}/{len(ids)} users"
+                        )
+                    return rows
+
+                try:
+                    rows = asyncio.run(fetch_users())
+                    failed = sum(1 for row in rows if "error" in row)
+                    table.dataframe(rows, use_container_width=True)
+                    if failed:
+                        st.warning(f"{failed} of {len(ids)} lookups failed")
+                except Exception as e:
+                    st.error(f"Error fetching users: {str(e)}")
+            else:
+                st.warning("Please provide at least one user ID")
 
 with tab4:
     st.header("🔍 Resource Search")
     
     search_query = st.text_input("Search Query", placeholder="Enter search terms...")
+    max_search_results = st.number_input(
+        "Max results", min_value=10, max_value=5000, value=200, step=50
+    )
     
     if st.button("Search Resources") or search_query:
         if search_query:
             try:
-                with st.spinner("Searching resources..."):
-                    search_results = asyncio.run(neonpanel_client.search_resources(search_query))
+                status = st.empty()
+                results_container = st.container()
                 
-                if search_results:
-                    st.success(f"Found {len(search_results)} results")
-                    
-                    # Display search results
-                    for i, result in enumerate(search_results):
-                        with st.expander(f"Result {i+1}: {result.get('name', 'Unknown')}"):
+                # Render each result as soon as its page arrives
+                async def stream_results():
+                    count = 0
+                    async for result in neonpanel_client.iter_search_resources(
+                        search_query, max_results=max_search_results
+                    ):
+                        count += 1
+                        status.info(f"Found {count} results so far...")
+                        with results_container.expander(
+                            f"Result {count}: {result.get('name', 'Unknown')}"
+                        ):
                             st.json(result)
+                    return count
+
+                status.info("Searching resources...")
+                result_count = asyncio.run(stream_results())
+
+                if result_count:
+                    status.success(f"Found {result_count} results")
                 else:
-                    st.info("No results found for your search query")
+                    status.info("No results found for your search query")
             
             except Exception as e:
                 st.error(f"Error searching resources: {str(e)}")
@@ -9,7 +9,12 @@ import time
 try:
     import sys
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from mock_agents import create_demo_orchestrator, simulate_streaming_response
+    from mock_agents import (
+        create_demo_orchestrator,
+        synthetic_messages,
+        summarize_batch,
+    )
+
     DEMO_AVAILABLE = True
 except ImportError:
     DEMO_AVAILABLE = False
@@ -66,6 +71,36 @@ with st.sidebar:
         last_agent = st.session_state.demo_messages[-1].get("agent_used", "Unknown")
         st.metric("Last Agent Used", last_agent)
     
+    # Load test: synthetic conversations through the same routing and agents
+    with st.expander("🚀 Load Test"):
+        batch_size = st.number_input(
+            "Messages", min_value=10, max_value=20000, value=1000, step=100
+        )
+        batch_concurrency = st.slider("Concurrency", 1, 1000, 200)
+        batch_timeout = st.slider("Per-message timeout (s)", 1, 60, 30)
+        if st.button("Run batch"):
+            progress = st.progress(0.0)
+            results = []
+
+            async def run_batch():
+                started = time.perf_counter()
+                async for result in st.session_state.demo_orchestrator.process_batch(
+                    synthetic_messages(int(batch_size)),
+                    agent_type,
+                    concurrency=batch_concurrency,
+                    timeout=batch_timeout,
+                ):
+                    results.append(result)
+                    if len(results) % 50 == 0:
+                        progress.progress(len(results) / batch_size)
+                return time.perf_counter() - started
+
+            elapsed = asyncio.run(run_batch())
+            progress.progress(1.0)
+            summary = summarize_batch(results, elapsed)
+            st.metric("Throughput", f"{summary['throughput_per_s']} msg/s")
+            st.json(summary)
+
     # Clear chat
     if st.button("🗑️ Clear Chat", type="secondary"):
         st.session_state.demo_messages = []
@@ -106,48 +141,34 @@ if user_input:
     # Generate assistant response
     with st.chat_message("assistant"):
         if enable_streaming:
-            # Simulate streaming response
+            # Render chunks as the agent produces them
             response_placeholder = st.empty()
             full_response = ""
             
-            # Simulate async response generation
-            try:
-                # Mock async call
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                response, metadata = loop.run_until_complete(
-                    st.session_state.demo_orchestrator.process_message(user_input, agent_type)
+            async def consume_stream():
+                text = ""
+                orchestrator = st.session_state.demo_orchestrator
+                stream, stream_metadata = orchestrator.stream_message(
+                    user_input, agent_type
                 )
-                loop.close()
-                
-                # Simulate streaming by displaying response word by word
-                words = response.split()
-                for i in range(len(words)):
-                    partial_response = " ".join(words[:i+1])
-                    response_placeholder.write(partial_response)
-                    time.sleep(0.05)  # Simulate typing delay
-                
-                full_response = response
-                
+                async for chunk in stream:
+                    text += chunk
+                    response_placeholder.write(text + "▌")
+                return text, stream_metadata
+
+            try:
+                full_response, metadata = asyncio.run(consume_stream())
             except Exception as e:
                 full_response = f"Demo response for: '{user_input}'. This shows how the streaming interface works!"
-                metadata = {"demo_mode": True, "error": str(e)}
-                
-                for word in full_response.split():
-                    full_response_partial = full_response[:len(full_response.split())]
-                    response_placeholder.write(" ".join(full_response.split()[:len(full_response_partial.split()) + 1]))
-                    time.sleep(0.05)
+                metadata = {"demo_mode": True, "error": str(e) or type(e).__name__}
+
+            response_placeholder.write(full_response)
         else:
             # Non-streaming response
             try:
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                full_response, metadata = loop.run_until_complete(
+                full_response, metadata = asyncio.run(
                     st.session_state.demo_orchestrator.process_message(user_input, agent_type)
                 )
-                loop.close()
             except Exception as e:
                 full_response = f"Demo response for: '{user_input}'. This shows how the chat interface works!"
                 metadata = {"demo_mode": True, "error": str(e)}
@@ -206,13 +227,9 @@ if hasattr(st.session_state, 'temp_message'):
     })
     
     try:
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        response, metadata = loop.run_until_complete(
+        response, metadata = asyncio.run(
             st.session_state.demo_orchestrator.process_message(user_input, agent_type)
         )
-        loop.close()
     except Exception:
         response = f"Demo response for: '{user_input}'"
         metadata = {"demo_mode": True}
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+# Tests import the repo's mcp package (not the PyPI "mcp" SDK) from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the NeonPanel client off the network and out of the working directory
+os.environ.setdefault("NEONPANEL_DEMO_MODE", "true")
+os.environ.setdefault("NEONPANEL_CATALOG_MIRROR", "false")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+
+def serve_user(request: httpx.Request) -> httpx.Response:
+    """Answer GET /users/<id> with a minimal user record"""
+    parts = request.url.path.strip("/").split("/")
+    if request.method == "GET" and parts[0] == "users" and len(parts) == 2:
+        return httpx.Response(200, json={"user_id": parts[1], "status": "active"})
+    return httpx.Response(404, json={"detail": "not found"})
+
+
+class MockAPI:
+    """A NeonPanel client whose requests are answered in-process by a handler"""
+
+    def __init__(self, handler=serve_user, latency: float = 0):
+        from mcp.neonpanel_client import NeonPanelMCPClient
+        from mcp.rate_limit import RateLimiter
+
+        self.handler = handler
+        self.latency = latency
+        self.requests = []
+        self.client = NeonPanelMCPClient(demo_mode=True)
+        self.client.demo_mode = False
+        self.client.rate_limiter = RateLimiter(rate=0)
+        self.client._http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(self._handle),
+            base_url="http://neonpanel.test",
+        )
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.handler(request)
+
+
+@pytest.fixture
+def mock_api():
+    """Factory for MockAPI instances, closed after the test"""
+    created = []
+
+    def make(*args, **options) -> MockAPI:
+        api = MockAPI(*args, **options)
+        created.append(api)
+        return api
+
+    yield make
+    for api in created:
+        asyncio.run(api.client.shutdown())
+
+
+class FakeAPI:
+    """The mcp.fake_server app, served in-process to a NeonPanel client"""
+
+    def __init__(self, **config):
+        from mcp.fake_server import FakeServerConfig, create_app
+        from mcp.neonpanel_client import NeonPanelMCPClient
+        from mcp.rate_limit import RateLimiter
+
+        options = dict(latency_ms=0, tail_probability=0, stats_interval=0)
+        options.update(config)
+        self.app = create_app(FakeServerConfig(**options))
+        self.client = NeonPanelMCPClient(demo_mode=True)
+        self.client.demo_mode = False
+        self.client.rate_limiter = RateLimiter(rate=0)
+        self.client._http_client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self.app),
+            base_url="http://neonpanel.test",
+        )
+
+    @property
+    def counters(self):
+        return self.app.state.counters
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """Factory for FakeAPI instances, closed after the test"""
+    monkeypatch.setenv("NEONPANEL_RETRY_BASE_DELAY", "0")
+    created = []
+
+    def make(**config) -> FakeAPI:
+        api = FakeAPI(**config)
+        created.append(api)
+        return api
+
+    yield make
+    for api in created:
+        asyncio.run(api.client.shutdown())
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from mcp.agent_pool import AgentPool
+from mcp.neonpanel_agent import get_neonpanel_agent, llm_config_key
+
+
+class Pooled:
+    def __init__(self, name: str = "agent", fail_warm_up: bool = False):
+        self.name = name
+        self.fail_warm_up = fail_warm_up
+        self.warmed = self.closed = False
+
+    def warm_up(self):
+        if self.fail_warm_up:
+            raise RuntimeError("no network")
+        self.warmed = True
+
+    def close(self):
+        self.closed = True
+
+
+def test_instances_are_built_once_per_key_and_warmed_up():
+    pool = AgentPool()
+    built = []
+
+    def factory():
+        built.append(1)
+        return Pooled()
+
+    first = pool.get("claude", factory)
+    assert pool.get("claude", factory) is first
+    assert first.warmed and len(built) == 1
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_concurrent_first_use_builds_one_instance():
+    pool = AgentPool()
+    built = []
+
+    def slow_factory():
+        built.append(1)
+        time.sleep(0.05)
+        return Pooled()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(pool.get("k", slow_factory)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+    assert len({id(result) for result in results}) == 1
+
+
+def test_least_recently_used_and_idle_instances_are_closed():
+    pool = AgentPool(max_size=2, idle_timeout=None)
+    a = pool.get("a", lambda: Pooled("a"))
+    b = pool.get("b", lambda: Pooled("b"))
+    pool.get("a", lambda: Pooled("a"))
+    pool.get("c", lambda: Pooled("c"))
+    assert b.closed and not a.closed
+    assert len(pool) == 2 and pool.stats()["evictions"] == 1
+
+    pool.idle_timeout = 0.01
+    time.sleep(0.02)
+    pool.evict_idle()
+    assert a.closed and len(pool) == 0
+
+
+def test_failed_warm_up_still_hands_out_the_instance():
+    pool = AgentPool()
+    agent = pool.get("k", lambda: Pooled(fail_warm_up=True))
+    assert isinstance(agent, Pooled) and not agent.warmed
+    assert pool.stats()["warmup_errors"] == 1
+
+
+def test_prewarm_builds_in_the_background():
+    pool = AgentPool()
+    pool.prewarm("k", Pooled).join(5)
+    assert pool.stats()["misses"] == 1
+    assert pool.get("k", Pooled).warmed
+
+
+def test_neonpanel_agents_are_shared_per_configuration():
+    key = llm_config_key("anthropic", "sk-secret", "test-shared-agents")
+    assert "sk-secret" not in key and len(key) == 16
+
+    first = get_neonpanel_agent(key, object, context_token_budget=500)
+    assert get_neonpanel_agent(key, object, context_token_budget=500) is first
+    other = get_neonpanel_agent(key, object, context_token_budget=900)
+    assert other is not first
+    assert other.context_renderer.budget == 900
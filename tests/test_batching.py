@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from mcp.batching import BatchLoader
+
+
+def recording_loader(**options):
+    batches = []
+
+    async def batch_fn(keys, group):
+        batches.append((group, list(keys)))
+        await asyncio.sleep(0)
+        return {key: f"{group}:{key}" for key in keys if key != "missing"}
+
+    return BatchLoader(batch_fn, **options), batches
+
+
+def serve_users_batch(request: httpx.Request) -> httpx.Response:
+    ids = json.loads(request.content)["ids"]
+    users = [{"user_id": user_id} for user_id in ids]
+    return httpx.Response(200, json={"users": users, "errors": {}})
+
+
+def test_loads_in_the_same_tick_share_batches():
+    loader, batches = recording_loader(max_batch_size=3)
+
+    async def run():
+        keys = ["a", "b", "c", "a", "d"]
+        return await asyncio.gather(*(loader.load(key, "hi") for key in keys))
+
+    assert asyncio.run(run()) == ["hi:a", "hi:b", "hi:c", "hi:a", "hi:d"]
+    # Split at max_batch_size; the repeated key is fetched once per batch
+    assert batches == [("hi", ["a", "b", "c"]), ("hi", ["a", "d"])]
+
+
+def test_groups_are_batched_separately():
+    loader, batches = recording_loader()
+
+    async def run():
+        return await asyncio.gather(loader.load("a", 1), loader.load("b", 2))
+
+    assert asyncio.run(run()) == ["1:a", "2:b"]
+    assert sorted(batches) == [(1, ["a"]), (2, ["b"])]
+
+
+def test_missing_keys_and_batch_failures_raise_per_key():
+    loader, _ = recording_loader()
+
+    async def run():
+        return await asyncio.gather(
+            loader.load("a"), loader.load("missing"), return_exceptions=True
+        )
+
+    found, missing = asyncio.run(run())
+    assert found == "None:a"
+    assert isinstance(missing, KeyError)
+
+    async def broken(keys, group):
+        raise ConnectionError("down")
+
+    loader = BatchLoader(broken)
+    with pytest.raises(ConnectionError):
+        asyncio.run(loader.load("a"))
+
+
+def test_concurrent_batches_are_bounded():
+    running = peak = 0
+
+    async def batch_fn(keys, group):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {key: key for key in keys}
+
+    loader = BatchLoader(batch_fn, max_batch_size=1, max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(*(loader.load(i) for i in range(6)))
+
+    assert asyncio.run(run()) == list(range(6))
+    assert peak == 2
+    assert loader.stats()["batches"] == 6
+
+
+def test_client_looks_up_users_through_the_batch_endpoint(mock_api):
+    api = mock_api(serve_users_batch)
+    user_ids = [str(i) for i in range(250)]
+
+    users = asyncio.run(api.client.get_users(user_ids))
+    assert [user["user_id"] for user in users] == user_ids
+    assert len(api.requests) == 3
+
+
+def test_client_fans_out_without_a_batch_endpoint(mock_api):
+    api = mock_api()
+
+    users = asyncio.run(api.client.get_users(["1", "2", "3"]))
+    assert [user["user_id"] for user in users] == ["1", "2", "3"]
+    # One 404 from the batch endpoint, then one request per user
+    assert len(api.requests) == 4
+    assert api.client._users_batch_supported is False
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+from mcp.neonpanel_client import NeonPanelMCPClient
+
+
+def make_client(fail=()):
+    client = NeonPanelMCPClient(demo_mode=True)
+    executed = []
+
+    async def execute(server_id, action):
+        executed.append(server_id)
+        await asyncio.sleep(0.001)
+        if server_id in fail:
+            raise RuntimeError(f"{action} failed on {server_id}")
+        return {"server_id": server_id, "action": action}
+
+    client._execute_action = execute
+    client._invalidate_server_state = lambda: None
+    return client, executed
+
+
+def collect(client, server_ids, **options):
+    async def run():
+        return [
+            event
+            async for event in client.iter_bulk_server_action(
+                "restart", server_ids, **options
+            )
+        ]
+
+    return asyncio.run(run())
+
+
+def test_runs_every_target_once():
+    client, executed = make_client()
+    events = collect(client, ["s1", "s2", "s1", "s3"], concurrency=2)
+    assert sorted(executed) == ["s1", "s2", "s3"]
+    assert {e["status"] for e in events} == {"succeeded"}
+    assert events[-1]["completed"] == events[-1]["total"] == 3
+
+
+def test_max_failures_stops_launching_without_batches():
+    servers = [f"s{i}" for i in range(50)]
+    client, executed = make_client(fail=set(servers))
+    events = collect(client, servers, concurrency=1, max_failures=2)
+    statuses = [e["status"] for e in events]
+    assert statuses.count("failed") == 3
+    assert statuses.count("skipped") == 47
+    assert len(executed) == 3
+
+
+def test_max_failures_with_parallel_actions_bounds_launches():
+    servers = [f"s{i}" for i in range(100)]
+    client, executed = make_client(fail=set(servers))
+    events = collect(client, servers, concurrency=5, max_failures=5)
+    # Actions already running when the limit is crossed may still finish
+    assert len(executed) <= 5 + 5
+    assert sum(e["status"] == "skipped" for e in events) >= 90
+
+
+def test_max_failures_skips_later_batches():
+    servers = [f"s{i}" for i in range(6)]
+    client, executed = make_client(fail={"s0", "s1"})
+    events = collect(client, servers, concurrency=2, batch_size=2, max_failures=1)
+    assert executed == ["s0", "s1"]
+    assert [e["status"] for e in events[2:]] == ["skipped"] * 4
+    assert {e["batch"] for e in events[2:]} == {2, 3}
+
+
+def test_cancel_event_cancels_remaining():
+    cancel = threading.Event()
+    cancel.set()
+    client, executed = make_client()
+    events = collect(client, ["s1", "s2"], cancel_event=cancel)
+    assert executed == []
+    assert {e["status"] for e in events} == {"cancelled"}
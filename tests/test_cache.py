@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+from mcp.cache import EXPIRED, FRESH, MISS, STALE, ResponseCache, Validators
+
+
+def age(cache: ResponseCache, key: tuple, seconds: float):
+    cache._entries[key].stored_at = time.monotonic() - seconds
+
+
+def test_entry_goes_fresh_stale_then_miss():
+    cache = ResponseCache(stale_ttl=10)
+    key = ("user_data", "1")
+    assert cache.lookup(key)[1] == MISS
+
+    cache.set(key, {"id": 1}, ttl=5)
+    entry, state = cache.lookup(key)
+    assert (entry.value, state) == ({"id": 1}, FRESH)
+
+    age(cache, key, 6)
+    assert cache.lookup(key)[1] == STALE
+    age(cache, key, 16)
+    assert cache.lookup(key) == (None, MISS)
+    assert key not in cache._entries
+
+
+def test_expired_entry_with_validators_is_kept_for_revalidation():
+    cache = ResponseCache(stale_ttl=0)
+    key = ("search", "web")
+    cache.set(key, {"results": []}, ttl=1, validators=Validators(etag='"v1"'))
+    age(cache, key, 5)
+    entry, state = cache.lookup(key)
+    assert state == EXPIRED
+    assert entry.validators.etag == '"v1"'
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.set(("user_data", "1"), 1, ttl=60)
+    cache.set(("user_data", "2"), 2, ttl=60)
+    cache.lookup(("user_data", "1"))
+    cache.set(("user_data", "3"), 3, ttl=60)
+
+    assert cache.lookup(("user_data", "2"))[1] == MISS
+    assert cache.lookup(("user_data", "1"))[1] == FRESH
+    assert cache.stats()["endpoints"]["user_data"]["evictions"] == 1
+
+
+def test_invalidate_by_endpoint_and_stats():
+    cache = ResponseCache()
+    cache.set(("user_data", "1"), 1, ttl=60)
+    cache.set(("server_stats",), {}, ttl=60)
+    cache.lookup(("user_data", "1"))
+    cache.lookup(("user_data", "2"))
+    cache.invalidate("user_data")
+
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["endpoints"]["user_data"]["invalidations"] == 1
+
+
+def test_client_serves_repeat_reads_from_cache(mock_api):
+    api = mock_api()
+
+    async def read_twice():
+        first = await api.client.get_user_data("42")
+        return first, await api.client.get_user_data("42")
+
+    first, second = asyncio.run(read_twice())
+    assert first == second and first["user_id"] == "42"
+    assert len(api.requests) == 1
+    assert api.client.cache_stats()["endpoints"]["user_data"]["hits"] == 1
+
+
+def test_client_serves_stale_data_while_refreshing(mock_api):
+    api = mock_api()
+    api.client.cache_ttls["user_data"] = 0
+
+    async def run():
+        await api.client.get_user_data("42")
+        stale = await api.client.get_user_data("42")
+        for _ in range(100):
+            if len(api.requests) == 2:
+                break
+            await asyncio.sleep(0.01)
+        return stale
+
+    assert asyncio.run(run())["user_id"] == "42"
+    assert len(api.requests) == 2
+    assert api.client.cache_stats()["endpoints"]["user_data"]["stale_hits"] == 1
@@ -0,0 +1,106 @@
+import asyncio
+import sqlite3
+
+import httpx
+import pytest
+
+from mcp.catalog import CatalogMirror
+from mcp.neonpanel_client import NeonPanelMCPClient
+from mcp.rate_limit import RateLimiter
+
+RESOURCES = [
+    {
+        "id": "1",
+        "name": "web-frontend",
+        "type": "server",
+        "status": "active",
+        "region": "eu",
+    },
+    {
+        "id": "2",
+        "name": "web-backend",
+        "type": "server",
+        "status": "inactive",
+        "region": "us",
+    },
+    {
+        "id": "3",
+        "name": "orders-db",
+        "type": "database",
+        "status": "active",
+        "region": "eu",
+    },
+]
+
+
+@pytest.fixture
+def mirror():
+    mirror = CatalogMirror(":memory:")
+    mirror.replace_all(RESOURCES)
+    mirror.mark_synced()
+    yield mirror
+    mirror.close()
+
+
+@pytest.fixture
+def client(mirror):
+    client = NeonPanelMCPClient(demo_mode=True)
+    client.demo_mode = False
+    client.catalog_enabled = True
+    client._catalog = mirror
+    client.rate_limiter = RateLimiter(rate=0)
+    client.start_catalog_sync = lambda: None
+    return client
+
+
+def test_search_by_prefix_and_filter(mirror):
+    assert {r["id"] for r in mirror.search("web")} == {"1", "2"}
+    assert [r["id"] for r in mirror.search("web", status="active")] == ["1"]
+    assert [r["id"] for r in mirror.search("", type="database")] == ["3"]
+
+
+def test_apply_changes_upserts_deletes_and_keeps_cursor(mirror):
+    mirror.apply_changes(
+        [dict(RESOURCES[0], name="web-edge")], deleted=["2"], cursor="c1"
+    )
+    assert mirror.search("edge")[0]["id"] == "1"
+    assert mirror.search("backend") == []
+    assert mirror.cursor == "c1"
+
+
+def test_stale_mirror_is_not_used(client, mirror):
+    mirror.max_staleness = -1
+    assert client._search_catalog("web", 10) is None
+    assert mirror.misses == 1
+
+
+def test_catalog_errors_fall_back_to_api(client, mirror):
+    def broken(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    mirror.search = broken
+    assert client._search_catalog("web", 10) is None
+
+
+def test_mirror_is_opt_in(monkeypatch):
+    monkeypatch.delenv("NEONPANEL_CATALOG_MIRROR", raising=False)
+    assert NeonPanelMCPClient(demo_mode=True).catalog_enabled is False
+
+
+def test_full_resync_is_rate_limited(client, mirror):
+    requests = []
+
+    async def request(method, path, endpoint, **kwargs):
+        requests.append(path)
+        if path == "/resources/changes":
+            raise httpx.HTTPStatusError(
+                "no feed",
+                request=httpx.Request(method, path),
+                response=httpx.Response(404, request=httpx.Request(method, path)),
+            )
+        return httpx.Response(200, json={"results": RESOURCES, "next_cursor": None})
+
+    client._request = request
+    assert asyncio.run(client.sync_catalog()) == 3
+    assert asyncio.run(client.sync_catalog()) == 0
+    assert requests == ["/resources/changes", "/search"]
@@ -0,0 +1,63 @@
+import asyncio
+
+from mcp.neonpanel_client import NeonPanelMCPClient
+
+
+def expire_immediately(client: NeonPanelMCPClient, endpoint: str):
+    client.cache_ttls[endpoint] = 0
+    client.cache.stale_ttl = 0
+
+
+def test_unchanged_search_is_revalidated_with_a_304(fake_api):
+    api = fake_api(resource_count=50)
+    expire_immediately(api.client, "search")
+
+    async def search_twice():
+        first = await api.client.search_resources("server")
+        return first, await api.client.search_resources("server")
+
+    first, second = asyncio.run(search_twice())
+    assert first == second and first
+    assert api.counters["not_modified"] == 1
+
+    stats = api.client.conditional_stats()["endpoints"]["search"]
+    assert stats["requests"] == 2
+    assert stats["conditional"] == stats["not_modified"] == 1
+    assert stats["bytes_saved"] > 0
+
+
+def test_stats_polls_fetch_only_the_changes(fake_api):
+    api = fake_api()
+    expire_immediately(api.client, "server_stats")
+
+    async def poll_twice():
+        first = await api.client.get_server_stats()
+        await asyncio.sleep(0.01)
+        return first, await api.client.get_server_stats()
+
+    first, second = asyncio.run(poll_twice())
+    assert api.counters["deltas"] == 1
+    assert set(second) == set(first)
+    assert api.client.conditional_stats()["endpoints"]["server_stats"]["deltas"] == 1
+
+
+def test_disabled_conditional_requests_always_refetch(fake_api):
+    api = fake_api(resource_count=50)
+    api.client.conditional_requests = False
+    expire_immediately(api.client, "search")
+
+    async def search_twice():
+        await api.client.search_resources("server")
+        await api.client.search_resources("server")
+
+    asyncio.run(search_twice())
+    assert api.counters["not_modified"] == 0
+    assert api.client.conditional_stats()["totals"]["conditional"] == 0
+
+
+def test_deltas_merge_changes_and_drop_removed_fields():
+    merged = NeonPanelMCPClient._apply_delta(
+        {"cpu_usage": 40, "memory_usage": 50, "legacy": 1},
+        {"changes": {"cpu_usage": 42}, "removed": ["legacy"]},
+    )
+    assert merged == {"cpu_usage": 42, "memory_usage": 50}
@@ -0,0 +1,113 @@
+import itertools
+
+from mcp.context_diff import UNCHANGED, ContextDiffer
+
+STATS = {"cpu": 40.0, "memory": 61.0, "disk": 70.0, "servers": 12}
+_prompt_ids = itertools.count()
+
+ROWS = [
+    {"id": "a", "status": "active"},
+    {"id": "b", "status": "active"},
+    {"id": "c", "status": "stopped"},
+]
+
+
+def turn(differ, sections, history, key="s1"):
+    """apply() then record the prompt, as the agent does: (sent, modes, prompt)"""
+    sent, modes = differ.apply(key, sections, history)
+    prompt = f"prompt {next(_prompt_ids)}: {sent!r}"
+    differ.record_prompt(key, prompt)
+    return sent, modes, prompt
+
+
+def test_first_turn_is_full():
+    differ = ContextDiffer()
+    sent, modes, _ = turn(differ, [("stats", "Stats", STATS)], [])
+    assert modes == {"stats": "full"}
+    assert sent == [("stats", "Stats", STATS)]
+
+
+def test_unchanged_source_collapses_when_history_has_earlier_prompt():
+    differ = ContextDiffer()
+    _, _, first = turn(differ, [("stats", "Stats", STATS)], [])
+    sent, modes, _ = turn(differ, [("stats", "Stats", STATS)], [first])
+    assert modes == {"stats": "unchanged"}
+    assert sent[0][2] == UNCHANGED
+
+
+def test_changed_fields_are_sent_as_a_diff():
+    differ = ContextDiffer()
+    _, _, first = turn(differ, [("stats", "Stats", STATS)], [])
+    sent, modes, _ = turn(differ, [("stats", "Stats", dict(STATS, cpu=90.0))], [first])
+    assert modes == {"stats": "diff"}
+    assert sent[0][2] == {"cpu": 90.0}
+    assert sent[0][1] == "Stats, changes since last turn"
+
+
+def test_small_changes_within_tolerance_are_unchanged():
+    differ = ContextDiffer(rel_tol=0.05)
+    _, _, first = turn(differ, [("stats", "Stats", STATS)], [])
+    _, modes, _ = turn(differ, [("stats", "Stats", dict(STATS, cpu=41.0))], [first])
+    assert modes == {"stats": "unchanged"}
+
+
+def test_row_changes_are_marked():
+    differ = ContextDiffer(max_drift=1.0)
+    _, _, first = turn(differ, [("rows", "Rows", ROWS)], [])
+    new_rows = [
+        ROWS[0],
+        dict(ROWS[1], status="stopped"),
+        ROWS[2],
+        {"id": "d", "status": "active"},
+    ]
+    new_rows = [row for row in new_rows if row["id"] != "a"]
+    sent, modes, _ = turn(differ, [("rows", "Rows", new_rows)], [first])
+    assert modes == {"rows": "diff"}
+    assert {(row["change"], row["id"]) for row in sent[0][2]} == {
+        ("~", "b"),
+        ("+", "d"),
+        ("-", "a"),
+    }
+
+
+def test_missing_history_sends_full_data():
+    differ = ContextDiffer()
+    turn(differ, [("stats", "Stats", STATS)], [])
+    _, modes, _ = turn(differ, [("stats", "Stats", STATS)], [])
+    assert modes == {"stats": "full"}
+    _, modes, _ = turn(differ, [("stats", "Stats", STATS)], None)
+    assert modes == {"stats": "full"}
+    assert differ.stats()["history_misses"] == 2
+
+
+def test_every_prompt_since_refresh_must_still_be_in_history():
+    differ = ContextDiffer()
+    _, _, first = turn(differ, [("stats", "Stats", STATS)], [])
+    _, _, second = turn(differ, [("stats", "Stats", dict(STATS, cpu=90.0))], [first])
+    _, modes, _ = turn(differ, [("stats", "Stats", STATS)], [second])
+    assert modes == {"stats": "full"}
+
+
+def test_drift_and_max_turns_force_a_full_refresh():
+    differ = ContextDiffer(max_turns=2, max_drift=0.5)
+    history = []
+    _, _, prompt = turn(differ, [("stats", "Stats", STATS)], history)
+    history.append(prompt)
+    drifted = {key: value * 2 for key, value in STATS.items()}
+    _, modes, prompt = turn(differ, [("stats", "Stats", drifted)], history)
+    assert modes == {"stats": "full"}
+    history.append(prompt)
+    _, modes, prompt = turn(differ, [("stats", "Stats", drifted)], history)
+    assert modes == {"stats": "unchanged"}
+    history.append(prompt)
+    _, modes, _ = turn(differ, [("stats", "Stats", drifted)], history)
+    assert modes == {"stats": "full"}
+
+
+def test_reset_forgets_the_session():
+    differ = ContextDiffer()
+    _, _, first = turn(differ, [("stats", "Stats", STATS)], [])
+    differ.reset("s1")
+    assert differ.session_stats("s1") is None
+    _, modes, _ = turn(differ, [("stats", "Stats", STATS)], [first])
+    assert modes == {"stats": "full"}
@@ -0,0 +1,87 @@
+from mcp.context_render import (
+    ContextRenderer,
+    estimate_tokens,
+    format_value,
+    rank_rows,
+    render_summary,
+    table_columns,
+)
+
+ROWS = [
+    {
+        "id": f"res_{i}",
+        "name": f"{kind}-{i:03d}",
+        "type": kind,
+        "status": "active",
+        "created_at": "2024-07-15T10:00:00Z",
+        "tags": ["a", "b"],
+    }
+    for i, kind in enumerate(["server", "database", "service"] * 20)
+]
+
+
+def test_estimate_tokens_counts_words_numbers_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("cpu usage") == 2
+    assert estimate_tokens("cpu=42.5") == 5
+    assert estimate_tokens("internationalization") == 3
+
+
+def test_format_value_is_short_and_table_safe():
+    assert format_value(42.1234) == "42.1"
+    assert format_value(123456.7) == "123457"
+    assert format_value(None) == "none"
+    assert format_value("a|b\n c") == "a/b c"
+    assert format_value("x" * 50, width=10) == "x" * 9 + "…"
+    assert format_value({"a": 1, "nested": {"b": 2}}) == "a=1"
+
+
+def test_summary_is_one_line():
+    assert (
+        render_summary("Stats", {"cpu": 41.96, "ok": True}) == "Stats: cpu=42.0 ok=true"
+    )
+
+
+def test_rows_are_ranked_by_query_words():
+    ranked = rank_rows(ROWS[:6], "database")
+    assert [row["type"] for row in ranked[:2]] == ["database", "database"]
+    assert rank_rows(ROWS[:3], "") == ROWS[:3]
+
+
+def test_tables_prefer_known_columns_and_skip_nested_values():
+    assert table_columns(ROWS, max_columns=4) == ["id", "name", "type", "status"]
+    assert "tags" not in table_columns(ROWS, max_columns=10)
+
+
+def test_render_fits_the_budget_and_reports_savings():
+    renderer = ContextRenderer(budget=200)
+    text, report = renderer.render(
+        [
+            ("server_stats", "Server Statistics", {"cpu_usage": 42.0, "uptime": "3d"}),
+            ("search_results", "Search Results", ROWS),
+        ],
+        query="database",
+    )
+
+    assert text.startswith("Server Statistics: cpu_usage=42.0")
+    assert report["rendered_tokens"] <= 200 < report["raw_tokens"]
+    assert report["rows_dropped"] > 0
+    assert f"(+{report['rows_dropped']} more not shown)" in text
+    assert text.splitlines()[3].split(" | ")[2] == "database"
+    assert renderer.stats()["renders"] == 1
+
+
+def test_sections_beyond_the_budget_are_cut_down():
+    renderer = ContextRenderer(budget=30)
+    text, report = renderer.render(
+        [("a", "First", {"text": "word " * 100}), ("b", "Second", ROWS)],
+        record=False,
+    )
+    assert text.splitlines()[0].endswith("…")
+    assert text.splitlines()[1] == "Second: 60 rows, none shown"
+    assert report["rendered_tokens"] <= 30
+    assert report["rows_dropped"] == len(ROWS)
+    assert renderer.stats()["renders"] == 0
+
+    text, report = renderer.render([("b", "Second", ROWS)], budget=0)
+    assert text == "" and report["rows_dropped"] == len(ROWS)
@@ -0,0 +1,69 @@
+from mcp.data_sources import DataSource, DataSourceRegistry
+from mcp.neonpanel_agent import NeonPanelAgent
+
+
+async def nothing(*args):
+    return None
+
+
+def source(name, triggers, **options) -> DataSource:
+    return DataSource(name, triggers, fetch=nothing, **options)
+
+
+def test_triggers_match_word_prefixes_case_insensitively():
+    registry = DataSourceRegistry([source("stats", ["server", "cpu"])])
+    assert [s.name for s, _ in registry.match("How are my SERVERS doing?")] == ["stats"]
+    assert registry.match("observer mode") == []
+    assert registry.match("") == []
+
+
+def test_relevance_combines_independent_evidence():
+    registry = DataSourceRegistry(
+        [source("stats", {"server": 0.5, "load": 0.5}), source("users", {"user": 0.9})]
+    )
+    scored = {s.name: relevance for s, relevance in registry.match("server load")}
+    assert scored == {"stats": 0.75}
+    # A repeated trigger is one piece of evidence, not two
+    assert registry.match("server server")[0][1] == 0.5
+    assert [s.name for s, _ in registry.match("user on a loaded server")] == [
+        "users",
+        "stats",
+    ]
+
+
+def test_select_charges_expensive_sources_a_higher_threshold():
+    registry = DataSourceRegistry(
+        [
+            source("cheap", {"status": 0.4}, cost=0.1),
+            source("slow", {"find": 0.4}, cost=2.0),
+        ],
+        min_relevance=0.3,
+        cost_penalty=0.1,
+    )
+    assert [s.name for s, _ in registry.select("find status")] == ["cheap"]
+
+
+def test_registering_recompiles_the_matcher():
+    registry = DataSourceRegistry([source("stats", ["cpu"])])
+    assert registry.match("billing") == []
+
+    registry.register(source("billing", ["billing", "invoice"]))
+    assert [s.name for s, _ in registry.match("billing")] == ["billing"]
+    registry.unregister("stats")
+    assert registry.match("cpu") == [] and len(registry) == 1
+
+
+def test_longer_phrases_win_at_the_same_position():
+    registry = DataSourceRegistry(
+        [source("users", {"user": 0.5}), source("profile", {"user data": 0.9})]
+    )
+    assert [s.name for s, _ in registry.match("user data please")] == ["profile"]
+
+
+def test_agent_plans_only_sources_it_can_prepare():
+    agent = NeonPanelAgent()
+    plan = agent._plan_sources("cpu stats for my account", {"user_id": "u1"})
+    assert set(plan) == {"server_stats", "user_data"}
+    assert plan["user_data"][1] == ("u1",)
+
+    assert set(agent._plan_sources("cpu stats for my account", {})) == {"server_stats"}
@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+
+import pytest
+
+from mcp import decoding
+from mcp.decoding import LazyList, SearchPage, loads
+
+PAGE = json.dumps(
+    {
+        "results": [{"id": str(i), "name": f"server-{i}"} for i in range(3)],
+        "total": 3,
+        "next_cursor": "abc",
+    }
+).encode()
+
+
+def test_loads_decodes_json():
+    assert loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+
+
+def test_search_page_keeps_dict_interface():
+    page = SearchPage.from_json(PAGE)
+    assert page["total"] == 3
+    assert page.get("next_cursor") == "abc"
+    assert page.get("missing", "default") == "default"
+    assert page.to_dict()["results"][2] == {"id": "2", "name": "server-2"}
+    with pytest.raises(KeyError):
+        page["missing"]
+
+
+@pytest.mark.skipif(decoding.msgspec is None, reason="lazy decoding needs msgspec")
+def test_items_decode_on_access_and_release_raw_buffer():
+    results = SearchPage.from_json(PAGE).results
+    assert results.decoded == 0
+    assert results[1]["name"] == "server-1"
+    assert results.decoded == 1
+    assert results.holds_raw
+    assert [item["id"] for item in results] == ["0", "1", "2"]
+    assert results.decoded == 3
+    assert not results.holds_raw
+    assert results[0]["id"] == "0"
+
+
+@pytest.mark.skipif(decoding.msgspec is None, reason="lazy decoding needs msgspec")
+def test_concurrent_readers_decode_each_item_once(monkeypatch):
+    decode = decoding._item_decoder.decode
+    calls = []
+
+    class SlowDecoder:
+        def decode(self, raw):
+            calls.append(raw)
+            time.sleep(0.001)
+            return decode(raw)
+
+    monkeypatch.setattr(decoding, "_item_decoder", SlowDecoder())
+    results = SearchPage.from_json(PAGE).results
+    seen, errors = [], []
+
+    def read():
+        try:
+            seen.append([item["id"] for item in results])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert seen == [["0", "1", "2"]] * 8
+    assert len(calls) == 3 and results.decoded == 3
+    assert not results.holds_raw
+
+
+def test_predecoded_list_holds_no_raw_data():
+    items = LazyList([{"id": "1"}], decoded=True)
+    assert items.decoded == 1
+    assert not items.holds_raw
+    assert list(items) == [{"id": "1"}]
@@ -0,0 +1,45 @@
+import asyncio
+
+from mcp.load_test import percentile, run_load
+
+
+def test_percentile_picks_the_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 51.0
+    assert percentile(samples, 99) == 100.0
+    assert percentile([], 95) == 0.0
+
+
+def test_run_load_reports_every_request(fake_api):
+    api = fake_api()
+    api.client.cache_ttls["user_data"] = 0
+    api.client.cache.stale_ttl = 0
+
+    report = asyncio.run(run_load(api.client, "users", 40, 8, "server"))
+    assert report["requests"] == 40 and report["errors"] == 0
+    assert report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"]
+    assert api.counters["requests"] == 40
+
+
+def test_injected_failures_are_counted_as_errors(fake_api):
+    api = fake_api(error_rate=1.0)
+    api.client.retry_policy.max_attempts = 1
+
+    report = asyncio.run(run_load(api.client, "stats", 5, 1, ""))
+    assert report["errors"] == 5
+    assert api.counters["errors_injected"] == 5
+
+
+def test_fake_server_throttles_above_its_rate_limit(fake_api):
+    api = fake_api(rate_limit=3)
+    api.client.retry_policy.max_attempts = 1
+    api.client.cache_ttls["user_data"] = 0
+    api.client.cache.stale_ttl = 0
+
+    async def burst():
+        return await asyncio.gather(
+            *(api.client.get_user_data(str(i)) for i in range(6))
+        )
+
+    users = asyncio.run(burst())
+    assert sum("error" in user for user in users) == api.counters["throttled"] >= 3
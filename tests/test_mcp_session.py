@@ -0,0 +1,131 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from mcp.fake_server import FakeServerConfig, create_app
+from mcp.mcp_session import MCPConnectionError, MCPError, MCPSession, websocket_url
+from mcp.neonpanel_client import NeonPanelMCPClient
+from mcp.rate_limit import RateLimiter
+
+
+@pytest.fixture(scope="module")
+def server():
+    """The fake API on a local port, for its /mcp WebSocket endpoint"""
+    app = create_app(
+        FakeServerConfig(latency_ms=5, latency_sigma=0, stats_interval=0.2)
+    )
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    config = uvicorn.Config(app, log_level="warning")
+    runner = uvicorn.Server(config)
+    thread = threading.Thread(target=runner.run, kwargs={"sockets": [sock]})
+    thread.start()
+    while not runner.started:
+        time.sleep(0.01)
+    yield f"ws://127.0.0.1:{sock.getsockname()[1]}/mcp", app
+    runner.should_exit = True
+    thread.join()
+
+
+def with_session(url, test, **options):
+    async def run():
+        session = MCPSession(url, **options)
+        try:
+            return await test(session)
+        finally:
+            await session.close()
+
+    return asyncio.run(run())
+
+
+def test_websocket_url_maps_http_schemes():
+    assert websocket_url("http://host:3000") == "ws://host:3000"
+    assert websocket_url("https://host/mcp") == "wss://host/mcp"
+    assert websocket_url("ws://host") == "ws://host"
+
+
+def test_concurrent_tool_calls_share_one_connection(server):
+    url, app = server
+    sessions_before = app.state.counters["mcp_sessions"]
+
+    async def test(session):
+        await session.start(timeout=5)
+        users = await asyncio.gather(
+            *(session.call_tool("get_user_data", {"user_id": i}) for i in range(20))
+        )
+        return users, session.stats()
+
+    users, stats = with_session(url, test)
+    assert [user["user_id"] for user in users] == [str(i) for i in range(20)]
+    assert stats["calls"] == 20 and stats["in_flight"] == 0
+    assert stats["server"] == "neonpanel-stand-in"
+    assert app.state.counters["mcp_sessions"] == sessions_before + 1
+
+
+def test_errors_come_back_as_mcp_errors(server):
+    url, _ = server
+
+    async def test(session):
+        with pytest.raises(MCPError) as unknown_method:
+            await session.request("resources/list")
+        with pytest.raises(MCPError, match="Unknown server"):
+            await session.call_tool("execute_server_action", {"server_id": "srv_x"})
+        return unknown_method.value
+
+    assert with_session(url, test).code == -32601
+
+
+def test_subscriptions_deliver_update_notifications(server):
+    url, _ = server
+
+    async def test(session):
+        updated = asyncio.Event()
+        session.on_notification(
+            "notifications/resources/updated", lambda params: updated.set()
+        )
+        await session.subscribe("neonpanel://servers/stats")
+        await session.start(timeout=5)
+        await asyncio.wait_for(updated.wait(), 5)
+        return session.stats()["notifications"]
+
+    assert with_session(url, test) >= 1
+
+
+def test_unreachable_server_raises_connection_error():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    async def test(session):
+        await session.start(timeout=0.3)
+
+    with pytest.raises(MCPConnectionError, match="not reachable"):
+        with_session(f"ws://127.0.0.1:{port}/mcp", test, connect_timeout=0.1)
+
+
+def test_client_reads_through_the_mcp_transport(server, monkeypatch):
+    url, app = server
+    monkeypatch.setenv("NEONPANEL_TRANSPORT", "mcp")
+    monkeypatch.setenv("NEONPANEL_MCP_SERVER_URL", url)
+    monkeypatch.setenv("NEONPANEL_API_KEY", "test")
+    client = NeonPanelMCPClient()
+    client.rate_limiter = RateLimiter(rate=0)
+    calls_before = app.state.counters["mcp_calls"]
+
+    async def run():
+        user = await client.get_user_data("42")
+        page = await client.search_resources("database")
+        return user, page
+
+    try:
+        user, page = asyncio.run(run())
+    finally:
+        asyncio.run(client.shutdown())
+    assert user["user_id"] == "42"
+    assert page and all(result["type"] == "database" for result in page)
+    assert app.state.counters["mcp_calls"] > calls_before
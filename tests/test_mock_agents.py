@@ -0,0 +1,223 @@
+import asyncio
+import sys
+import types
+
+import pytest
+
+# mock_agents imports streamlit at module level but never uses it outside the pages
+sys.modules.setdefault("streamlit", types.ModuleType("streamlit"))
+
+from mock_agents import (  # noqa: E402
+    LatencyModel,
+    LatencySample,
+    MockAgent,
+    MockAgentError,
+    MockOrchestrator,
+    simulate_streaming_response,
+    simulate_streaming_response_async,
+    summarize_batch,
+)
+
+
+def instant_orchestrator(**latency) -> MockOrchestrator:
+    orchestrator = MockOrchestrator()
+    for agent_type, agent in list(orchestrator.agents.items()):
+        orchestrator.add_agent(
+            MockAgent(
+                agent.name,
+                agent.description,
+                agent_type,
+                LatencyModel(time_scale=0, seed=1, **latency),
+            )
+        )
+    return orchestrator
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+def test_latency_model_is_seeded_and_centred_on_its_medians():
+    first = LatencyModel(seed=3).describe(samples=2000)
+    assert first == LatencyModel(seed=3).describe(samples=2000)
+    assert 500 <= first["ttft_ms"]["p50"] <= 720
+    assert first["ttft_ms"]["p50"] < first["ttft_ms"]["p90"] < first["ttft_ms"]["p99"]
+    assert first["error_rate"] == 0
+
+
+def test_longer_prompts_get_longer_answers():
+    model = LatencyModel(seed=1)
+    short = model.describe(input_tokens=10, samples=2000)["mean_output_tokens"]
+    long = model.describe(input_tokens=500, samples=2000)["mean_output_tokens"]
+    assert long > 3 * short
+
+
+def test_failure_rates_and_timeouts():
+    model = LatencyModel(error_rate=0.1, timeout_rate=0.2, seed=2)
+    report = model.describe(samples=5000)
+    assert 0.08 <= report["error_rate"] <= 0.12
+    assert 0.18 <= report["timeout_rate"] <= 0.22
+
+    slow = LatencyModel(ttft_median=10, ttft_sigma=0, timeout=5, seed=2)
+    assert slow.sample(100).outcome == "timeout"
+    assert slow.sample(100).total == 5
+
+
+def test_time_scale_shrinks_every_duration():
+    sample = LatencyModel(time_scale=0, seed=1).sample(100)
+    assert sample.total == 0 and sample.output_tokens > 0
+
+
+def test_profiles_read_failure_rates_from_the_environment(monkeypatch):
+    monkeypatch.setenv("MOCK_LATENCY_SCALE", "0.5")
+    monkeypatch.setenv("MOCK_ERROR_RATE", "0.25")
+    monkeypatch.setenv("MOCK_SEED", "9")
+    model = LatencyModel.from_env("bedrock", timeout=12)
+    assert (model.time_scale, model.error_rate, model.timeout) == (0.5, 0.25, 12)
+    assert model.tail_probability == 0.04
+    assert (
+        model.sample(50).to_dict()
+        == LatencyModel.from_env("bedrock", timeout=12).sample(50).to_dict()
+    )
+
+
+def test_agent_raises_injected_failures_and_counts_them():
+    agent = MockAgent(
+        "Claude", "", "anthropic", LatencyModel(error_rate=1, time_scale=0)
+    )
+    with pytest.raises(MockAgentError):
+        asyncio.run(agent.process_message("hi"))
+    agent.latency.error_rate, agent.latency.timeout_rate = 0, 1
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(agent.process_message("hi"))
+    stats = agent.stats()
+    assert (stats["requests"], stats["errors"], stats["timeouts"]) == (2, 1, 1)
+    assert stats["last"]["outcome"] == "timeout"
+
+
+def test_route_picks_agent_by_keyword():
+    orchestrator = instant_orchestrator()
+    assert orchestrator.route("optimize this SQL query")[0] == "neonpanel"
+    assert orchestrator.route("deploy on AWS")[0] == "bedrock"
+    assert orchestrator.route("write a poem")[0] == "anthropic"
+    assert orchestrator.route("anything", "bedrock")[0] == "bedrock"
+
+
+def test_batch_returns_every_item():
+    orchestrator = instant_orchestrator()
+    messages = (f"question {i}" for i in range(50))
+    results = asyncio.run(collect(orchestrator.process_batch(messages, concurrency=8)))
+
+    assert sorted(r["index"] for r in results) == list(range(50))
+    assert all(r["status"] == "ok" and r["response"] for r in results)
+    assert summarize_batch(results, 1.0)["by_status"] == {"ok": 50}
+
+
+def test_batch_timeout_and_agent_timeout_are_reported_separately():
+    orchestrator = instant_orchestrator(timeout_rate=1.0)
+    results = asyncio.run(collect(orchestrator.process_batch(["hello"], timeout=5)))
+    assert results[0]["status"] == "agent_timeout"
+    assert "Claude" in results[0]["error"]
+
+    slow = MockOrchestrator()
+    slow.add_agent(
+        MockAgent(
+            "Slow",
+            "never answers in time",
+            "anthropic",
+            LatencyModel(ttft_median=60, ttft_sigma=0, timeout=1000, seed=1),
+        )
+    )
+    results = asyncio.run(collect(slow.process_batch(["hello"], timeout=0.05)))
+    assert results[0]["status"] == "timeout"
+    assert "batch timeout" in results[0]["error"]
+
+
+def test_closing_batch_early_leaves_no_pending_tasks():
+    orchestrator = instant_orchestrator()
+
+    async def run():
+        batch = orchestrator.process_batch(
+            (f"question {i}" for i in range(1000)), concurrency=4
+        )
+        first = await batch.__anext__()
+        await batch.aclose()
+        others = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        return first, others
+
+    first, others = asyncio.run(run())
+    assert first["status"] == "ok"
+    assert others == []
+
+
+def test_stream_yields_whole_reply_and_records_timings():
+    orchestrator = MockOrchestrator()
+    orchestrator.add_agent(
+        MockAgent("Claude", "paced", "anthropic", LatencyModel(time_scale=0.1, seed=1))
+    )
+    stream, metadata = orchestrator.stream_message("explain connection pools", buffer=2)
+    chunks = asyncio.run(collect(stream))
+
+    reply = "".join(chunks)
+    target = round(orchestrator.agents["anthropic"].last_sample.output_tokens / 1.3)
+    assert len(chunks) > 1
+    assert reply.startswith("🤖") and len(reply.split(" ")) == max(1, target)
+    assert "ttft_ms" in metadata and "total_ms" in metadata
+
+
+def test_slow_consumer_holds_the_producer_back():
+    agent = MockAgent("Claude", "", "anthropic", LatencyModel(time_scale=0))
+    # 40 words due within 4ms, one per chunk
+    sample = LatencySample(0, 10000, 10, 52)
+
+    async def run():
+        stream = agent.stream_message("hi", sample=sample, buffer=1, chunk_interval=0)
+        chunks = [await stream.__anext__()]
+        await asyncio.sleep(0.05)
+        # Every word is due by now, but the producer is blocked on the full queue
+        waiting = len(asyncio.all_tasks()) - 1
+        chunks += [chunk async for chunk in stream]
+        return chunks, waiting
+
+    chunks, waiting = asyncio.run(run())
+    assert waiting == 1
+    assert len(chunks) == len("".join(chunks).split(" ")) > 10
+
+
+def test_stopping_early_cancels_the_producer():
+    agent = MockAgent("Claude", "", "anthropic", LatencyModel(time_scale=0))
+    sample = LatencySample(0, 100, 10, 52)
+
+    async def run():
+        stream = agent.stream_message("hi", sample=sample, chunk_interval=0)
+        first = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return first, len(asyncio.all_tasks()) - 1
+
+    first, pending = asyncio.run(run())
+    assert first and pending == 0
+
+
+def test_injected_failures_raise_before_the_first_chunk():
+    agent = MockAgent("Claude", "", "anthropic", LatencyModel(time_scale=0))
+
+    async def first_chunk(outcome):
+        sample = LatencySample(0, 100, 10, 52, outcome=outcome)
+        return await agent.stream_message("hi", sample=sample).__anext__()
+
+    with pytest.raises(MockAgentError):
+        asyncio.run(first_chunk("error"))
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(first_chunk("timeout"))
+    assert (agent.errors, agent.timeouts) == (1, 1)
+
+
+def test_simulated_streaming_has_sync_and_async_forms(monkeypatch):
+    text = "one two three four five"
+    assert asyncio.run(
+        collect(simulate_streaming_response_async(text, chunk_delay=0))
+    ) == ["one two three ", "four five "]
+
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    assert list(simulate_streaming_response(text)) == ["one two three ", "four five "]
@@ -0,0 +1,327 @@
+import asyncio
+
+from agent_squad.agents import AgentStreamResponse
+from agent_squad.types import ConversationMessage
+
+from mcp import neonpanel_agent
+from mcp.data_sources import DataSource, DataSourceRegistry
+from mcp.neonpanel_agent import NeonPanelAgent
+
+
+class SlowClient:
+    """Stands in for neonpanel_client with per-call delays and a fixed cache"""
+
+    cache_ttls = {"server_stats": 0, "user_data": 0}
+
+    def __init__(self, delays, cached=None):
+        self.delays = delays
+        self.cached = cached or {}
+
+    async def get_server_stats(self, priority=0):
+        await asyncio.sleep(self.delays.get("server_stats", 0))
+        return {"total_servers": 3}
+
+    async def get_user_data(self, user_id, priority=0):
+        await asyncio.sleep(self.delays.get("user_data", 0))
+        return {"user_id": user_id}
+
+    def peek_cached(self, key):
+        return self.cached.get(key)
+
+
+def gather(monkeypatch, client, user_input, **options):
+    monkeypatch.setattr(neonpanel_agent, "neonpanel_client", client)
+    agent = NeonPanelAgent(**options)
+    return asyncio.run(agent._gather_neonpanel_data(user_input, {"user_id": "u1"}))
+
+
+def test_sources_are_gathered_concurrently(monkeypatch):
+    client = SlowClient({"server_stats": 0.1, "user_data": 0.1})
+    data = gather(monkeypatch, client, "server status for my account")
+    assert data["server_stats"] == {"total_servers": 3}
+    assert data["user_data"] == {"user_id": "u1"}
+    assert {name: source["status"] for name, source in data["sources"].items()} == {
+        "server_stats": "ok",
+        "user_data": "ok",
+    }
+    assert data["gather_ms"] < 180
+
+
+def test_slow_source_falls_back_to_cached_data(monkeypatch):
+    client = SlowClient(
+        {"server_stats": 1},
+        cached={("server_stats",): ({"total_servers": 2}, 42.0)},
+    )
+    data = gather(
+        monkeypatch, client, "server status for my account", source_timeout=0.05
+    )
+    assert data["server_stats"] == {"total_servers": 2}
+    assert data["sources"]["server_stats"]["status"] == "stale"
+    assert data["sources"]["server_stats"]["age_seconds"] == 42.0
+    assert data["sources"]["user_data"]["status"] == "ok"
+
+
+def test_gather_deadline_skips_sources_with_nothing_cached(monkeypatch):
+    client = SlowClient({"user_data": 1})
+    data = gather(
+        monkeypatch,
+        client,
+        "server status for my account",
+        source_timeout=2,
+        gather_deadline=0.05,
+    )
+    assert "user_data" not in data
+    assert data["sources"]["user_data"]["status"] == "timeout"
+    assert data["sources"]["server_stats"]["status"] == "ok"
+    assert data["gather_ms"] < 500
+
+
+class FakeLLM:
+    """Streams a fixed answer and records the prompts it was sent"""
+
+    def __init__(self, answer: str = "all servers are healthy"):
+        self.answer = answer
+        self.prompts = []
+
+    def is_streaming_enabled(self) -> bool:
+        return True
+
+    async def process_request(
+        self, prompt, user_id, session_id, chat_history, additional_params=None
+    ):
+        self.prompts.append(prompt)
+
+        async def stream():
+            words = self.answer.split(" ")
+            for word in words[:-1]:
+                yield AgentStreamResponse(text=word + " ")
+            yield AgentStreamResponse(
+                text=words[-1],
+                final_message=ConversationMessage(
+                    role="assistant", content=[{"text": self.answer}]
+                ),
+            )
+
+        return stream()
+
+
+def make_agent(**options) -> NeonPanelAgent:
+    options.setdefault("llm_agent", FakeLLM())
+    agent = NeonPanelAgent(**options)
+
+    async def fetch_account(user_id):
+        await asyncio.sleep(0.05 if user_id == "slow" else 0)
+        return {"owner": user_id, "plan": "pro", "servers": 3}
+
+    agent.sources = DataSourceRegistry(
+        [
+            DataSource(
+                "account",
+                ["account"],
+                fetch=fetch_account,
+                label="Account",
+                prepare=lambda user_input, context: (context["user_id"],),
+            )
+        ]
+    )
+    return agent
+
+
+def test_concurrent_requests_keep_their_own_metadata():
+    agent = make_agent()
+
+    async def ask(user_id):
+        metadata = {}
+        chunks = [
+            chunk.text
+            async for chunk in agent.stream_request(
+                "show my account",
+                {"user_id": user_id},
+                user_id,
+                f"session-{user_id}",
+                metadata=metadata,
+            )
+        ]
+        return "".join(chunks), metadata
+
+    async def run():
+        return await asyncio.gather(ask("slow"), ask("fast"))
+
+    (slow_text, slow), (fast_text, fast) = asyncio.run(run())
+    assert slow_text == fast_text == "all servers are healthy"
+    assert slow["gather_ms"] > fast["gather_ms"]
+    assert slow["context_tokens"] is not fast["context_tokens"]
+    assert {"ttft_ms", "llm_ttft_ms"} <= slow.keys()
+    assert not hasattr(agent, "last_metadata") and not hasattr(agent, "last_context")
+    assert any("owner=slow" in prompt for prompt in agent.llm_agent.prompts)
+    assert any("owner=fast" in prompt for prompt in agent.llm_agent.prompts)
+
+
+def test_prepare_prompt_returns_prompt_and_report():
+    agent = make_agent()
+    prompt, metadata = asyncio.run(
+        agent.prepare_prompt("show my account", {"user_id": "u1"})
+    )
+    assert prompt.startswith("User Question: show my account")
+    assert "owner=u1" in prompt
+    assert metadata["neonpanel_sources"]["account"]["status"] == "ok"
+    assert metadata["partial"] is False
+
+
+def test_respond_reports_skipped_sources_in_response_metadata():
+    agent = make_agent(source_timeout=0.01)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    agent.register_source(DataSource("usage", ["account"], fetch=hang, label="Usage"))
+
+    async def run():
+        response = await agent.respond("show my account", "u1", "s1")
+        report = response.metadata.additional_params["neonpanel"]
+        assert report["neonpanel_sources"]["usage"]["status"] == "timeout"
+        assert report["partial"] is True
+        assert "ttft_ms" not in report
+        text = "".join([chunk.text async for chunk in response.output])
+        return text, report
+
+    text, report = asyncio.run(run())
+    assert text == "all servers are healthy"
+    assert "ttft_ms" in report
+    assert "Usage was skipped" in agent.llm_agent.prompts[0]
+
+
+def test_squad_adapter_puts_report_in_additional_params():
+    from mcp.neonpanel_agent import NeonPanelSquadAgent
+
+    agent = make_agent()
+    adapter = NeonPanelSquadAgent(agent)
+    additional_params = {}
+
+    async def run():
+        stream = await adapter.process_request(
+            "show my account", "u1", "s1", [], additional_params
+        )
+        return [chunk async for chunk in stream]
+
+    asyncio.run(run())
+    assert (
+        additional_params["neonpanel"]["neonpanel_sources"]["account"]["status"] == "ok"
+    )
+
+
+def test_stream_request_yields_llm_chunks_and_records_ttft():
+    agent = make_agent()
+    first_token = []
+    metadata = {}
+
+    async def run():
+        return [
+            chunk.text
+            async for chunk in agent.stream_request(
+                "show my account",
+                {"user_id": "u1"},
+                "u1",
+                "s1",
+                on_first_token=first_token.append,
+                metadata=metadata,
+            )
+        ]
+
+    assert asyncio.run(run()) == ["all ", "servers ", "are ", "healthy"]
+    assert len(first_token) == 1
+    assert {"ttft_ms", "llm_ttft_ms"} <= metadata.keys()
+    assert "owner=u1" in agent.llm_agent.prompts[0]
+
+
+def test_process_request_returns_what_the_llm_agent_returns():
+    class PlainLLM:
+        async def process_request(
+            self, prompt, user_id, session_id, chat_history, additional_params=None
+        ):
+            return ConversationMessage(
+                role="assistant", content=[{"text": "3 servers"}]
+            )
+
+    agent = make_agent()
+    metadata = {}
+
+    async def run():
+        stream = await agent.process_request(
+            "show my account", {"user_id": "u1"}, "u1", "s1", [], metadata
+        )
+        return [chunk.text async for chunk in stream]
+
+    assert "".join(asyncio.run(run())) == "all servers are healthy"
+    assert metadata["neonpanel_sources"]["account"]["status"] == "ok"
+
+    agent.llm_agent = PlainLLM()
+    result = asyncio.run(agent.process_request("show my account", {"user_id": "u1"}))
+    assert result.content == [{"text": "3 servers"}]
+
+
+def test_respond_streams_a_non_streaming_llm_as_one_chunk():
+    class PlainLLM:
+        async def process_request(
+            self, prompt, user_id, session_id, chat_history, additional_params=None
+        ):
+            return ConversationMessage(
+                role="assistant", content=[{"text": "3 servers"}]
+            )
+
+    agent = make_agent(llm_agent=PlainLLM())
+
+    async def run():
+        response = await agent.respond("show my account", "u1", "s1")
+        assert response.metadata.additional_params["agent_input"].startswith(
+            "User Question:"
+        )
+        return [chunk async for chunk in response.output]
+
+    chunks = asyncio.run(run())
+    assert [chunk.text for chunk in chunks] == ["3 servers"]
+    assert chunks[0].final_message is not None
+
+
+def make_fleet_agent() -> NeonPanelAgent:
+    agent = NeonPanelAgent(llm_agent=FakeLLM())
+    servers = [
+        {"id": f"srv-{i}", "name": f"web-{i}", "status": "active", "region": "eu"}
+        for i in range(30)
+    ]
+
+    async def fetch_servers():
+        return servers
+
+    agent.sources = DataSourceRegistry(
+        [DataSource("servers", ["servers"], fetch=fetch_servers, label="Servers")]
+    )
+    return agent
+
+
+def user_message(text: str) -> ConversationMessage:
+    return ConversationMessage(role="user", content=[{"text": text}])
+
+
+def test_follow_up_without_earlier_prompt_in_history_gets_full_data():
+    agent = make_fleet_agent()
+    context = {"session_id": "s1"}
+
+    async def run():
+        first, _ = await agent.prepare_prompt("list servers", context, [])
+        second, second_meta = await agent.prepare_prompt("list servers", context, [])
+        third, third_meta = await agent.prepare_prompt(
+            "list servers",
+            context,
+            [
+                user_message(second),
+                ConversationMessage(role="assistant", content=[{"text": "30 servers"}]),
+            ],
+        )
+        return first, second, second_meta, third, third_meta
+
+    first, second, second_meta, third, third_meta = asyncio.run(run())
+    assert "srv-29" in second
+    assert second_meta["context_tokens"]["modes"] == {"servers": "full"}
+    assert third_meta["context_tokens"]["modes"] == {"servers": "unchanged"}
+    assert "srv-29" not in third and "unchanged since last turn" in third
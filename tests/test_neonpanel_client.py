@@ -0,0 +1,33 @@
+import asyncio
+
+from mcp.neonpanel_client import NeonPanelMCPClient
+
+
+def test_requests_from_separate_event_loops_share_one_pool(mock_api):
+    api = mock_api()
+    client = api.client
+    pooled = client._http_client
+
+    first = asyncio.run(client.get_user_data("1"))
+    second = asyncio.run(client.get_user_data("2"))
+
+    assert (first["user_id"], second["user_id"]) == ("1", "2")
+    assert client._http_client is pooled and not pooled.is_closed
+    assert len(api.requests) == 2
+
+
+def test_pool_is_configured_from_the_environment_and_reopened_lazily(monkeypatch):
+    monkeypatch.setenv("NEONPANEL_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("NEONPANEL_REQUEST_TIMEOUT", "2.5")
+    client = NeonPanelMCPClient(demo_mode=True)
+    assert (client.max_connections, client.request_timeout) == (7, 2.5)
+
+    pooled = client._get_http_client()
+    assert client._get_http_client() is pooled
+    assert pooled.timeout.read == 2.5
+
+    asyncio.run(client.shutdown())
+    assert pooled.is_closed and client._http_client is None
+    reopened = client._get_http_client()
+    assert reopened is not pooled
+    asyncio.run(client.shutdown())
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from mcp.data_sources import DataSource, DataSourceRegistry
+from mcp.neonpanel_agent import NeonPanelAgent
+
+
+def make_agent(delay: float = 0.05):
+    """An agent with one "account" source that records each fetch"""
+    agent = NeonPanelAgent()
+    fetches = []
+
+    async def fetch_account(user_id):
+        fetches.append(user_id)
+        await asyncio.sleep(delay)
+        return {"owner": user_id, "plan": "pro"}
+
+    agent.sources = DataSourceRegistry(
+        [
+            DataSource(
+                "account",
+                ["account"],
+                fetch=fetch_account,
+                prepare=lambda user_input, context: (context["user_id"],),
+            )
+        ]
+    )
+    return agent, fetches
+
+
+def test_prepare_prompt_uses_the_prefetched_data():
+    agent, fetches = make_agent()
+    context = {"user_id": "u1"}
+
+    assert agent.prefetch("show my account", context) is not None
+    # Routing would run here; the fetch makes progress meanwhile
+    time.sleep(0.03)
+    prompt, metadata = asyncio.run(agent.prepare_prompt("show my account", context))
+
+    assert fetches == ["u1"]
+    assert metadata["neonpanel_sources"]["account"]["prefetched"] is True
+    assert "owner=u1" in prompt
+    stats = agent.prefetch_stats()
+    assert (stats["used"], stats["wasted"], stats["pending"]) == (1, 0, 0)
+    assert stats["latency_saved_ms"] >= 20
+
+
+def test_discarded_prefetch_is_cancelled_and_counted_as_waste():
+    agent, fetches = make_agent(delay=1)
+    prefetch = agent.prefetch("show my account", {"user_id": "u1"})
+    agent.discard_prefetch("show my account", {"user_id": "u1"})
+
+    _, future, _ = prefetch.fetches["account"]
+    time.sleep(0.02)
+    assert future.cancelled()
+    assert agent.prefetch_stats()["wasted"] == 1
+
+
+def test_prefetch_is_only_claimed_by_the_same_message_and_user():
+    agent, fetches = make_agent(delay=0)
+    prefetch = agent.prefetch("show my account", {"user_id": "u1"})
+    prefetch.fetches["account"][1].result(5)
+    asyncio.run(agent.prepare_prompt("show my account", {"user_id": "u2"}))
+
+    assert fetches == ["u1", "u2"]
+    assert agent.prefetch_stats()["pending"] == 1
+
+
+def test_nothing_to_fetch_and_capacity_limits():
+    agent, _ = make_agent(delay=1)
+    assert agent.prefetch("hello there", {"user_id": "u1"}) is None
+
+    agent.max_prefetches = 2
+    for user_id in ("a", "b", "c"):
+        agent.prefetch("show my account", {"user_id": user_id})
+    stats = agent.prefetch_stats()
+    assert (stats["prefetches"], stats["pending"], stats["wasted"]) == (3, 2, 1)
+
+    agent.close()
+    assert agent.prefetch_stats()["pending"] == 0
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+import httpx
+
+from mcp.rate_limit import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    RateLimiter,
+    retry_after_seconds,
+)
+
+
+def test_burst_is_immediate_then_paced_at_rate():
+    limiter = RateLimiter(rate=100, burst=2)
+
+    async def run():
+        started = time.perf_counter()
+        waits = [await limiter.acquire("stats") for _ in range(5)]
+        return waits, time.perf_counter() - started
+
+    waits, elapsed = asyncio.run(run())
+    assert waits[:2] == [0.0, 0.0]
+    assert 0.025 <= elapsed < 0.5
+    assert limiter.stats()["endpoints"]["stats"]["granted"] == 5
+
+
+def test_interactive_requests_jump_the_background_queue():
+    limiter = RateLimiter(rate=200, burst=1)
+    order = []
+
+    async def take(name, priority):
+        await limiter.acquire("search", priority)
+        order.append(name)
+
+    async def run():
+        await limiter.acquire("search")
+        background = [
+            asyncio.ensure_future(take(f"bg{i}", PRIORITY_BACKGROUND)) for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(take("ui", PRIORITY_INTERACTIVE))
+        await asyncio.gather(*background, interactive)
+
+    asyncio.run(run())
+    assert order[0] == "ui"
+    assert order[1:] == ["bg0", "bg1", "bg2"]
+
+
+def test_pause_holds_every_caller_of_the_endpoint():
+    limiter = RateLimiter(rate=1000, burst=10)
+
+    async def run():
+        limiter.pause("stats", 0.05)
+        waited = await limiter.acquire("stats")
+        return waited, await limiter.acquire("users")
+
+    waited, other = asyncio.run(run())
+    assert waited >= 0.04
+    assert other == 0.0
+    assert limiter.stats()["endpoints"]["stats"]["throttled"] == 1
+
+
+def test_zero_rate_disables_limiting():
+    limiter = RateLimiter(rate=0)
+
+    async def run():
+        return [await limiter.acquire("stats") for _ in range(100)]
+
+    assert set(asyncio.run(run())) == {0.0}
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    request = httpx.Request("GET", "http://neonpanel.test/")
+
+    def response(value):
+        return httpx.Response(429, headers={"Retry-After": value}, request=request)
+
+    assert retry_after_seconds(response("3")) == 3.0
+    for usegmt in (True, False):
+        date = formatdate(time.time() + 10, usegmt=usegmt)
+        assert 8 <= retry_after_seconds(response(date)) <= 10
+    assert retry_after_seconds(response("soon")) is None
+    assert retry_after_seconds(httpx.Response(429, request=request)) is None
+
+
+def test_client_retries_a_throttled_action_after_retry_after(mock_api):
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request.method)
+        if len(attempts) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.05"})
+        return httpx.Response(200, json={"server_id": "srv_1", "completed": True})
+
+    api = mock_api(handler)
+    api.client.rate_limiter = RateLimiter(rate=1000, burst=10)
+    result = asyncio.run(api.client.execute_server_action("srv_1", "restart"))
+
+    assert result["completed"] is True
+    assert attempts == ["POST", "POST"]
+    endpoints = api.client.rate_limiter.stats()["endpoints"]
+    assert endpoints["server_action"]["throttled"] == 1
@@ -0,0 +1,149 @@
+import asyncio
+
+import httpx
+import pytest
+
+from mcp.neonpanel_client import NeonPanelMCPClient
+from mcp.rate_limit import RateLimiter
+from mcp.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    hedged,
+)
+
+
+def server_error(status: int = 503) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "http://neonpanel.test/stats")
+    return httpx.HTTPStatusError(
+        "upstream", request=request, response=httpx.Response(status, request=request)
+    )
+
+
+def open_breaker(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call("stats")
+        breaker.record_failure()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("NEONPANEL_RETRY_BASE_DELAY", "0")
+    client = NeonPanelMCPClient(demo_mode=True)
+    client.rate_limiter = RateLimiter(rate=0)
+    return client
+
+
+def test_breaker_opens_after_threshold_and_rejects():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    open_breaker(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("stats")
+    assert breaker.rejected == 1
+
+
+def test_half_open_allows_one_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    open_breaker(breaker)
+    breaker.before_call("stats")
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("stats")
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call("stats")
+
+
+def test_released_probe_lets_the_next_call_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    open_breaker(breaker)
+    breaker.before_call("stats")
+    breaker.release_probe()
+    breaker.before_call("stats")
+    assert breaker.state == HALF_OPEN
+
+
+def test_cancelled_probe_does_not_wedge_the_breaker(client):
+    breaker = client._breaker("stats")
+    breaker.reset_timeout = 0
+    open_breaker(breaker)
+    calls = []
+
+    async def send_once(method, path, timeout, **kwargs):
+        calls.append(path)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    client._send_once = send_once
+
+    async def run():
+        probe = asyncio.ensure_future(
+            client._send("GET", "/stats", "stats", None, True, False, 0)
+        )
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return await client._send("GET", "/stats", "stats", None, True, False, 0)
+
+    assert asyncio.run(run()).status_code == 200
+    assert breaker.state == CLOSED
+
+
+def test_breaker_opened_by_retries_reports_upstream_error(client):
+    client._breaker("stats").failure_threshold = 2
+
+    async def send_once(method, path, timeout, **kwargs):
+        raise server_error(503)
+
+    client._send_once = send_once
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client._send("GET", "/stats", "stats", None, True, False, 0))
+    assert client._breaker("stats").state == OPEN
+
+
+def test_retries_idempotent_server_failures(client):
+    attempts = []
+
+    async def send_once(method, path, timeout, **kwargs):
+        attempts.append(method)
+        if len(attempts) < 3:
+            raise server_error(502)
+        return httpx.Response(200)
+
+    client._send_once = send_once
+    response = asyncio.run(client._send("GET", "/stats", "stats", None, True, False, 0))
+    assert response.status_code == 200
+    assert len(attempts) == 3
+    assert client._retries["stats"] == 2
+
+
+def test_does_not_retry_non_idempotent_calls(client):
+    attempts = []
+
+    async def send_once(method, path, timeout, **kwargs):
+        attempts.append(method)
+        raise server_error(502)
+
+    client._send_once = send_once
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(
+            client._send("POST", "/restart", "server_action", None, False, False, 0)
+        )
+    assert len(attempts) == 1
+
+
+def test_hedge_wins_when_the_first_copy_is_slow():
+    delays = [1.0, 0.0]
+
+    async def fetch():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    result, index = asyncio.run(hedged(fetch, delay=0.01))
+    assert (result, index) == (0.0, 1)
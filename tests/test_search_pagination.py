@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+
+from mcp.neonpanel_client import NeonPanelMCPClient
+
+
+def serve_search(resource_count: int):
+    """A /search handler paging through resource_count results by offset cursor"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        start = int(request.url.params.get("cursor", 0))
+        end = min(start + int(request.url.params["limit"]), resource_count)
+        results = [{"id": f"res_{i}"} for i in range(start, end)]
+        next_cursor = str(end) if end < resource_count else None
+        return httpx.Response(
+            200, json={"results": results, "next_cursor": next_cursor}
+        )
+
+    return handler
+
+
+async def collect(results):
+    return [result async for result in results]
+
+
+def test_follows_cursors_across_pages(mock_api):
+    api = mock_api(serve_search(130))
+    api.client.search_page_size = 50
+
+    results = asyncio.run(collect(api.client.iter_search_resources("")))
+    assert [result["id"] for result in results] == [f"res_{i}" for i in range(130)]
+    assert len(api.requests) == 3
+
+
+def test_max_results_stops_fetching_pages(mock_api):
+    api = mock_api(serve_search(1000))
+    api.client.search_prefetch_pages = 1
+
+    results = asyncio.run(
+        collect(api.client.iter_search_resources("", max_results=30, page_size=10))
+    )
+    assert len(results) == 30
+    # The pages read plus at most the prefetch buffer and the one being put
+    assert len(api.requests) <= 5
+
+
+def test_early_exit_cancels_the_page_producer(mock_api):
+    api = mock_api(serve_search(500))
+
+    async def first_then_stop():
+        results = api.client.iter_search_resources("", page_size=10)
+        first = await results.__anext__()
+        await results.aclose()
+        await asyncio.sleep(0.05)
+        return first, len(api.requests)
+
+    first, requests = asyncio.run(first_then_stop())
+    assert first["id"] == "res_0"
+    assert requests <= 1 + api.client.search_prefetch_pages + 1
+
+
+def test_stale_page_refresh_fetches_its_own_cursor(mock_api):
+    api = mock_api(serve_search(100))
+    api.client.search_prefetch_pages = 1
+    first_page = {
+        "results": [{"id": f"res_{i}"} for i in range(10)],
+        "next_cursor": "10",
+    }
+    # ttl 0: served as stale, with a refresh scheduled for the first page
+    api.client.cache.set(("search", "", None, 10), first_page, 0)
+    refreshes = []
+    api.client._schedule_refresh = lambda key, fetch: refreshes.append((key, fetch))
+
+    results = asyncio.run(
+        collect(api.client.iter_search_resources("", max_results=15, page_size=10))
+    )
+    assert results[:10] == first_page["results"] and len(results) == 15
+
+    # By now the producer has moved on to later cursors
+    [(key, fetch)] = refreshes
+    assert key == ("search", "", None, 10)
+    requests = len(api.requests)
+    asyncio.run(fetch(0))
+    assert "cursor" not in api.requests[requests].url.params
+
+
+def test_demo_mode_pages_through_the_simulator():
+    client = NeonPanelMCPClient(demo_mode=True)
+    results = asyncio.run(collect(client.iter_search_resources("", max_results=7)))
+    assert len(results) == 7
+    assert len({result["id"] for result in results}) == 7
@@ -0,0 +1,74 @@
+import time
+
+from mcp.simulator import EPOCH as DEFAULT_EPOCH
+from mcp.simulator import FleetSimulator
+
+EPOCH = 1_700_000_000.0
+
+
+def test_same_seed_and_time_give_the_same_fleet():
+    first = FleetSimulator(fleet_size=50, resource_count=50, seed=7, epoch=EPOCH)
+    second = FleetSimulator(fleet_size=50, resource_count=50, seed=7, epoch=EPOCH)
+    other = FleetSimulator(fleet_size=50, resource_count=50, seed=8, epoch=EPOCH)
+
+    at = EPOCH + 3 * 86400 + 3725
+    assert first.stats(at) == second.stats(at)
+    assert first.search("db")["results"] == second.search("db")["results"]
+    assert first.stats(at) != other.stats(at)
+    assert first.stats(at)["uptime"] == "3 days, 1 hours, 2 minutes"
+
+
+def test_default_epoch_is_fixed():
+    first = FleetSimulator(fleet_size=20, resource_count=0, seed=7)
+    time.sleep(0.01)
+    second = FleetSimulator(fleet_size=20, resource_count=0, seed=7)
+
+    assert first.epoch == second.epoch == DEFAULT_EPOCH
+    assert first.stats(EPOCH) == second.stats(EPOCH)
+
+
+def test_metrics_are_bounded_and_drift_smoothly():
+    fleet = FleetSimulator(fleet_size=200, seed=1, epoch=EPOCH)
+    samples = [fleet.stats(EPOCH + 3600 + tick * fleet.interval) for tick in range(20)]
+
+    for stats in samples:
+        for name in ("cpu_usage", "memory_usage", "disk_usage"):
+            assert 0 <= stats[name] <= 100
+    steps = [abs(a["cpu_usage"] - b["cpu_usage"]) for a, b in zip(samples, samples[1:])]
+    assert max(steps) < 5
+    assert len({stats["cpu_usage"] for stats in samples}) > 1
+
+
+def test_search_matches_every_term_by_prefix_and_pages():
+    fleet = FleetSimulator(fleet_size=100, resource_count=400, seed=3)
+
+    for resource in fleet.search("server act", limit=1000)["results"]:
+        assert (resource["type"], resource["status"]) == ("server", "active")
+    kinds = {r["type"] for r in fleet.search("serv", limit=1000)["results"]}
+    assert kinds == {"server", "service"}
+
+    first = fleet.search("database", limit=10)
+    second = fleet.search("database", limit=10, cursor=first["next_cursor"])
+    assert first["total"] == len(fleet.search_ids("database")) > 20
+    assert len(first["results"]) == len(second["results"]) == 10
+    last, following = first["results"][-1]["id"], second["results"][0]["id"]
+    assert fleet.index_of(last) < fleet.index_of(following)
+
+
+def test_actions_change_status_and_search_results():
+    fleet = FleetSimulator(fleet_size=20, resource_count=0, seed=5)
+    server_id = fleet.search("active")["results"][0]["id"]
+
+    assert fleet.apply_action(server_id, "stop") == "inactive"
+    assert server_id not in {r["id"] for r in fleet.search("active")["results"]}
+    assert fleet.apply_action(server_id, "restart") == "active"
+    assert fleet.apply_action("res_3", "stop") is None
+    assert fleet.index_of(server_id) == int(server_id.split("_")[1])
+    assert fleet.index_of("srv_999") is None
+
+
+def test_large_fleets_build_and_search():
+    fleet = FleetSimulator(fleet_size=100_000, resource_count=100_000, seed=9)
+    stats = fleet.stats()
+    assert stats["total_servers"] == 100_000
+    assert 0 < fleet.search("eu-west", limit=5)["total"] < 200_000
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from mcp.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert len(calls) == 1
+    assert flights.stats() == {"calls": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_errors_reach_every_caller_and_the_key_is_retried():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise LookupError("gone")
+
+    async def run():
+        results = await asyncio.gather(
+            flights.do("key", fail), flights.do("key", fail), return_exceptions=True
+        )
+        assert flights.in_flight() == 0
+        return results, await flights.do("key", lambda: asyncio.sleep(0, "ok"))
+
+    results, retried = asyncio.run(run())
+    assert retried == "ok"
+    assert [type(r) for r in results] == [LookupError, LookupError]
+    assert flights.calls == 2
+
+
+def test_cancelling_one_caller_does_not_fail_the_others():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def run():
+        impatient = asyncio.ensure_future(flights.do("key", fetch))
+        patient = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(run()) == "value"
+
+
+def test_client_coalesces_identical_concurrent_reads(mock_api):
+    api = mock_api(latency=0.02)
+
+    async def run():
+        return await asyncio.gather(*(api.client.get_user_data("7") for _ in range(10)))
+
+    users = asyncio.run(run())
+    assert all(user["user_id"] == "7" for user in users)
+    assert len(api.requests) == 1
+    assert api.client.flights.coalesced == 9
@@ -0,0 +1,66 @@
+import asyncio
+
+import numpy as np
+
+from mcp.neonpanel_client import NeonPanelMCPClient
+from mcp.timeseries import StatsTimeSeries
+
+
+def test_ring_buffer_keeps_the_latest_samples_in_order():
+    series = StatsTimeSeries(capacity=3, metrics=("cpu_usage",))
+    for i in range(5):
+        series.record({"cpu_usage": i}, timestamp=100 + i)
+
+    timestamps, values = series.window()
+    assert len(series) == 3
+    assert timestamps.tolist() == [102, 103, 104]
+    assert values[0].tolist() == [2, 3, 4]
+
+
+def test_window_and_aggregates():
+    series = StatsTimeSeries(metrics=("cpu_usage", "memory_usage"))
+    for i in range(11):
+        # cpu climbs 1 point per 6s (10 per minute); memory is only sometimes sent
+        stats = {"avg_cpu_usage": 40 + i, "uptime": "3 days"}
+        if i % 2 == 0:
+            stats["memory_usage"] = 50
+        series.record(stats, timestamp=6 * i)
+
+    summary = series.aggregate()
+    cpu = summary["cpu_usage"]
+    assert (cpu["count"], cpu["min"], cpu["max"], cpu["last"]) == (11, 40, 50, 50)
+    assert cpu["p50"] == 45 and cpu["rate_per_min"] == 10
+    assert summary["memory_usage"]["count"] == 6
+    assert summary["memory_usage"]["rate_per_min"] == 0
+
+    recent = series.aggregate(seconds=12)
+    assert recent["cpu_usage"]["count"] == 3 and recent["cpu_usage"]["min"] == 48
+
+
+def test_empty_and_missing_metrics_report_none():
+    series = StatsTimeSeries()
+    assert series.aggregate()["cpu_usage"]["mean"] is None
+
+    series.record({"cpu_usage": 10}, timestamp=1)
+    summary = series.aggregate()
+    assert summary["disk_usage"] == dict(summary["disk_usage"], count=0, mean=None)
+
+
+def test_chart_columns():
+    series = StatsTimeSeries(metrics=("cpu_usage",))
+    series.record({"cpu_usage": 12.5}, timestamp=1_700_000_000)
+    columns = series.to_columns()
+    assert columns["timestamp"].dtype == np.dtype("datetime64[ms]")
+    assert columns["cpu_usage"].tolist() == [12.5]
+
+
+def test_client_records_every_stats_read():
+    client = NeonPanelMCPClient(demo_mode=True)
+
+    async def poll():
+        for _ in range(3):
+            await client.get_server_stats()
+
+    asyncio.run(poll())
+    assert len(client.stats_history) == 3
+    assert client.stats_history.aggregate()["cpu_usage"]["count"] == 3